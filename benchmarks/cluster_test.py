@@ -0,0 +1,180 @@
+"""
+Local test mode for cluster deployments.
+
+Starts a local Raider.io stub and several worker processes on this machine.
+Each worker boots the bot the way cluster.py would (an AutoShardedBot over
+its shard range, with every cog loaded) but never connects to Discord;
+instead it drives CharacterLookupModal.on_submit with fake interactions for
+the same set of characters as the other workers. The summary shows whether
+the workers shared the profile cache and stayed inside one rate budget.
+
+Usage:
+    python -m benchmarks.cluster_test --workers 3 --shards 6 --characters 60
+    python -m benchmarks.cluster_test --workers 3 --no-share   # baseline without shared state
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run several bot workers against a local Raider.io stub.")
+    parser.add_argument("--workers", type=int, default=3, help="Worker processes to start.")
+    parser.add_argument("--shards", type=int, default=6, help="Total shards split between the workers.")
+    parser.add_argument("--characters", type=int, default=60, help="Distinct characters every worker looks up.")
+    parser.add_argument("--rounds", type=int, default=2, help="Times each worker looks every character up.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Lookups in flight per worker.")
+    parser.add_argument("--rate", type=float, default=20, help="RAIDERIO_RATE_LIMIT for the whole cluster.")
+    parser.add_argument("--burst", type=int, default=5, help="RAIDERIO_RATE_BURST for the whole cluster.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub response latency in seconds.")
+    parser.add_argument("--sync-interval", type=float, default=0.2, help="CLUSTER_SYNC_INTERVAL for the workers.")
+    parser.add_argument("--no-share", action="store_true", help="Run the workers without shared state.")
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+async def run_worker(args):
+    """Boot one worker from the environment the parent set, run its lookups and print the results."""
+    from benchmarks.load_test import FakeInteraction
+    import bot as bot_module
+    from utils import raiderio_api
+    from cogs.raider_commands import CharacterLookupModal
+
+    worker_id = int(os.environ["CLUSTER_WORKER_ID"])
+    names = [f"Bench{index}" for index in range(args.characters)] * args.rounds
+    random.Random(worker_id).shuffle(names)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    outcomes = {}
+
+    async def lookup(name):
+        async with semaphore:
+            modal = CharacterLookupModal()
+            modal.character_input._value = f"{name}-area 52"
+            interaction = FakeInteraction()
+            await modal.on_submit(interaction)
+            outcomes[interaction.outcome] = outcomes.get(interaction.outcome, 0) + 1
+
+    async with bot_module.bot, raiderio_api.RaiderIOClient() as client:
+        raiderio_api.set_client(client)
+        if not args.no_share:
+            await raiderio_api.join_cluster()
+        await bot_module.load_extensions()
+        cogs = sorted(bot_module.bot.cogs)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(lookup(name) for name in names))
+        duration = time.perf_counter() - started
+
+        stats = raiderio_api.get_stats()
+        if not args.no_share:
+            await raiderio_api.leave_cluster()
+        raiderio_api.set_client(None)
+
+    print(json.dumps({
+        "worker": worker_id,
+        "bot": type(bot_module.bot).__name__,
+        "shard_ids": bot_module.bot.shard_ids,
+        "shard_count": bot_module.bot.shard_count,
+        "cogs": cogs,
+        "lookups": len(names),
+        "duration_s": round(duration, 3),
+        "outcomes": outcomes,
+        "profile_cache": stats['profile_cache'],
+        "shared_budget": stats.get('shared_budget'),
+    }))
+    bot_module.log_listener.stop()
+
+async def run(args):
+    from benchmarks.stub_server import RaiderIOStub
+    from cluster import assign_shards
+
+    data_dir = tempfile.mkdtemp(prefix="raider-cluster-")
+    stub = RaiderIOStub(latency=args.latency, regions=["us"])
+    await stub.start()
+
+    env = dict(
+        os.environ,
+        DISCORD_TOKEN="cluster-test",
+        RAIDERIO_API_URL=stub.base_url,
+        DATA_DIR=data_dir,
+        PERSISTENT_CACHE_PATH=os.path.join(data_dir, "cache.sqlite3"),
+        CLUSTER_RATE_BUDGET_PATH=os.path.join(data_dir, "rate_budget.sqlite3"),
+        REALM_INDEX_PATH=os.path.join(data_dir, "realm_regions.json"),
+        WATCH_LIST_DIR=os.path.join(data_dir, "watch_lists"),
+        CLUSTER_SYNC_INTERVAL=str(args.sync_interval),
+        RAIDERIO_RATE_LIMIT=str(args.rate),
+        RAIDERIO_RATE_BURST=str(args.burst),
+        PERSISTENT_CACHE_ENABLED="false",
+        METRICS_PORT="0",
+        LOG_LEVEL="WARNING",
+    )
+    worker_args = [
+        "--worker", "--characters", str(args.characters), "--rounds", str(args.rounds),
+        "--concurrency", str(args.concurrency),
+    ]
+    if args.no_share:
+        worker_args.append("--no-share")
+
+    ranges = assign_shards(args.shards, args.workers)
+    started = time.perf_counter()
+    processes = [
+        await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "benchmarks.cluster_test", *worker_args,
+            cwd=ROOT,
+            stdout=asyncio.subprocess.PIPE,
+            env=dict(
+                env,
+                CLUSTER_WORKER_ID=str(index),
+                CLUSTER_SHARD_IDS=",".join(str(shard) for shard in shard_ids),
+                CLUSTER_SHARD_COUNT=str(args.shards),
+            )
+        )
+        for index, shard_ids in enumerate(ranges)
+    ]
+    outputs = await asyncio.gather(*(process.communicate() for process in processes))
+    duration = time.perf_counter() - started
+    await stub.stop()
+
+    workers = []
+    for process, (stdout, _) in zip(processes, outputs):
+        lines = stdout.decode().strip().splitlines()
+        workers.append(json.loads(lines[-1]) if process.returncode == 0 and lines else
+                       {"exit_code": process.returncode})
+
+    lookups = sum(worker.get("lookups", 0) for worker in workers)
+    return {
+        "config": vars(args),
+        "shared": not args.no_share,
+        "workers": workers,
+        "lookups": lookups,
+        "duration_s": round(duration, 3),
+        "outbound_requests": stub.requests,
+        "requests_per_character": round(stub.requests / args.characters, 3) if args.characters else 0.0,
+        "request_rate_per_s": round(stub.requests / duration, 2) if duration else 0.0,
+        "stub_responses": {str(status): count for status, count in sorted(stub.responses.items())},
+    }
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.worker:
+        asyncio.run(run_worker(args))
+        return
+
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
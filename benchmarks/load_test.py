@@ -0,0 +1,186 @@
+"""
+Offline load test for the Raider.io lookup path.
+
+Starts a local Raider.io stub, points the bot's client at it and runs many
+concurrent lookups, either straight through find_character_in_regions or
+through CharacterLookupModal.on_submit with fake interactions. Results are
+printed as JSON so runs can be compared.
+
+Usage:
+    python -m benchmarks.load_test --lookups 500 --concurrency 50 --mode modal
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.stub_server import RaiderIOStub
+
+class FakeInteraction:
+    """Just enough of discord.Interaction for CharacterLookupModal.on_submit."""
+
+    def __init__(self):
+        self.response = mock.Mock()
+        self.response.defer = mock.AsyncMock()
+        self.followup = mock.Mock()
+        self.followup.send = mock.AsyncMock(side_effect=self._record)
+        self.messages = []
+
+    async def _record(self, content=None, **kwargs):
+        self.messages.append((content, kwargs))
+        message = mock.Mock()
+        message.edit = mock.AsyncMock()
+        return message
+
+    @property
+    def outcome(self):
+        """Classify the reply the modal sent."""
+        if not self.messages:
+            return "no_reply"
+        content, kwargs = self.messages[0]
+        if kwargs.get("embeds") or kwargs.get("embed"):
+            return "found"
+        content = (content or "").lower()
+        if "not found" in content:
+            return "not_found"
+        if "rate limit" in content:
+            return "rate_limited"
+        if "slow" in content:
+            return "slow"
+        return "error"
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test for the Raider.io lookup path.")
+    parser.add_argument("--mode", choices=("api", "modal"), default="api",
+                        help="Drive find_character_in_regions directly or the modal submit path.")
+    parser.add_argument("--lookups", type=int, default=500, help="Total number of lookups.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Lookups in flight at once.")
+    parser.add_argument("--characters", type=int, default=0,
+                        help="Distinct characters to look up, 0 makes every lookup unique.")
+    parser.add_argument("--regions", default="us",
+                        help="Comma separated regions the stub has characters in.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub response latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Extra random stub latency in seconds.")
+    parser.add_argument("--not-found-rate", type=float, default=0.1, help="Share of stub 400 responses.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of stub 429 responses.")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="Retry-After sent with a stub 429.")
+    parser.add_argument("--client-rate", type=float, default=None,
+                        help="Override RAIDERIO_RATE_LIMIT (requests per second) for the run.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the stub.")
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    return parser.parse_args(argv)
+
+async def run(args):
+    stub = RaiderIOStub(
+        latency=args.latency,
+        jitter=args.jitter,
+        not_found_rate=args.not_found_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        regions=[region.strip() for region in args.regions.split(",") if region.strip()],
+        seed=args.seed
+    )
+    await stub.start()
+
+    # The bot's modules read their settings at import, so configure them first
+    os.environ["RAIDERIO_API_URL"] = stub.base_url
+    os.environ.setdefault("PERSISTENT_CACHE_ENABLED", "false")
+    # Start every run without a learned realm index
+    os.environ["REALM_INDEX_PATH"] = os.path.join(tempfile.mkdtemp(prefix="raider-bench-"), "realm_regions.json")
+    if args.client_rate is not None:
+        os.environ["RAIDERIO_RATE_LIMIT"] = str(args.client_rate)
+        os.environ["RAIDERIO_RATE_BURST"] = str(max(1, int(args.client_rate)))
+
+    from utils import raiderio_api
+    from utils.raiderio_api import RaiderIOClient, RaiderIOError, RaiderIORateLimited, set_client
+
+    characters = args.characters or args.lookups
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    outcomes = {}
+
+    async def lookup_api(name):
+        try:
+            data = await raiderio_api.find_character_in_regions(name, "area 52")
+            return "found" if data else "not_found"
+        except RaiderIORateLimited:
+            return "rate_limited"
+        except RaiderIOError:
+            return "unavailable"
+
+    async def lookup_modal(name):
+        from cogs.raider_commands import CharacterLookupModal
+        modal = CharacterLookupModal()
+        modal.character_input._value = f"{name}-area 52"
+        interaction = FakeInteraction()
+        await modal.on_submit(interaction)
+        return interaction.outcome
+
+    lookup = lookup_api if args.mode == "api" else lookup_modal
+
+    async def worker(index):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                outcome = await lookup(f"Bench{index % characters}")
+            except Exception as e:
+                outcome = f"exception:{type(e).__name__}"
+            latencies.append(time.perf_counter() - started)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    async with RaiderIOClient() as client:
+        set_client(client)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(index) for index in range(args.lookups)))
+        duration = time.perf_counter() - started
+        set_client(None)
+
+    await stub.stop()
+
+    latencies.sort()
+    return {
+        "config": vars(args),
+        "lookups": args.lookups,
+        "duration_s": round(duration, 4),
+        "throughput_per_s": round(args.lookups / duration, 2) if duration else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+        "outcomes": outcomes,
+        "outbound_requests": stub.requests,
+        "requests_per_lookup": round(stub.requests / args.lookups, 3) if args.lookups else 0.0,
+        "stub_responses": {str(status): count for status, count in sorted(stub.responses.items())},
+        "profile_cache": raiderio_api.profile_cache.stats(),
+    }
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
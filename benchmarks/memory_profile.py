@@ -0,0 +1,105 @@
+"""
+Memory benchmark for cached profiles.
+
+Decodes the sample payloads many times and measures, with tracemalloc, how
+much memory each representation holds per profile: the raw Raider.io dict,
+the dict rebuilt from the projected fields, and CharacterProfile. Also times
+the JSON decoders. Results are printed as JSON so runs can be compared.
+
+Usage:
+    python -m benchmarks.memory_profile --profiles 2000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.stub_server import load_payloads
+from utils import fast_json
+from utils.character_profile import CharacterProfile
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Memory benchmark for cached profiles.")
+    parser.add_argument("--profiles", type=int, default=2000, help="Profiles to hold in memory.")
+    parser.add_argument("--output", help="Also write the JSON results to this file.")
+    return parser.parse_args(argv)
+
+def encoded_profiles(count):
+    """Encode ``count`` distinct profiles, the way Raider.io would send them."""
+    payloads = load_payloads()
+    documents = []
+    for index in range(count):
+        profile = dict(payloads[index % len(payloads)])
+        profile["name"] = f"Bench{index}"
+        profile["profile_url"] = f"https://raider.io/characters/us/area-52/Bench{index}"
+        documents.append(json.dumps(profile).encode("utf-8"))
+    return documents
+
+def measure(build, documents):
+    """
+    Hold every profile built from ``documents`` and measure the memory it takes.
+
+    Returns:
+        dict: Bytes per profile and the time spent building them.
+    """
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    held = [build(document) for document in documents]
+    duration = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return {
+        "bytes_per_profile": round(current / len(documents)),
+        "build_us_per_profile": round(duration / len(documents) * 1e6, 1),
+    }
+
+def time_decoder(loads, documents):
+    """Microseconds to decode one profile."""
+    started = time.perf_counter()
+    for document in documents:
+        loads(document)
+    return round((time.perf_counter() - started) / len(documents) * 1e6, 1)
+
+def run(args):
+    documents = encoded_profiles(args.profiles)
+    results = {
+        "profiles": args.profiles,
+        "payload_bytes": round(sum(len(document) for document in documents) / len(documents)),
+        "json_backend": fast_json.BACKEND,
+        "decode_us_per_profile": {
+            "json": time_decoder(json.loads, documents),
+            fast_json.BACKEND: time_decoder(fast_json.loads, documents),
+        },
+        "raw_dict": measure(fast_json.loads, documents),
+        "projected_dict": measure(lambda document: CharacterProfile.from_dict(fast_json.loads(document)).to_dict(),
+                                  documents),
+        "character_profile": measure(lambda document: CharacterProfile.from_dict(fast_json.loads(document)),
+                                     documents),
+    }
+    raw = results["raw_dict"]["bytes_per_profile"]
+    results["character_profile"]["ratio_to_raw"] = round(
+        results["character_profile"]["bytes_per_profile"] / raw, 3
+    ) if raw else None
+    return results
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Local stand-in for the Raider.io character profile endpoint, used by the benchmarks.
+"""
+
+import asyncio
+import glob
+import json
+import os
+import random
+
+from aiohttp import web
+
+PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads")
+
+class RaiderIOStub:
+    """
+    aiohttp server that answers ``/api/v1/characters/profile`` from sample payloads.
+
+    Every request gets the configured latency, then is answered with a 400
+    (Raider.io's "character not found"), a 429 or a profile, picked at random
+    with the configured rates. A character whose name starts with ``missing``
+    is never found.
+    """
+
+    def __init__(self, latency=0.05, jitter=0.0, not_found_rate=0.0, rate_limit_rate=0.0,
+                 retry_after=1, regions=None, seed=None, host="127.0.0.1", port=0):
+        """
+        Args:
+            latency (float, optional): Seconds to wait before answering.
+            jitter (float, optional): Extra random latency of up to this many seconds.
+            not_found_rate (float, optional): Share of requests answered with 400.
+            rate_limit_rate (float, optional): Share of requests answered with 429.
+            retry_after (float, optional): Retry-After header sent with a 429.
+            regions (list, optional): Regions characters exist in. Defaults to all regions.
+            seed (int, optional): Seed for reproducible runs.
+            host (str, optional): Interface to listen on.
+            port (int, optional): Port to listen on, 0 picks a free one.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.not_found_rate = not_found_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.regions = set(regions) if regions else None
+        self.random = random.Random(seed)
+        self.host = host
+        self.port = port
+        self.payloads = load_payloads()
+        self.requests = 0
+        self.responses = {}
+        self._runner = None
+
+    @property
+    def base_url(self):
+        """The API base URL to point RAIDERIO_API_URL at."""
+        return f"http://{self.host}:{self.port}/api/v1"
+
+    async def start(self):
+        """Start listening."""
+        app = web.Application()
+        app.router.add_get("/api/v1/characters/profile", self.handle_profile)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def stop(self):
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def reset_counters(self):
+        """Reset the request and response counters."""
+        self.requests = 0
+        self.responses = {}
+
+    async def handle_profile(self, request):
+        """Answer a character profile request."""
+        self.requests += 1
+        query = request.query
+        await asyncio.sleep(self.latency + self.random.uniform(0, self.jitter))
+
+        roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            return self._respond(429, {"statusCode": 429, "error": "Too Many Requests",
+                                       "message": "Rate limit exceeded"},
+                                 headers={"Retry-After": str(self.retry_after)})
+
+        region = query.get("region", "us")
+        name = query.get("name", "")
+        if roll < self.rate_limit_rate + self.not_found_rate or name.lower().startswith("missing") or \
+                (self.regions is not None and region not in self.regions):
+            return self._respond(400, {"statusCode": 400, "error": "Bad Request",
+                                       "message": "Could not find requested character"})
+
+        profile = dict(self.random.choice(self.payloads))
+        profile["name"] = name
+        profile["region"] = region
+        profile["realm"] = query.get("realm", profile["realm"]).title()
+        profile["profile_url"] = f"https://raider.io/characters/{region}/{query.get('realm', '')}/{name}"
+        return self._respond(200, profile)
+
+    def _respond(self, status, body, headers=None):
+        self.responses[status] = self.responses.get(status, 0) + 1
+        return web.json_response(body, status=status, headers=headers)
+
+def load_payloads():
+    """Load every sample profile payload."""
+    payloads = []
+    for path in sorted(glob.glob(os.path.join(PAYLOAD_DIR, "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            payloads.append(json.load(f))
+    return payloads
@@ -2,24 +2,90 @@
 Main entry point for the Discord bot.
 """
 
+import time
+
+# Startup phases are timed from here
+BOOT_STARTED = time.perf_counter()
+
 import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+ENV_LOADED = time.perf_counter()
+
+import argparse
 import logging
 import asyncio
 import discord
 from discord.ext import commands
-from dotenv import load_dotenv
 
-from config import BOT_DESCRIPTION, COMMAND_PREFIX
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from config import (
+    BOT_DESCRIPTION, COMMAND_PREFIX, PERSISTENT_CACHE_ENABLED, METRICS_HOST, METRICS_PORT,
+    LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_RATE, LOG_RATE_LIMIT, COMMAND_SYNC_STATE_PATH, FORCE_COMMAND_SYNC,
+    SEASON_DATA_RELOAD_INTERVAL, SCORECARD_ENABLED, CLUSTER_WORKER_ID, CLUSTER_SHARD_IDS, CLUSTER_SHARD_COUNT
+)
+from utils import metrics
+from utils.command_sync import sync_if_changed
+from utils.embed_builder import season_data
+from utils.leaderboard import leaderboards
+from utils.logging_config import log_fields, setup_logging
+from utils.metrics import start_metrics_server
+from utils.raiderio_api import (
+    RaiderIOClient, set_client, open_persistent_cache, close_persistent_cache, join_cluster, leave_cluster
 )
+from utils.scorecard import scorecards
+
+# Set up logging; records are written from a background thread, off the event loop
+log_listener, log_sampling = setup_logging(LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_RATE, LOG_RATE_LIMIT)
+metrics.registry.add_gauge_callback(lambda: [
+    ("log_records_dropped", "High-volume log records dropped by sampling or rate limiting.", {}, log_sampling.dropped)
+])
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+COGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cogs')
+
+class BootTimer:
+    """Seconds spent in each startup phase, logged once when the bot is first ready."""
+
+    def __init__(self, started):
+        self.started = started
+        self.phases = {}
+        self._last = started
+        self.reported = False
+
+    def mark(self, phase, now=None):
+        """End the current phase and start the next one."""
+        now = time.perf_counter() if now is None else now
+        self.phases[phase] = now - self._last
+        self._last = now
+
+    def skip(self, phase):
+        """Record a phase that didn't run."""
+        self.phases[phase] = 0.0
+
+    def report(self):
+        """Log every phase and the total, once."""
+        if self.reported:
+            return
+        self.reported = True
+        total = self._last - self.started
+        logger.info(
+            f"Startup took {total:.2f}s",
+            extra=log_fields(**{phase: f"{seconds:.3f}" for phase, seconds in self.phases.items()}, total=f"{total:.3f}")
+        )
+
+    def gauges(self):
+        return [
+            ("bot_startup_phase_seconds", "Seconds spent in each startup phase.", {"phase": phase}, seconds)
+            for phase, seconds in self.phases.items()
+        ]
+
+boot_timer = BootTimer(BOOT_STARTED)
+boot_timer.mark("env", ENV_LOADED)
+boot_timer.mark("imports")
+metrics.registry.add_gauge_callback(boot_timer.gauges)
+
 TOKEN = os.getenv('DISCORD_TOKEN')
 
 # Define intents
@@ -29,40 +95,106 @@ intents = discord.Intents.default()
 # If you want to use it, enable it in the Discord Developer Portal
 # intents.message_content = True
 
-# Create bot instance
-bot = commands.Bot(
-    command_prefix=COMMAND_PREFIX,
-    description=BOT_DESCRIPTION,
-    intents=intents
-)
+# Create bot instance; a cluster worker runs only the shards cluster.py assigned to it
+if CLUSTER_SHARD_IDS:
+    bot = commands.AutoShardedBot(
+        command_prefix=COMMAND_PREFIX,
+        description=BOT_DESCRIPTION,
+        intents=intents,
+        shard_ids=CLUSTER_SHARD_IDS,
+        shard_count=CLUSTER_SHARD_COUNT
+    )
+else:
+    bot = commands.Bot(
+        command_prefix=COMMAND_PREFIX,
+        description=BOT_DESCRIPTION,
+        intents=intents
+    )
 
 @bot.event
 async def on_ready():
-    """Event triggered when the bot is ready."""
-    logger.info(f'{bot.user.name} has connected to Discord!')
-
-    # Sync application commands
-    try:
-        synced = await bot.tree.sync()
-        logger.info(f"Synced {len(synced)} command(s)")
-    except Exception as e:
-        logger.error(f"Failed to sync commands: {e}")
+    """Event triggered when the bot is ready, including after reconnects."""
+    if CLUSTER_SHARD_IDS:
+        logger.info(f'{bot.user.name} has connected to Discord with shards {CLUSTER_SHARD_IDS} of {bot.shard_count}')
+    else:
+        logger.info(f'{bot.user.name} has connected to Discord!')
+    if not boot_timer.reported:
+        boot_timer.mark("ready")
+        boot_timer.report()
 
 async def load_extensions():
     """Load all cogs."""
-    for filename in os.listdir('./cogs'):
-        if filename.endswith('.py'):
+    for filename in sorted(os.listdir(COGS_DIR)):
+        if filename.endswith('.py') and not filename.startswith('_'):
             try:
                 await bot.load_extension(f'cogs.{filename[:-3]}')
                 logger.info(f'Loaded extension: {filename[:-3]}')
             except Exception as e:
                 logger.error(f'Failed to load extension {filename[:-3]}: {e}')
 
-async def main():
+async def sync_commands(force=False):
+    """Sync application commands once per process, and only if they changed since the last sync."""
+    try:
+        await sync_if_changed(bot.tree, bot.application_id, COMMAND_SYNC_STATE_PATH, force=force)
+    except Exception as e:
+        logger.error(f"Failed to sync commands: {e}")
+
+async def main(force_sync=False):
     """Main function to start the bot."""
-    async with bot:
-        await load_extensions()
-        await bot.start(TOKEN)
+    # The Raider.io client owns the shared connection pool and is closed on shutdown
+    async with bot, RaiderIOClient() as raiderio_client:
+        set_client(raiderio_client)
+        metrics_runner = None
+        season_watcher = None
+        try:
+            # Validate the season data now, so a broken file stops the bot instead of the first lookup
+            season_data.load()
+            if SEASON_DATA_RELOAD_INTERVAL > 0:
+                season_watcher = asyncio.create_task(season_data.watch(SEASON_DATA_RELOAD_INTERVAL))
+            if SCORECARD_ENABLED:
+                # Decodes and resizes the dungeon art once, before the first lookup needs it
+                scorecards.start()
+            if CLUSTER_WORKER_ID is not None:
+                await join_cluster()
+            elif PERSISTENT_CACHE_ENABLED:
+                await open_persistent_cache()
+            leaderboards.start()
+            if METRICS_PORT:
+                # Each cluster worker serves its metrics on the next port up
+                metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_PORT + (CLUSTER_WORKER_ID or 0))
+            boot_timer.mark("services")
+            await load_extensions()
+            boot_timer.mark("cogs")
+            # bot.start() split up, so commands are synced once rather than on every ready event
+            await bot.login(TOKEN)
+            boot_timer.mark("login")
+            # Commands are global, so in a cluster only the first worker syncs them
+            if not CLUSTER_WORKER_ID:
+                await sync_commands(force=force_sync)
+                boot_timer.mark("sync")
+            else:
+                boot_timer.skip("sync")
+            await bot.connect()
+        finally:
+            if season_watcher is not None:
+                season_watcher.cancel()
+            scorecards.close()
+            await leaderboards.close()
+            if metrics_runner is not None:
+                await metrics_runner.cleanup()
+            if CLUSTER_WORKER_ID is not None:
+                await leave_cluster()
+            else:
+                await close_persistent_cache()
+            set_client(None)
+            log_listener.stop()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Raider.io Discord bot.")
+    parser.add_argument("--sync-commands", action="store_true",
+                        help="Sync application commands even if they haven't changed since the last sync.")
+    return parser.parse_args(argv)
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    args = parse_args()
+    asyncio.run(main(force_sync=args.sync_commands or FORCE_COMMAND_SYNC))
@@ -0,0 +1,214 @@
+"""
+Runs the bot as a cluster of worker processes, each owning a range of shards.
+
+Every worker is a normal bot.py process running an AutoShardedBot over its
+shards. Workers share one profile cache, realm index and Raider.io rate
+budget through SQLite files in DATA_DIR, so adding workers doesn't add
+Raider.io traffic. Workers that exit are restarted with a backoff.
+
+Usage:
+    python cluster.py --workers 4 --shards 16
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import aiohttp
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from config import CLUSTER_SHARDS, CLUSTER_WORKERS, FORCE_COMMAND_SYNC
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("cluster")
+
+BOT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bot.py')
+GATEWAY_URL = "https://discord.com/api/v10/gateway/bot"
+
+# Discord allows one IDENTIFY per max_concurrency bucket every 5 seconds
+IDENTIFY_INTERVAL = 5
+# A worker that stayed up this long has its restart backoff reset
+STABLE_UPTIME = 300
+MAX_RESTART_DELAY = 60
+
+def assign_shards(shard_count, workers):
+    """
+    Split shards into contiguous, evenly sized ranges.
+
+    Args:
+        shard_count (int): Total number of shards.
+        workers (int): Number of worker processes.
+
+    Returns:
+        list: One list of shard ids per worker; workers beyond the shard count get none.
+    """
+    workers = min(workers, shard_count)
+    size, extra = divmod(shard_count, workers)
+    ranges = []
+    start = 0
+    for index in range(workers):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+async def fetch_gateway_info(token):
+    """
+    Ask Discord how many shards the bot should run.
+
+    Args:
+        token (str): The bot token.
+
+    Returns:
+        tuple: (recommended shard count, identify max_concurrency).
+    """
+    headers = {"Authorization": f"Bot {token}"}
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_URL, headers=headers) as response:
+            response.raise_for_status()
+            data = await response.json()
+    return data['shards'], data.get('session_start_limit', {}).get('max_concurrency', 1)
+
+class Worker:
+    """One bot.py process and the shards it owns."""
+
+    def __init__(self, worker_id, shard_ids, shard_count, sync_commands=False):
+        self.worker_id = worker_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.sync_commands = sync_commands
+        self.process = None
+        self.started_at = None
+        self.restarts = 0
+        self.restart_at = None
+
+    def start(self):
+        """Start the worker process."""
+        env = dict(
+            os.environ,
+            CLUSTER_WORKER_ID=str(self.worker_id),
+            CLUSTER_SHARD_IDS=",".join(str(shard) for shard in self.shard_ids),
+            CLUSTER_SHARD_COUNT=str(self.shard_count),
+        )
+        args = [sys.executable, BOT_SCRIPT]
+        if self.sync_commands:
+            args.append("--sync-commands")
+        self.process = subprocess.Popen(args, env=env)
+        self.started_at = time.monotonic()
+        self.restart_at = None
+        logger.info(f"Started worker {self.worker_id} (pid {self.process.pid}) with shards {self.shard_ids}")
+
+    def poll(self):
+        """
+        Check whether the worker exited, and schedule its restart if it did.
+
+        Returns:
+            int: The exit code if it exited since the last poll, otherwise None.
+        """
+        if self.process is None or self.restart_at is not None:
+            return None
+        code = self.process.poll()
+        if code is None:
+            return None
+
+        if time.monotonic() - self.started_at >= STABLE_UPTIME:
+            self.restarts = 0
+        delay = min(MAX_RESTART_DELAY, 2 ** self.restarts)
+        self.restarts += 1
+        self.restart_at = time.monotonic() + delay
+        logger.warning(f"Worker {self.worker_id} exited with code {code}, restarting in {delay}s")
+        return code
+
+    def stop(self):
+        """Ask the worker to shut down the way Ctrl+C would, so it flushes its caches."""
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(signal.SIGINT if os.name != 'nt' else signal.SIGTERM)
+
+    def wait(self, timeout):
+        """Wait for the worker to exit, killing it after the timeout."""
+        if self.process is None:
+            return
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Worker {self.worker_id} didn't stop in time, killing it")
+            self.process.kill()
+            self.process.wait()
+
+def run_cluster(workers, stagger):
+    """
+    Start every worker and keep them running until interrupted.
+
+    Args:
+        workers (list): The Worker objects.
+        stagger (float): Seconds between worker starts, so their shards don't identify at once.
+    """
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    for index, worker in enumerate(workers):
+        if stopping:
+            break
+        if index:
+            time.sleep(stagger)
+        worker.start()
+
+    while not stopping:
+        time.sleep(1)
+        for worker in workers:
+            worker.poll()
+            if worker.restart_at is not None and time.monotonic() >= worker.restart_at and not stopping:
+                worker.start()
+
+    logger.info("Stopping workers")
+    for worker in workers:
+        worker.stop()
+    for worker in workers:
+        worker.wait(timeout=30)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Raider.io Discord bot as a cluster of worker processes.")
+    parser.add_argument("--workers", type=int, default=CLUSTER_WORKERS, help="Number of worker processes.")
+    parser.add_argument("--shards", type=int, default=CLUSTER_SHARDS,
+                        help="Total number of shards; 0 uses the count Discord recommends.")
+    parser.add_argument("--sync-commands", action="store_true",
+                        help="Sync application commands even if they haven't changed since the last sync.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.workers < 1:
+        raise SystemExit("--workers must be at least 1")
+
+    max_concurrency = 1
+    shard_count = args.shards
+    if shard_count <= 0:
+        shard_count, max_concurrency = asyncio.run(fetch_gateway_info(os.getenv('DISCORD_TOKEN')))
+        logger.info(f"Discord recommends {shard_count} shard(s)")
+
+    ranges = assign_shards(shard_count, args.workers)
+    workers = [
+        Worker(index, shard_ids, shard_count, sync_commands=index == 0 and (args.sync_commands or FORCE_COMMAND_SYNC))
+        for index, shard_ids in enumerate(ranges)
+    ]
+    # Let each worker's shards identify before the next worker starts
+    stagger = IDENTIFY_INTERVAL * max(len(shard_ids) for shard_ids in ranges) / max_concurrency
+    logger.info(f"Running {shard_count} shard(s) on {len(workers)} worker(s)")
+    run_cluster(workers, stagger)
+
+if __name__ == '__main__':
+    main()
@@ -7,31 +7,45 @@ from discord import app_commands
 from discord.ext import commands
 from discord.ui import Modal, TextInput
 import logging
-import dateutil.parser
-
-from utils.raiderio_api import find_character_in_regions
-from config import DEFAULT_REGIONS, DUNGEON_EMOJIS, FALLBACK_EMOJIS, FACTION_EMOJIS, MAX_MYTHIC_PLUS_RUNS, SHOW_AFFIXES
+import time
+
+from utils import metrics
+from utils.batch_lookup import lookup_roster, parse_roster
+from utils.deadline import Deadline
+from utils.embed_builder import (
+    build_character_embed, build_details_embed, build_leaderboard_embed, build_roster_embed
+)
+from utils.leaderboard import leaderboards, set_guild
+from utils.logging_config import set_correlation_id
+from utils.reply_refresher import ReplyRefresher
+from utils.scorecard import scorecards
+from utils.raiderio_api import (
+    find_character_in_regions,
+    find_stale_character,
+    get_character_details,
+    get_stats,
+    LEAN_FIELDS,
+    PROFILE_ENDPOINT,
+    RaiderIOError,
+    RaiderIORateLimited,
+    RaiderIOTimeout,
+    realm_list,
+)
+from config import (
+    BATCH_CONCURRENCY,
+    BATCH_DEADLINE,
+    BATCH_EDIT_INTERVAL,
+    BATCH_MAX_CHARACTERS,
+    DEFAULT_REGIONS,
+    DETAILS_BUTTON_TIMEOUT,
+    LOOKUP_DEADLINE,
+    PROGRESSIVE_EDIT_INTERVAL,
+    PROGRESSIVE_REPLIES,
+)
 
 logger = logging.getLogger(__name__)
 
-def get_class_color(class_name):
-    """Get the color for a class."""
-    class_colors = {
-        'Warrior': 0xC79C6E,
-        'Paladin': 0xF58CBA,
-        'Hunter': 0xABD473,
-        'Rogue': 0xFFF569,
-        'Priest': 0xFFFFFF,
-        'Death Knight': 0xC41F3B,
-        'Shaman': 0x0070DE,
-        'Mage': 0x69CCF0,
-        'Warlock': 0x9482C9,
-        'Monk': 0x00FF96,
-        'Druid': 0xFF7D0A,
-        'Demon Hunter': 0xA330C9,
-        'Evoker': 0x33937F
-    }
-    return class_colors.get(class_name, 0x0099ff)
+reply_refresher = ReplyRefresher(PROGRESSIVE_EDIT_INTERVAL)
 
 # This function is no longer needed as we're using the FACTION_EMOJIS dictionary from config.py
 
@@ -52,9 +66,22 @@ class CharacterLookupModal(Modal):
         self.add_item(self.character_input)
 
     async def on_submit(self, interaction: discord.Interaction):
+        set_correlation_id(interaction)
+        set_guild(interaction)
+        deadline = Deadline.for_interaction(interaction, LOOKUP_DEADLINE, "raider")
         # Defer the response while we fetch the data
-        await interaction.response.defer(ephemeral=False)
-
+        with deadline.phase("defer"):
+            await interaction.response.defer(ephemeral=False)
+
+        deferred_at = time.perf_counter()
+        try:
+            await self.lookup_and_reply(interaction, deadline)
+        finally:
+            metrics.followup_seconds.observe(time.perf_counter() - deferred_at, "raider")
+            deadline.finish()
+
+    async def lookup_and_reply(self, interaction: discord.Interaction, deadline=None):
+        """Look the character up and send the followup for a deferred interaction."""
         # Parse the input to get character name and server
         input_value = self.character_input.value.strip()
 
@@ -69,285 +96,229 @@ class CharacterLookupModal(Modal):
         # Split the input by the first hyphen
         parts = input_value.split('-', 1)
         character_name = parts[0].strip()
-        realm = parts[1].strip().lower()  # Keep it lowercase but don't replace spaces with hyphens
+        # Fix spacing and punctuation typos ("area52") when the realm is in the bundled list
+        realm = realm_list.slug(parts[1])
+
+        await send_lookup_result(interaction, character_name, realm, deadline=deadline)
+
+async def send_lookup_result(interaction, character_name, realm, regions=None, deadline=None):
+    """
+    Look a character up and send the followup for a deferred interaction.
+
+    The reply always goes out before the deadline: a slow Raider.io gets a
+    "Raider.io is slow" reply, and the scorecard image is left out when
+    there is too little time left to render it.
+
+    Args:
+        interaction (discord.Interaction): The deferred interaction.
+        character_name (str): The name of the character.
+        realm (str): The realm name or slug.
+        regions (list, optional): Regions to try. Defaults to DEFAULT_REGIONS.
+        deadline (Deadline, optional): Time budget of the interaction. Defaults to one of LOOKUP_DEADLINE.
+    """
+    if deadline is None:
+        deadline = Deadline(LOOKUP_DEADLINE, "raider")
+
+    # Answer from a stale cached profile right away, and edit the reply once it has been refreshed
+    if PROGRESSIVE_REPLIES:
+        with deadline.phase("cache"):
+            stale = await find_stale_character(character_name, realm, regions=regions, fields=LEAN_FIELDS)
+        if stale:
+            character_data, age = stale
+            view = CharacterDetailsView(character_data, realm)
+            with deadline.phase("render"):
+                embed = build_character_embed(character_data, cached_age=age)
+                files = await _attach_scorecard(embed, character_data, deadline)
+            with deadline.phase("reply"):
+                message = await interaction.followup.send(embeds=[embed], files=files, view=view, wait=True)
+            reply_refresher.add(message, character_data, realm, view)
+            return
 
-        # Try to find the character in all regions
-        character_data = await find_character_in_regions(character_name, realm)
+    # Try to find the character in all regions
+    try:
+        with deadline.phase("lookup"):
+            character_data = await find_character_in_regions(
+                character_name, realm, regions=regions, fields=LEAN_FIELDS, deadline=deadline
+            )
+    except RaiderIOTimeout as e:
+        logger.warning(f"Raider.io lookup ran out of time for {character_name}-{realm}: {e}")
+        await interaction.followup.send(
+            _slow_lookup_message(character_name, realm, regions, e.checked), ephemeral=True
+        )
+        return
+    except RaiderIORateLimited:
+        await interaction.followup.send(
+            "Raider.io is rate limiting lookups right now. Please try again in a minute.",
+            ephemeral=True
+        )
+        return
+    except RaiderIOError as e:
+        logger.error(f"Raider.io lookup failed for {character_name}-{realm}: {e}")
+        await interaction.followup.send(
+            "Raider.io isn't responding right now. Please try again later.",
+            ephemeral=True
+        )
+        return
 
-        if character_data:
-            # Create the main embed
-            main_embed = discord.Embed(
-                title=f"{character_data['name']} - {character_data['realm']} ({character_data['region'].upper()})",
-                url=character_data['profile_url'],
-                color=get_class_color(character_data['class'])
+    if character_data:
+        with deadline.phase("render"):
+            embed = build_character_embed(character_data)
+            files = await _attach_scorecard(embed, character_data, deadline)
+        with deadline.phase("reply"):
+            await interaction.followup.send(
+                embeds=[embed],
+                files=files,
+                view=CharacterDetailsView(character_data, realm)
             )
+    else:
+        regions_tried = ", ".join([r.upper() for r in regions or DEFAULT_REGIONS])
+        await interaction.followup.send(
+            f"Character **{character_name}** not found on **{realm.replace('-', ' ').title()}** in {regions_tried} regions.",
+            ephemeral=True
+        )
 
-            # Add class icon as author
-            class_name = character_data['class'].lower()
-            # Format class name for URL - replace spaces with empty string and remove special characters
-            formatted_class_name = class_name.replace(' ', '').replace("'", "").replace("-", "")
-            logger.info(f"Using class name for icon URL: {formatted_class_name}")
-            class_icon_url = f"https://wow.zamimg.com/images/wow/icons/large/classicon_{formatted_class_name}.jpg"
+async def _attach_scorecard(embed, profile, deadline):
+    """Attach the scorecard image, unless the deadline leaves no time to render it."""
+    if not deadline.allows_optional():
+        return []
+    return await scorecards.attach(embed, profile)
+
+def _slow_lookup_message(character_name, realm, regions, checked):
+    """The reply for a lookup that ran out of time, saying which regions were checked."""
+    realm_name = realm.replace('-', ' ').title()
+    if not checked:
+        return (
+            f"Raider.io is slow right now and didn't answer in time for **{character_name}**. "
+            "Please try again in a minute."
+        )
 
-            # Set author with name only first, then try to add icon_url
-            main_embed.set_author(
-                name=f"{character_data['active_spec_name']} {character_data['class']}"
+    checked = [region for region in regions or DEFAULT_REGIONS if region in checked]
+    unchecked = [region for region in regions or DEFAULT_REGIONS if region not in checked]
+    return (
+        f"Character **{character_name}** wasn't found on **{realm_name}** in {', '.join(r.upper() for r in checked)}, "
+        f"and Raider.io is too slow right now to check {', '.join(r.upper() for r in unchecked)}. "
+        "Please try again in a minute."
+    )
+
+class CharacterDetailsView(discord.ui.View):
+    """Button that fetches the expensive profile fields only when someone asks for them."""
+
+    def __init__(self, profile, realm):
+        super().__init__(timeout=DETAILS_BUTTON_TIMEOUT)
+        self.profile = profile
+        self.realm = realm
+
+    @discord.ui.button(label="More details", style=discord.ButtonStyle.secondary)
+    async def more_details(self, interaction: discord.Interaction, button: discord.ui.Button):
+        set_correlation_id(interaction)
+        set_guild(interaction)
+        deadline = Deadline.for_interaction(interaction, LOOKUP_DEADLINE, "raider-details")
+        try:
+            with deadline.phase("defer"):
+                await interaction.response.defer(ephemeral=True, thinking=True)
+            await self.send_details(interaction, deadline)
+        finally:
+            deadline.finish()
+
+    async def send_details(self, interaction, deadline):
+        """Fetch the detail fields and send them, or what is already known if Raider.io is too slow."""
+        try:
+            with deadline.phase("lookup"):
+                details = await get_character_details(self.profile, self.realm, deadline=deadline)
+        except RaiderIOTimeout as e:
+            logger.warning(f"Details for {self.profile['name']}-{self.realm} ran out of time: {e}")
+            await interaction.followup.send(
+                "Raider.io is slow right now, so this only shows what the first lookup loaded.",
+                embed=build_details_embed(self.profile),
+                ephemeral=True
+            )
+            return
+        except RaiderIOError as e:
+            logger.error(f"Failed to fetch details for {self.profile['name']}-{self.realm}: {e}")
+            await interaction.followup.send(
+                "Couldn't load more details from Raider.io right now. Please try again later.",
+                ephemeral=True
             )
+            return
 
-            # Try to set icon_url separately with error handling
-            try:
-                main_embed.set_author(
-                    name=f"{character_data['active_spec_name']} {character_data['class']}",
-                    icon_url=class_icon_url
-                )
-                logger.info(f"Successfully set class icon URL: {class_icon_url}")
-            except Exception as e:
-                logger.error(f"Failed to set class icon URL: {e}")
-                # Continue without the icon
-
-            # Add character thumbnail
-            if 'thumbnail_url' in character_data:
-                try:
-                    main_embed.set_thumbnail(url=character_data['thumbnail_url'])
-                    logger.info(f"Successfully set thumbnail URL: {character_data['thumbnail_url']}")
-                except Exception as e:
-                    logger.error(f"Failed to set thumbnail URL: {e}")
-                    # Continue without the thumbnail
-
-            # Add basic character info
-            main_embed.add_field(name="Class", value=character_data['class'], inline=True)
-            main_embed.add_field(name="Race", value=character_data['race'], inline=True)
-            main_embed.add_field(name="Spec", value=character_data['active_spec_name'], inline=True)
-
-            # Add faction if available
-            if 'faction' in character_data:
-                faction = character_data['faction'].lower()
-                # Use the FACTION_EMOJIS dictionary from config.py
-                faction_emoji = FACTION_EMOJIS.get(faction)
-
-                # Fallback to standard emoji if custom emoji not available
-                if not faction_emoji:
-                    faction_emoji = FALLBACK_EMOJIS.get(faction, "🔴" if faction == "horde" else "🔵")
-
-                main_embed.add_field(
-                    name="Faction",
-                    value=f"{faction_emoji} {character_data['faction'].capitalize()}",
-                    inline=True
-                )
-
-            # Add item level if available
-            if 'gear' in character_data and 'item_level_equipped' in character_data['gear']:
-                main_embed.add_field(
-                    name="Item Level",
-                    value=str(character_data['gear']['item_level_equipped']),
-                    inline=True
-                )
-
-            # Add guild if available
-            if 'guild' in character_data and character_data['guild']:
-                guild_text = character_data['guild']['name']
-                if 'realm' in character_data['guild'] and character_data['guild']['realm'] != character_data['realm']:
-                    guild_text += f" ({character_data['guild']['realm']})"
-                main_embed.add_field(
-                    name="Guild",
-                    value=guild_text,
-                    inline=True
-                )
-
-            # Add Mythic+ score if available
-            if 'mythic_plus_scores_by_season' in character_data and character_data['mythic_plus_scores_by_season']:
-                current_season = character_data['mythic_plus_scores_by_season'][0]
-                score = current_season['scores']['all']
-                main_embed.add_field(
-                    name=f"M+ Score ({current_season['season']})",
-                    value=f"[{score}]({character_data['profile_url']})",
-                    inline=True
-                )
-
-            # Add Mythic+ ranks if available
-            if 'mythic_plus_ranks' in character_data:
-                ranks = character_data['mythic_plus_ranks']
-                role = character_data['active_spec_role'].lower() if 'active_spec_role' in character_data else None
-                class_name = character_data['class']
-                spec_name = character_data['active_spec_name']
-                realm_name = character_data['realm']
-
-                # Only show the class-role specific rank (e.g., Protection Paladin)
-                class_role_key = f"class_{role}"
-                if role and class_role_key in ranks:
-                    rank_value = ranks[class_role_key]['realm']
-                    main_embed.add_field(
-                        name=f"{spec_name} {class_name} Realm Rank",
-                        value=f"#{rank_value:,} on {realm_name}",
-                        inline=True
-                    )
-
-            # Add best Mythic+ runs
-            if 'mythic_plus_best_runs' in character_data and character_data['mythic_plus_best_runs']:
-                # Get the top runs based on config
-                max_runs = MAX_MYTHIC_PLUS_RUNS
-                top_runs = sorted(character_data['mythic_plus_best_runs'], key=lambda x: x['score'], reverse=True)[:max_runs]
-
-                # Create a field for the best M+ runs
-                runs_text = ""
-
-                # Add each run to the text with numbering
-                for index, run in enumerate(top_runs):
-                    # Convert dungeon name to title case
-                    dungeon_name = ' '.join(word.capitalize() for word in run['dungeon'].replace('-', ' ').split())
-                    level = run['mythic_level']
-
-                    # Map dungeon names to appropriate emojis
-                    dungeon_emoji = "🏰"  # Default castle emoji
-
-                    # Try to get the custom Discord emoji first
-                    custom_emoji = DUNGEON_EMOJIS.get(dungeon_name)
-
-                    # Fallback to partial matching if exact match not found
-                    if not custom_emoji:
-                        if "Cinderbrew" in dungeon_name:
-                            custom_emoji = DUNGEON_EMOJIS.get('Cinderbrew Meadery')
-                        elif "Darkflame" in dungeon_name:
-                            custom_emoji = DUNGEON_EMOJIS.get('Darkflame Cleft')
-                        elif "Floodgate" in dungeon_name:
-                            custom_emoji = DUNGEON_EMOJIS.get('Operation: Floodgate')
-                        elif "Mechagon" in dungeon_name:
-                            custom_emoji = DUNGEON_EMOJIS.get('Mechagon Workshop')
-                        elif "MOTHERLODE" in dungeon_name:
-                            custom_emoji = DUNGEON_EMOJIS.get('The MOTHERLODE!!')
-                        elif "Priory" in dungeon_name:
-                            custom_emoji = DUNGEON_EMOJIS.get('Priory of the Sacred Flame')
-                        elif "Rookery" in dungeon_name:
-                            custom_emoji = DUNGEON_EMOJIS.get('The Rookery')
-                        elif "Theater" in dungeon_name or "Pain" in dungeon_name:
-                            custom_emoji = DUNGEON_EMOJIS.get('Theater of Pain')
-
-                    # If we have a custom emoji, use it, otherwise fall back to standard emoji
-                    if custom_emoji:
-                        dungeon_emoji = custom_emoji
-                    else:
-                        # Use fallback emoji
-                        fallback_emoji = FALLBACK_EMOJIS.get(dungeon_name, "🏰")
-
-                        # Try partial matching for fallback emoji
-                        if fallback_emoji == "🏰":
-                            if "Cinderbrew" in dungeon_name:
-                                fallback_emoji = FALLBACK_EMOJIS.get('Cinderbrew Meadery')
-                            elif "Darkflame" in dungeon_name:
-                                fallback_emoji = FALLBACK_EMOJIS.get('Darkflame Cleft')
-                            elif "Floodgate" in dungeon_name:
-                                fallback_emoji = FALLBACK_EMOJIS.get('Operation: Floodgate')
-                            elif "Mechagon" in dungeon_name:
-                                fallback_emoji = FALLBACK_EMOJIS.get('Mechagon Workshop')
-                            elif "MOTHERLODE" in dungeon_name:
-                                fallback_emoji = FALLBACK_EMOJIS.get('The MOTHERLODE!!')
-                            elif "Priory" in dungeon_name:
-                                fallback_emoji = FALLBACK_EMOJIS.get('Priory of the Sacred Flame')
-                            elif "Rookery" in dungeon_name:
-                                fallback_emoji = FALLBACK_EMOJIS.get('The Rookery')
-                            elif "Theater" in dungeon_name or "Pain" in dungeon_name:
-                                fallback_emoji = FALLBACK_EMOJIS.get('Theater of Pain')
-
-                        dungeon_emoji = fallback_emoji
-
-                    # Add run number
-                    runs_text += f"**#{index + 1}**\n"
-
-                    # Add the emoji to the text
-                    runs_text += f"{dungeon_emoji} "
-                    logger.info(f"Using emoji for {dungeon_name}: {dungeon_emoji}")
-
-                    # Add run info
-                    if 'url' in run:
-                        runs_text += f"**+{level}** [{dungeon_name}]({run['url']})"
-                    else:
-                        runs_text += f"**+{level}** {dungeon_name}"
-
-                    # Add score if available
-                    if 'score' in run:
-                        runs_text += f"\nScore: {run['score']:.1f}"
-
-                    # Add affixes if available and enabled in config
-                    if SHOW_AFFIXES and 'affixes' in run and run['affixes']:
-                        affix_names = ", ".join([affix['name'] for affix in run['affixes']])
-                        runs_text += f"\nAffixes: {affix_names}"
-
-                    # Add spacing between runs
-                    runs_text += "\n\n"
-
-                # Add the field to the main embed
-                main_embed.add_field(
-                    name="Best M+ Runs",
-                    value=runs_text,
-                    inline=False
-                )
-
-            # Add raid progression if available
-            if 'raid_progression' in character_data:
-                raid_prog = character_data['raid_progression']
-
-                # Get the latest raid (first in the list)
-                if raid_prog and len(raid_prog) > 0:
-                    latest_raid_name = next(iter(raid_prog))
-                    latest_raid = raid_prog[latest_raid_name]
-
-                    if 'summary' in latest_raid and latest_raid['summary']:  # Only show if there's actual progress
-                        main_embed.add_field(
-                            name=f"Raid Progress ({latest_raid_name.replace('-', ' ').title()})",
-                            value=latest_raid['summary'],
-                            inline=False
-                        )
-
-                    # Add a field for total raid progress
-                    total_normal = sum(raid['normal_bosses_killed'] for raid in raid_prog.values())
-                    total_heroic = sum(raid['heroic_bosses_killed'] for raid in raid_prog.values())
-                    total_mythic = sum(raid['mythic_bosses_killed'] for raid in raid_prog.values())
-
-                    main_embed.add_field(
-                        name="Total Raid Progress",
-                        value=f"Normal: {total_normal} | Heroic: {total_heroic} | Mythic: {total_mythic}",
-                        inline=False
-                    )
-
-            # Add achievement points if available
-            if 'achievement_points' in character_data:
-                main_embed.add_field(
-                    name="Achievement Points",
-                    value=f"{character_data['achievement_points']:,}",
-                    inline=True
-                )
-
-            # Add last updated info
-            footer_text = "Data provided by Raider.io"
-            if 'last_crawled_at' in character_data:
-                try:
-                    last_updated = dateutil.parser.parse(character_data['last_crawled_at'])
-                    footer_text = f"Data provided by Raider.io • Last updated: {last_updated.strftime('%Y-%m-%d %H:%M')} UTC"
-                except Exception as e:
-                    logger.error(f"Failed to parse last_crawled_at date: {e}")
-
-            # Set footer with text only first
-            main_embed.set_footer(text=footer_text)
-
-            # Try to add icon_url separately with error handling
-            try:
-                main_embed.set_footer(
-                    text=footer_text,
-                    icon_url="https://cdnassets.raider.io/images/brand/Icon_Light_32.png"
-                )
-                logger.info("Successfully set footer icon URL")
-            except Exception as e:
-                logger.error(f"Failed to set footer icon URL: {e}")
-                # Continue without the icon
-
-            # Send the main embed
-            await interaction.followup.send(embeds=[main_embed])
-        else:
-            regions_tried = ", ".join([r.upper() for r in DEFAULT_REGIONS])
+        if not details:
+            await interaction.followup.send("Raider.io no longer has this character.", ephemeral=True)
+            return
+
+        with deadline.phase("reply"):
+            await interaction.followup.send(embed=build_details_embed(details), ephemeral=True)
+
+class BatchLookupModal(Modal):
+    """Modal for looking up a whole roster on Raider.io."""
+
+    def __init__(self):
+        super().__init__(title="Roster Lookup")
+
+        self.roster_input = TextInput(
+            label="Characters (one Name-Server per line)",
+            style=discord.TextStyle.paragraph,
+            placeholder="CharacterOne-ServerName\nCharacterTwo-ServerName",
+            required=True,
+            min_length=3,
+            max_length=2000
+        )
+        self.add_item(self.roster_input)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        set_correlation_id(interaction)
+        set_guild(interaction)
+        deadline = Deadline.for_interaction(interaction, BATCH_DEADLINE, "raider-batch")
+        with deadline.phase("defer"):
+            await interaction.response.defer(ephemeral=False)
+
+        deferred_at = time.perf_counter()
+        try:
+            await self.lookup_and_reply(interaction, deadline)
+        finally:
+            metrics.followup_seconds.observe(time.perf_counter() - deferred_at, "raider-batch")
+            deadline.finish()
+
+    async def lookup_and_reply(self, interaction: discord.Interaction, deadline=None):
+        """
+        Look the roster up, editing partial results into one message as they arrive.
+
+        Characters still being looked up when the deadline comes are listed as failed.
+        """
+        if deadline is None:
+            deadline = Deadline(BATCH_DEADLINE, "raider-batch")
+        entries, invalid = parse_roster(self.roster_input.value)
+        if not entries:
             await interaction.followup.send(
-                f"Character **{character_name}** not found on **{realm.replace('-', ' ').title()}** in {regions_tried} regions.",
+                "No characters found. Put one `CharacterName-ServerName` per line.",
                 ephemeral=True
             )
+            return
+
+        skipped = len(entries) - BATCH_MAX_CHARACTERS
+        entries = entries[:BATCH_MAX_CHARACTERS]
+        if skipped > 0:
+            invalid = invalid + [f"{skipped} more (limit is {BATCH_MAX_CHARACTERS})"]
+
+        results = []
+        with deadline.phase("reply"):
+            message = await interaction.followup.send(
+                embed=build_roster_embed(results, len(entries), invalid), wait=True
+            )
+
+        # Edit at most once per interval so a fast batch doesn't hit Discord's edit rate limit
+        last_edit = time.monotonic()
+        with deadline.phase("lookup"):
+            async for result in lookup_roster(entries, BATCH_CONCURRENCY, deadline=deadline):
+                results.append(result)
+                if len(results) < len(entries) and time.monotonic() - last_edit >= BATCH_EDIT_INTERVAL:
+                    try:
+                        await message.edit(embed=build_roster_embed(results, len(entries), invalid))
+                    except discord.HTTPException as e:
+                        logger.warning(f"Failed to update roster message with partial results: {e}")
+                    last_edit = time.monotonic()
+
+        with deadline.phase("reply"):
+            await message.edit(embed=build_roster_embed(results, len(entries), invalid))
 
 # We no longer need the server selection classes since we're parsing the input directly
 
@@ -359,6 +330,13 @@ class RaiderCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        # Build the realm index now rather than inside the first autocomplete request
+        realm_list.load()
+
+    async def cog_unload(self):
+        await reply_refresher.close()
+
     @app_commands.command(name="raider", description="Look up a character on Raider.io")
     async def raider(self, interaction: discord.Interaction):
         """Command to look up a character on Raider.io."""
@@ -367,6 +345,173 @@ class RaiderCommands(commands.Cog):
         modal = CharacterLookupModal()
         await interaction.response.send_modal(modal)
 
+    @app_commands.command(name="raider-lookup", description="Look up a character on Raider.io with realm suggestions")
+    @app_commands.describe(
+        name="Character name",
+        realm="Realm, start typing to search",
+        region="Region, if the realm exists in more than one"
+    )
+    async def raider_lookup(self, interaction: discord.Interaction, name: str, realm: str, region: str = None):
+        """Command to look up a character with realm and region autocomplete."""
+        set_correlation_id(interaction)
+        set_guild(interaction)
+        deadline = Deadline.for_interaction(interaction, LOOKUP_DEADLINE, "raider-lookup")
+        with deadline.phase("defer"):
+            await interaction.response.defer(ephemeral=False)
+
+        deferred_at = time.perf_counter()
+        try:
+            realm_slug, regions = resolve_realm_option(realm, region)
+            await send_lookup_result(interaction, name.strip(), realm_slug, regions, deadline)
+        finally:
+            metrics.followup_seconds.observe(time.perf_counter() - deferred_at, "raider-lookup")
+            deadline.finish()
+
+    @raider_lookup.autocomplete('realm')
+    async def realm_autocomplete(self, interaction: discord.Interaction, current: str):
+        region = getattr(interaction.namespace, 'region', None)
+        return [
+            app_commands.Choice(name=f"{realm.name} ({realm.region.upper()})", value=f"{realm.region}/{realm.slug}")
+            for realm in realm_list.search(current, region if region in DEFAULT_REGIONS else None)
+        ]
+
+    @raider_lookup.autocomplete('region')
+    async def region_autocomplete(self, interaction: discord.Interaction, current: str):
+        realm = getattr(interaction.namespace, 'realm', None)
+        regions = resolve_realm_option(realm)[1] if realm else None
+        current = current.strip().lower()
+        return [
+            app_commands.Choice(name=region.upper(), value=region)
+            for region in regions or DEFAULT_REGIONS if region.startswith(current)
+        ]
+
+    @app_commands.command(name="raider-batch", description="Look up a list of characters and rank them")
+    async def raider_batch(self, interaction: discord.Interaction):
+        """Command to look up a roster of characters on Raider.io."""
+        await interaction.response.send_modal(BatchLookupModal())
+
+    @app_commands.command(name="raider-top", description="Show the top characters looked up in this server")
+    @app_commands.guild_only()
+    @app_commands.describe(
+        ranking="What to rank characters by",
+        count="Number of characters to show",
+        page="Page of results, for characters below the top",
+        minimum="Only show characters with at least this value",
+        maximum="Only show characters with at most this value"
+    )
+    @app_commands.choices(ranking=[
+        app_commands.Choice(name="M+ score", value="score"),
+        app_commands.Choice(name="Item level", value="item_level"),
+        app_commands.Choice(name="Realm rank", value="realm_rank"),
+    ])
+    async def raider_top(self, interaction: discord.Interaction, ranking: app_commands.Choice[str] = None,
+                         count: app_commands.Range[int, 1, 25] = 10, page: app_commands.Range[int, 1, 100] = 1,
+                         minimum: float = None, maximum: float = None):
+        """Command to show the server's leaderboard, built from earlier lookups without any Raider.io request."""
+        metric = ranking.value if ranking else 'score'
+        board = leaderboards.get(interaction.guild_id)
+        offset = (page - 1) * count
+        if minimum is None and maximum is None:
+            entries = board.top(metric, count, offset)
+            value_range = None
+        else:
+            entries = board.between(metric, minimum, maximum)[offset:offset + count]
+            value_range = (minimum, maximum)
+
+        await interaction.response.send_message(
+            embed=build_leaderboard_embed(entries, metric, board.ranked(metric), offset, value_range)
+        )
+
+    @app_commands.command(name="raiderstats", description="Show Raider.io lookup statistics (bot owner only)")
+    async def raiderstats(self, interaction: discord.Interaction):
+        """Command to show lookup latency, outcomes and cache statistics."""
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message("Only the bot owner can use this command.", ephemeral=True)
+            return
+
+        await interaction.response.send_message(embed=build_stats_embed(), ephemeral=True)
+
+def resolve_realm_option(realm, region=None):
+    """
+    Turn the realm and region options of /raider-lookup into a slug and the regions to try.
+
+    Args:
+        realm (str): A "region/slug" autocomplete choice, or a realm name typed freehand.
+        region (str, optional): The region option.
+
+    Returns:
+        tuple: (realm slug, list of regions or None to try every default region).
+    """
+    region = region.strip().lower() if region else None
+    if region not in DEFAULT_REGIONS:
+        region = None
+
+    choice_region, _, choice_slug = realm.partition('/')
+    if choice_slug and choice_region in DEFAULT_REGIONS:
+        return choice_slug, [region or choice_region]
+
+    known_realms = realm_list.resolve(realm)
+    if not known_realms:
+        return realm.strip().lower(), [region] if region else None
+
+    if region:
+        return known_realms[0].slug, [region]
+    return known_realms[0].slug, [known.region for known in known_realms if known.region in DEFAULT_REGIONS] or None
+
+def _format_seconds(value):
+    return "n/a" if value is None else f"{value * 1000:.0f} ms"
+
+def build_stats_embed():
+    """Build the embed shown by /raiderstats."""
+    stats = get_stats()
+    embed = discord.Embed(title="Raider.io Lookup Stats", color=0x0099ff)
+
+    lookup_counts = {labels[0]: count for labels, count in metrics.lookup_seconds.counts().items()}
+    embed.add_field(
+        name="Lookups",
+        value=(
+            f"p50 {_format_seconds(metrics.lookup_seconds.quantile(0.5))} | "
+            f"p95 {_format_seconds(metrics.lookup_seconds.quantile(0.95))}\n"
+            + (", ".join(f"{outcome}: {count}" for outcome, count in sorted(lookup_counts.items())) or "None yet")
+        ),
+        inline=False
+    )
+
+    embed.add_field(
+        name="Discord Followups",
+        value=(
+            f"p50 {_format_seconds(metrics.followup_seconds.quantile(0.5))} | "
+            f"p95 {_format_seconds(metrics.followup_seconds.quantile(0.95))}"
+        ),
+        inline=False
+    )
+
+    request_lines = []
+    for (region, endpoint, outcome), count in sorted(metrics.raiderio_requests.values().items()):
+        request_lines.append(f"{region.upper()} {outcome}: {count}")
+    embed.add_field(name="Raider.io Requests", value="\n".join(request_lines) or "None yet", inline=True)
+
+    region_lines = []
+    for region in sorted(stats['regions']):
+        p95 = metrics.raiderio_request_seconds.quantile(0.95, region, PROFILE_ENDPOINT)
+        region_lines.append(f"{region.upper()}: {stats['regions'][region]['state']}, p95 {_format_seconds(p95)}")
+    embed.add_field(name="Regions", value="\n".join(region_lines) or "None yet", inline=True)
+
+    profile_cache = stats['profile_cache']
+    not_found_cache = stats['not_found_cache']
+    embed.add_field(
+        name="Caches",
+        value=(
+            f"Profiles: {profile_cache['hit_ratio']:.0%} hits, {profile_cache['size']}/{profile_cache['max_size']} entries\n"
+            f"Not found: {not_found_cache['hit_ratio']:.0%} hits, {not_found_cache['size']} entries\n"
+            f"Coalesced requests: {stats['coalescing']['shared']}\n"
+            f"Known realms: {stats['known_realms']}\n"
+            f"Leaderboards: {stats['leaderboards']['characters']} characters in {stats['leaderboards']['guilds']} servers"
+        ),
+        inline=False
+    )
+    return embed
+
 async def setup(bot):
     """Add the cog to the bot."""
     await bot.add_cog(RaiderCommands(bot))
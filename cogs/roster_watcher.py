@@ -0,0 +1,367 @@
+"""
+Cog that watches characters in the background and posts when they improve.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from utils.batch_lookup import parse_roster
+from utils.deadline import Deadline
+from utils.character_profile import CharacterProfile
+from utils.embed_builder import build_watch_changes_embed
+from utils.leaderboard import leaderboards, set_guild
+from utils.logging_config import set_correlation_id
+from utils.rate_limiter import PRIORITY_BACKGROUND
+from utils.raiderio_api import (
+    find_character_in_regions,
+    get_character_profile,
+    LEAN_FIELDS,
+    RaiderIOError,
+    RaiderIOTimeout,
+)
+from utils.watch_list import WatchList, diff_snapshots, read_legacy, take_snapshot
+from config import (
+    CLUSTER_WORKER_ID,
+    LOOKUP_DEADLINE,
+    WATCH_LIST_DIR,
+    WATCH_LIST_PATH,
+    WATCH_MAX_PER_CHANNEL,
+    WATCH_MAX_REFRESH_RATE,
+    WATCH_REFRESH_INTERVAL,
+    WATCH_REFRESH_JITTER,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for watch lists another worker changed on disk
+WATCH_SYNC_INTERVAL = 60
+
+class RosterWatcher(commands.Cog):
+    """
+    Refreshes watched characters and posts changes to M+ score, item level and raid progress.
+
+    Every character is refreshed about once per WATCH_REFRESH_INTERVAL, at a
+    jittered time so refreshes stay spread out instead of bunching up. At most
+    WATCH_MAX_REFRESH_RATE refreshes run per minute, at background priority,
+    so interactive lookups always get Raider.io requests first. In a cluster,
+    each worker only watches the servers on its own shards.
+    """
+
+    watch = app_commands.Group(
+        name="watch",
+        description="Post M+ score, item level and raid progress changes to this channel",
+        guild_only=True,
+        default_permissions=discord.Permissions(manage_channels=True)
+    )
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.watch_list = WatchList(WATCH_LIST_DIR, owns=self.owns_guild)
+        # Heap of (due, sequence, key); entries whose due time no longer matches _due are skipped
+        self._schedule = []
+        self._due = {}
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._next_sync = 0.0
+
+        self.refreshes = 0
+        self.unchanged = 0
+        self.posts = 0
+
+    async def cog_load(self):
+        self.watch_list.load()
+        self._next_sync = time.monotonic() + WATCH_SYNC_INTERVAL
+        self._schedule_spread(list(self.watch_list.characters))
+
+        self._task = asyncio.create_task(self._run())
+
+    async def cog_unload(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def owns_guild(self, guild_id):
+        """Whether a server is on one of this process's shards."""
+        shard_ids = getattr(self.bot, 'shard_ids', None)
+        if not shard_ids or not self.bot.shard_count:
+            return True
+        return (guild_id >> 22) % self.bot.shard_count in shard_ids
+
+    def _schedule_spread(self, keys):
+        """Spread the first refresh of new characters evenly over one interval."""
+        random.shuffle(keys)
+        now = time.monotonic()
+        for index, key in enumerate(keys):
+            self._schedule_at(key, now + WATCH_REFRESH_INTERVAL * (index + random.random()) / len(keys))
+
+    def _sync(self):
+        """Pick up watch lists changed on disk and schedule characters that aren't scheduled yet."""
+        self._next_sync = time.monotonic() + WATCH_SYNC_INTERVAL
+        self.watch_list.sync()
+        self._schedule_spread([key for key in self.watch_list.characters if key not in self._due])
+
+    def _schedule_at(self, key, due):
+        self._due[key] = due
+        heapq.heappush(self._schedule, (due, next(self._sequence), key))
+        self._wakeup.set()
+
+    @staticmethod
+    def _next_refresh_time():
+        jitter = random.uniform(1 - WATCH_REFRESH_JITTER, 1 + WATCH_REFRESH_JITTER)
+        return time.monotonic() + WATCH_REFRESH_INTERVAL * jitter
+
+    async def _next_due(self):
+        """Wait for the next character that is due and take it off the schedule."""
+        while True:
+            if time.monotonic() >= self._next_sync:
+                self._sync()
+
+            while self._schedule:
+                due, _, key = self._schedule[0]
+                if self._due.get(key) == due and key in self.watch_list.characters:
+                    break
+                heapq.heappop(self._schedule)
+
+            self._wakeup.clear()
+            sync_in = self._next_sync - time.monotonic()
+            if not self._schedule:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), sync_in)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            delay = due - time.monotonic()
+            if delay <= 0:
+                heapq.heappop(self._schedule)
+                del self._due[key]
+                return key
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), min(delay, sync_in))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self):
+        """Refresh due characters one at a time, no faster than WATCH_MAX_REFRESH_RATE per minute."""
+        await self.bot.wait_until_ready()
+        # Only one process moves an old single-file watch list, the others pick the result up
+        if not CLUSTER_WORKER_ID and os.path.exists(WATCH_LIST_PATH):
+            await self._import_legacy_watch_list()
+
+        spacing = 60 / WATCH_MAX_REFRESH_RATE
+        last_refresh = None
+        while True:
+            key = await self._next_due()
+            if last_refresh is not None:
+                wait = last_refresh + spacing - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            last_refresh = time.monotonic()
+
+            character = self.watch_list.characters.get(key)
+            if character is None:
+                continue
+            set_correlation_id()
+            try:
+                await self.refresh(character)
+            except Exception as e:
+                logger.error(f"Failed to refresh watched character {character.name}-{character.realm}: {e}")
+            finally:
+                if key in self.watch_list.characters and key not in self._due:
+                    self._schedule_at(key, self._next_refresh_time())
+
+    async def _import_legacy_watch_list(self):
+        """Move the single watch list file older versions wrote into per-server files."""
+        try:
+            entries = read_legacy(WATCH_LIST_PATH)
+        except Exception as e:
+            logger.error(f"Failed to read old watch list {WATCH_LIST_PATH}: {e}")
+            return
+
+        guild_ids = {}
+        for channel_id in {channel_id for entry in entries for channel_id in entry.get('channels') or ()}:
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                try:
+                    channel = await self.bot.fetch_channel(channel_id)
+                except (discord.NotFound, discord.Forbidden):
+                    continue
+                except discord.HTTPException as e:
+                    # Keep the old file so the next start tries again
+                    logger.warning(f"Couldn't move old watch list, channel {channel_id} failed to load: {e}")
+                    return
+            guild = getattr(channel, 'guild', None)
+            if guild is not None:
+                guild_ids[channel_id] = guild.id
+
+        imported = self.watch_list.import_entries(entries, guild_ids)
+        os.replace(WATCH_LIST_PATH, f"{WATCH_LIST_PATH}.migrated")
+        logger.info(f"Moved {imported} watch(es) from {WATCH_LIST_PATH} to {WATCH_LIST_DIR}")
+        self._sync()
+
+    async def refresh(self, character):
+        """
+        Refresh one watched character and post its changes.
+
+        Args:
+            character (WatchedCharacter): The character to refresh.
+        """
+        try:
+            profile = await get_character_profile(
+                character.name, character.realm, character.region,
+                fields=LEAN_FIELDS, priority=PRIORITY_BACKGROUND, as_model=True
+            )
+        except RaiderIOError as e:
+            logger.warning(f"Couldn't refresh watched character {character.name}-{character.realm}: {e}")
+            return
+
+        self.refreshes += 1
+        if profile is None:
+            logger.warning(f"Watched character {character.name}-{character.realm} ({character.region}) not found")
+            return
+
+        # Keep the character on the leaderboards of the servers watching it
+        guild_ids = self.watch_list.guilds_of(character.key)
+        if guild_ids:
+            data = profile.to_dict()
+            for guild_id in guild_ids:
+                leaderboards.record(guild_id, data)
+
+        # Raider.io hasn't crawled the character since the last refresh, so nothing can have changed
+        if profile.last_crawled_at and profile.last_crawled_at == character.snapshot.get('last_crawled_at'):
+            self.unchanged += 1
+            return
+
+        snapshot = take_snapshot(profile)
+        changes = diff_snapshots(character.snapshot, snapshot)
+        character.snapshot = snapshot
+        self.watch_list.save_snapshot(character)
+        if not changes:
+            return
+
+        embed = build_watch_changes_embed(profile, changes)
+        for channel_id in sorted(character.channels):
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                continue
+            try:
+                await channel.send(embed=embed)
+                self.posts += 1
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to post watch update to channel {channel_id}: {e}")
+
+    @watch.command(name="add", description="Watch a character in this channel")
+    @app_commands.describe(character="Character as Name-Server")
+    async def watch_add(self, interaction: discord.Interaction, character: str):
+        """Command to start watching a character."""
+        entries, _ = parse_roster(character, max_entries=1)
+        if not entries:
+            await interaction.response.send_message(
+                "Invalid format. Please use the format: `CharacterName-ServerName`", ephemeral=True
+            )
+            return
+
+        self.watch_list.reload(interaction.guild_id)
+        if self.watch_list.count_in_channel(interaction.channel_id) >= WATCH_MAX_PER_CHANNEL:
+            await interaction.response.send_message(
+                f"This channel already watches {WATCH_MAX_PER_CHANNEL} characters.", ephemeral=True
+            )
+            return
+
+        set_correlation_id(interaction)
+        set_guild(interaction)
+        deadline = Deadline.for_interaction(interaction, LOOKUP_DEADLINE, "watch-add")
+        try:
+            await interaction.response.defer(ephemeral=True)
+            await self.add_and_reply(interaction, entries[0], deadline)
+        finally:
+            deadline.finish()
+
+    async def add_and_reply(self, interaction, entry, deadline):
+        """Look a character up within the interaction's deadline and start watching it."""
+        name, realm = entry
+        try:
+            with deadline.phase("lookup"):
+                character_data = await find_character_in_regions(name, realm, fields=LEAN_FIELDS, deadline=deadline)
+        except RaiderIOTimeout as e:
+            logger.warning(f"Raider.io lookup ran out of time for {name}-{realm}: {e}")
+            await interaction.followup.send(
+                f"Raider.io is slow right now and didn't answer in time for **{name}**. "
+                "Please try again in a minute.",
+                ephemeral=True
+            )
+            return
+        except RaiderIOError as e:
+            logger.error(f"Raider.io lookup failed for {name}-{realm}: {e}")
+            await interaction.followup.send(
+                "Raider.io isn't responding right now. Please try again later.", ephemeral=True
+            )
+            return
+
+        if not character_data:
+            await interaction.followup.send(
+                f"Character **{name}** not found on **{realm.title()}**.", ephemeral=True
+            )
+            return
+
+        profile = CharacterProfile.from_dict(character_data)
+        watched, is_new = self.watch_list.add(
+            interaction.guild_id, interaction.channel_id, profile.name, realm, profile.region, take_snapshot(profile)
+        )
+        if is_new:
+            self._schedule_at(watched.key, self._next_refresh_time())
+
+        await interaction.followup.send(
+            f"Watching **{profile.name}** ({profile.realm}, {profile.region.upper()}) in this channel.",
+            ephemeral=True
+        )
+
+    @watch.command(name="remove", description="Stop watching a character in this channel")
+    @app_commands.describe(character="Character as Name-Server")
+    async def watch_remove(self, interaction: discord.Interaction, character: str):
+        """Command to stop watching a character."""
+        entries, _ = parse_roster(character, max_entries=1)
+        removed = self.watch_list.remove(interaction.guild_id, interaction.channel_id, *entries[0]) if entries else None
+        if removed is None:
+            await interaction.response.send_message(
+                f"**{character}** isn't watched in this channel.", ephemeral=True
+            )
+            return
+
+        await interaction.response.send_message(f"Stopped watching **{removed.name}**.", ephemeral=True)
+
+    @watch.command(name="list", description="Show the characters watched in this channel")
+    async def watch_list_command(self, interaction: discord.Interaction):
+        """Command to list the characters watched in this channel."""
+        self.watch_list.reload(interaction.guild_id)
+        characters = self.watch_list.in_channel(interaction.channel_id)
+        if not characters:
+            await interaction.response.send_message("No characters are watched in this channel.", ephemeral=True)
+            return
+
+        lines = [f"{c.name} - {c.realm.title()} ({c.region.upper()})" for c in characters]
+        embed = discord.Embed(
+            title=f"Watched Characters ({len(characters)})",
+            description="\n".join(lines)[:4096],
+            color=0x0099ff
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    """Add the cog to the bot."""
+    await bot.add_cog(RosterWatcher(bot))
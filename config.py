@@ -9,7 +9,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Raider.io API base URL
-RAIDERIO_API_URL = "https://raider.io/api/v1"
+RAIDERIO_API_URL = os.getenv("RAIDERIO_API_URL", "https://raider.io/api/v1")
 RAIDERIO_API_KEY = os.getenv("RAIDERIO_API_KEY")
 
 # Bot command prefix
@@ -21,30 +21,102 @@ BOT_DESCRIPTION = "A Discord bot that provides information about World of Warcra
 # Default regions to try in order
 DEFAULT_REGIONS = ["us", "eu", "kr", "tw"]
 
-# Get emoji IDs from environment variables
+# Probe all regions at once instead of one after another.
+# DEFAULT_REGIONS order still decides which region wins if a character exists in several.
+CONCURRENT_REGION_LOOKUP = os.getenv("CONCURRENT_REGION_LOOKUP", "true").lower() == "true"
+
+# Raider.io HTTP connection pool settings
+RAIDERIO_MAX_CONNECTIONS = int(os.getenv("RAIDERIO_MAX_CONNECTIONS", "100"))
+RAIDERIO_CONNECTIONS_PER_HOST = int(os.getenv("RAIDERIO_CONNECTIONS_PER_HOST", "20"))
+RAIDERIO_DNS_CACHE_TTL = int(os.getenv("RAIDERIO_DNS_CACHE_TTL", "300"))
+RAIDERIO_KEEPALIVE_TIMEOUT = int(os.getenv("RAIDERIO_KEEPALIVE_TIMEOUT", "30"))
+
+# Raider.io time budgets in seconds: connecting, a single request, and a whole multi-region lookup
+RAIDERIO_CONNECT_TIMEOUT = float(os.getenv("RAIDERIO_CONNECT_TIMEOUT", "3"))
+RAIDERIO_REQUEST_TIMEOUT = float(os.getenv("RAIDERIO_REQUEST_TIMEOUT", "8"))
+RAIDERIO_LOOKUP_TIMEOUT = float(os.getenv("RAIDERIO_LOOKUP_TIMEOUT", "20"))
+
+# Time budgets for answering an interaction, counted from when the user submitted it: a lookup and a
+# /raider-batch roster always get a reply within these many seconds (Discord drops deferred interactions
+# after 15 minutes, users much sooner), seconds kept back for sending that reply, and the least time
+# that has to be left to start optional work (other regions, rank fields, the scorecard image)
+LOOKUP_DEADLINE = float(os.getenv("LOOKUP_DEADLINE", "12"))
+BATCH_DEADLINE = float(os.getenv("BATCH_DEADLINE", "120"))
+DEADLINE_REPLY_RESERVE = float(os.getenv("DEADLINE_REPLY_RESERVE", "1.5"))
+DEADLINE_OPTIONAL_MIN = float(os.getenv("DEADLINE_OPTIONAL_MIN", "4"))
+
+# Send a second, hedged copy of a request that hasn't answered after this many seconds (0 disables)
+RAIDERIO_HEDGE_DELAY = float(os.getenv("RAIDERIO_HEDGE_DELAY", "0"))
+
+# Skip a region after this many consecutive failures, and try it again after the reset timeout
+REGION_FAILURE_THRESHOLD = int(os.getenv("REGION_FAILURE_THRESHOLD", "5"))
+REGION_RESET_TIMEOUT = float(os.getenv("REGION_RESET_TIMEOUT", "30"))
+
+# Client-side rate limit for Raider.io requests (requests per second and burst size)
+RAIDERIO_RATE_LIMIT = float(os.getenv("RAIDERIO_RATE_LIMIT", "5"))
+RAIDERIO_RATE_BURST = int(os.getenv("RAIDERIO_RATE_BURST", "20"))
+
+# Retries for throttled (429) and failed (5xx) Raider.io requests
+RAIDERIO_MAX_RETRIES = int(os.getenv("RAIDERIO_MAX_RETRIES", "2"))
+RAIDERIO_RETRY_BASE_DELAY = float(os.getenv("RAIDERIO_RETRY_BASE_DELAY", "0.5"))
+# Give up instead of retrying if Raider.io asks us to wait longer than this (seconds)
+RAIDERIO_MAX_RETRY_WAIT = float(os.getenv("RAIDERIO_MAX_RETRY_WAIT", "10"))
+
+# In-memory profile cache settings
+# Profiles are fresh for PROFILE_CACHE_TTL seconds, then served stale (and refreshed
+# in the background) for another PROFILE_CACHE_STALE_TTL seconds.
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "1024"))
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", "300"))
+PROFILE_CACHE_STALE_TTL = int(os.getenv("PROFILE_CACHE_STALE_TTL", "600"))
+
+# How long to remember that a character doesn't exist in a region
+NEGATIVE_CACHE_TTL = int(os.getenv("NEGATIVE_CACHE_TTL", "120"))
+
+# Directory for data the bot persists between restarts
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
+# Realm to region mappings learned from successful lookups
+REALM_INDEX_PATH = os.getenv("REALM_INDEX_PATH", os.path.join(DATA_DIR, "realm_regions.json"))
+
+# Fingerprint of the last synced command tree; commands are only synced when it changes,
+# or always when FORCE_COMMAND_SYNC is true (same as running bot.py --sync-commands)
+COMMAND_SYNC_STATE_PATH = os.getenv("COMMAND_SYNC_STATE_PATH", os.path.join(DATA_DIR, "command_tree.json"))
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "false").lower() == "true"
+
+# Bundled list of realms per region, used for realm autocomplete
+REALM_LIST_PATH = os.getenv(
+    "REALM_LIST_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "realms.json")
+)
+
+# Season data file with the current dungeons (names, Raider.io ids, emojis and images),
+# checked for changes every SEASON_DATA_RELOAD_INTERVAL seconds (0 disables reloading)
+SEASON_DATA_PATH = os.getenv(
+    "SEASON_DATA_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "season.json")
+)
+IMAGES_DIR = os.getenv("IMAGES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "images"))
+SEASON_DATA_RELOAD_INTERVAL = float(os.getenv("SEASON_DATA_RELOAD_INTERVAL", "30"))
+
+# Optional on-disk cache of profiles and realm regions, so restarts start warm
+PERSISTENT_CACHE_ENABLED = os.getenv("PERSISTENT_CACHE_ENABLED", "false").lower() == "true"
+PERSISTENT_CACHE_PATH = os.getenv("PERSISTENT_CACHE_PATH", os.path.join(DATA_DIR, "cache.sqlite3"))
+# Seconds a stored profile is kept before being expired
+PERSISTENT_CACHE_MAX_AGE = int(os.getenv("PERSISTENT_CACHE_MAX_AGE", "86400"))
+PERSISTENT_CACHE_FLUSH_INTERVAL = float(os.getenv("PERSISTENT_CACHE_FLUSH_INTERVAL", "5"))
+
+# Cluster mode (python cluster.py): worker processes, total shards (0 asks Discord), and the shared
+# SQLite files and sync interval workers use so they share one cache, realm index and rate limit.
+# CLUSTER_WORKER_ID, CLUSTER_SHARD_IDS and CLUSTER_SHARD_COUNT are set for each worker by cluster.py.
+CLUSTER_WORKERS = int(os.getenv("CLUSTER_WORKERS", "2"))
+CLUSTER_SHARDS = int(os.getenv("CLUSTER_SHARDS", "0"))
+CLUSTER_RATE_BUDGET_PATH = os.getenv("CLUSTER_RATE_BUDGET_PATH", os.path.join(DATA_DIR, "rate_budget.sqlite3"))
+CLUSTER_SYNC_INTERVAL = float(os.getenv("CLUSTER_SYNC_INTERVAL", "1"))
+CLUSTER_WORKER_ID = int(os.getenv("CLUSTER_WORKER_ID")) if os.getenv("CLUSTER_WORKER_ID") else None
+CLUSTER_SHARD_IDS = [int(shard) for shard in os.getenv("CLUSTER_SHARD_IDS", "").split(",") if shard.strip()]
+CLUSTER_SHARD_COUNT = int(os.getenv("CLUSTER_SHARD_COUNT", "0"))
+
+# Get faction emoji IDs from environment variables; dungeon emojis are defined in the season data file
 HORDE_EMOJI_ID = os.getenv("HORDE_EMOJI_ID", "1366508841042444368")
 ALLIANCE_EMOJI_ID = os.getenv("ALLIANCE_EMOJI_ID", "1366508892741308638")
-MECHAGON_EMOJI_ID = os.getenv("MECHAGON_EMOJI_ID", "1366478770353078344")
-CINDERBREW_EMOJI_ID = os.getenv("CINDERBREW_EMOJI_ID", "1366478766469156945")
-DARKFLAME_EMOJI_ID = os.getenv("DARKFLAME_EMOJI_ID", "1366478767400161391")
-FLOODGATE_EMOJI_ID = os.getenv("FLOODGATE_EMOJI_ID", "1366478768880746527")
-MOTHERLODE_EMOJI_ID = os.getenv("MOTHERLODE_EMOJI_ID", "1366478771359715508")
-PRIORY_EMOJI_ID = os.getenv("PRIORY_EMOJI_ID", "1366478772295041041")
-ROOKERY_EMOJI_ID = os.getenv("ROOKERY_EMOJI_ID", "1366478773934886912")
-THEATER_EMOJI_ID = os.getenv("THEATER_EMOJI_ID", "1366478775184916480")
-
-# Custom Discord emojis for dungeons
-DUNGEON_EMOJIS = {
-    # Current Season dungeons (Season 2) - custom Discord emojis
-    'Cinderbrew Meadery': f'<:cinderbrew:{CINDERBREW_EMOJI_ID}>',
-    'Darkflame Cleft': f'<:darkflamecleft:{DARKFLAME_EMOJI_ID}>',
-    'Operation: Floodgate': f'<:floodgate:{FLOODGATE_EMOJI_ID}>',
-    'Mechagon Workshop': f'<:mechagon:{MECHAGON_EMOJI_ID}>',
-    'The MOTHERLODE!!': f'<:motherload:{MOTHERLODE_EMOJI_ID}>',
-    'Priory of the Sacred Flame': f'<:priory:{PRIORY_EMOJI_ID}>',
-    'The Rookery': f'<:rookery:{ROOKERY_EMOJI_ID}>',
-    'Theater of Pain': f'<:theaterofpain:{THEATER_EMOJI_ID}>',
-}
 
 # Faction emojis
 FACTION_EMOJIS = {
@@ -54,20 +126,60 @@ FACTION_EMOJIS = {
 
 # Fallback emojis if custom emojis aren't available
 FALLBACK_EMOJIS = {
-    'Cinderbrew Meadery': '🍺',
-    'Darkflame Cleft': '🔥',
-    'Operation: Floodgate': '💧',
-    'Mechagon Workshop': '🤖',
-    'The MOTHERLODE!!': '💰',
-    'Priory of the Sacred Flame': '📜',
-    'The Rookery': '🐦',
-    'Theater of Pain': '🎭',
     'horde': '🔴',
     'alliance': '🔵',
 }
 
+# Local HTTP endpoint serving /metrics in Prometheus text format (0 disables it)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
 # Maximum number of M+ runs to display
 MAX_MYTHIC_PLUS_RUNS = 3
 
 # Whether to show affixes in dungeon run details
 SHOW_AFFIXES = False
+
+# Answer lookups of stale cached profiles right away and edit the reply once the refresh lands,
+# editing replies for the same character at most once per PROGRESSIVE_EDIT_INTERVAL seconds
+PROGRESSIVE_REPLIES = os.getenv("PROGRESSIVE_REPLIES", "true").lower() == "true"
+PROGRESSIVE_EDIT_INTERVAL = float(os.getenv("PROGRESSIVE_EDIT_INTERVAL", "1"))
+
+# Attach a rendered scorecard of the best M+ runs to lookup replies (needs Pillow),
+# rendered on SCORECARD_WORKERS threads with the last SCORECARD_CACHE_SIZE cards kept
+SCORECARD_ENABLED = os.getenv("SCORECARD_ENABLED", "false").lower() == "true"
+SCORECARD_WORKERS = int(os.getenv("SCORECARD_WORKERS", "2"))
+SCORECARD_CACHE_SIZE = int(os.getenv("SCORECARD_CACHE_SIZE", "128"))
+
+# Seconds the "More details" button stays usable after a lookup
+DETAILS_BUTTON_TIMEOUT = 600
+
+# /raider-batch: characters per batch, lookups in flight at once, and seconds between message edits
+BATCH_MAX_CHARACTERS = int(os.getenv("BATCH_MAX_CHARACTERS", "40"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_EDIT_INTERVAL = float(os.getenv("BATCH_EDIT_INTERVAL", "1.5"))
+
+# Roster watcher: directory with one watch list file per server, seconds between refreshes of a
+# character (spread by +/- the jitter fraction), refreshes per minute across all characters, and
+# characters per channel. WATCH_LIST_PATH is the single file older versions used; it is moved
+# into WATCH_LIST_DIR on startup.
+WATCH_LIST_DIR = os.getenv("WATCH_LIST_DIR", os.path.join(DATA_DIR, "watch_lists"))
+WATCH_LIST_PATH = os.getenv("WATCH_LIST_PATH", os.path.join(DATA_DIR, "watch_lists.json"))
+WATCH_REFRESH_INTERVAL = float(os.getenv("WATCH_REFRESH_INTERVAL", "1800"))
+WATCH_REFRESH_JITTER = float(os.getenv("WATCH_REFRESH_JITTER", "0.2"))
+WATCH_MAX_REFRESH_RATE = float(os.getenv("WATCH_MAX_REFRESH_RATE", "20"))
+WATCH_MAX_PER_CHANNEL = int(os.getenv("WATCH_MAX_PER_CHANNEL", "100"))
+
+# /raider-top leaderboards: directory with one file per server, seconds a character stays listed
+# without being looked up again, characters per server, and seconds between writes to disk
+LEADERBOARD_DIR = os.getenv("LEADERBOARD_DIR", os.path.join(DATA_DIR, "leaderboards"))
+LEADERBOARD_MAX_AGE = float(os.getenv("LEADERBOARD_MAX_AGE", "1209600"))
+LEADERBOARD_MAX_PER_GUILD = int(os.getenv("LEADERBOARD_MAX_PER_GUILD", "500"))
+LEADERBOARD_FLUSH_INTERVAL = float(os.getenv("LEADERBOARD_FLUSH_INTERVAL", "60"))
+
+# Logging: level, "kv" for key=value records or "text" for the classic format, share of
+# high-volume per-lookup records to keep, and the most of them per second for each event (0 = no limit)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "kv").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_RATE_LIMIT = float(os.getenv("LOG_RATE_LIMIT", "0"))
@@ -0,0 +1,94 @@
+"""
+Looks up a roster of characters at once, yielding results as they arrive.
+"""
+
+import asyncio
+import logging
+
+from utils.character_profile import CharacterProfile
+from utils.rate_limiter import PRIORITY_BATCH
+from utils.raiderio_api import find_character_in_regions, LEAN_FIELDS, RaiderIOError, realm_list
+
+logger = logging.getLogger(__name__)
+
+def parse_roster(text, max_entries=None):
+    """
+    Parse ``Name-Realm`` entries, one per line or separated by commas.
+
+    Realms are turned into slugs the way single lookups do it, so "area52"
+    and "Area 52" are the same realm. Duplicates (ignoring case and
+    surrounding spaces) are kept once, in the order they first appear.
+
+    Args:
+        text (str): The entries as typed by the user.
+        max_entries (int, optional): Keep at most this many entries.
+
+    Returns:
+        tuple: (entries, invalid) where entries is a list of (name, realm)
+               tuples and invalid is a list of the lines that couldn't be parsed.
+    """
+    entries = []
+    invalid = []
+    seen = set()
+    for raw in text.replace(',', '\n').splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+
+        name, _, realm = line.partition('-')
+        name = name.strip()
+        if not name or not realm.strip():
+            invalid.append(line)
+            continue
+        realm = realm_list.slug(realm)
+
+        key = (name.lower(), realm)
+        if key in seen:
+            continue
+        seen.add(key)
+        entries.append((name, realm))
+
+    if max_entries is not None:
+        entries = entries[:max_entries]
+    return entries, invalid
+
+async def lookup_roster(entries, concurrency, priority=PRIORITY_BATCH, deadline=None):
+    """
+    Look up every entry, at most ``concurrency`` at a time.
+
+    Results are yielded in the order lookups finish, so callers can show
+    partial results without waiting for the slowest one. Lookups still
+    running when the caller stops iterating are cancelled. With a deadline,
+    every lookup ends by the time the roster has to be answered; the ones
+    that didn't make it are yielded with a RaiderIOTimeout.
+
+    Args:
+        entries (list): (name, realm) tuples.
+        concurrency (int): Maximum number of lookups in flight.
+        priority (int, optional): Rate limiter priority. Defaults to PRIORITY_BATCH.
+        deadline (Deadline, optional): Time budget of the interaction the roster answers.
+
+    Yields:
+        tuple: (name, realm, profile, error) where profile is a CharacterProfile
+               or None, and error is the RaiderIOError that stopped the lookup.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def lookup(name, realm):
+        async with semaphore:
+            try:
+                data = await find_character_in_regions(
+                    name, realm, priority=priority, fields=LEAN_FIELDS, deadline=deadline
+                )
+            except RaiderIOError as e:
+                logger.warning(f"Batch lookup failed for {name}-{realm}: {e}")
+                return name, realm, None, e
+        return name, realm, CharacterProfile.from_dict(data) if data else None, None
+
+    tasks = [asyncio.create_task(lookup(name, realm)) for name, realm in entries]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
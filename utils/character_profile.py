@@ -0,0 +1,270 @@
+"""
+Compact, typed view of a Raider.io character profile.
+
+Raider.io profiles carry much more than the embeds show (full gear, affix
+descriptions, image URLs, per-spec ranks). CharacterProfile keeps only the
+projected fields we render, in frozen slotted records with interned strings,
+so holding many profiles at once costs a fraction of the raw dicts.
+"""
+
+import sys
+from dataclasses import dataclass
+
+# Rank keys the embeds render, besides the one for the character's role
+_RANK_KEYS = ('overall', 'class')
+
+def character_key(name, realm, region):
+    """
+    Key a character the way lookups normalize it.
+
+    Args:
+        name (str): The character name.
+        realm (str): The realm/server name.
+        region (str): The region (us, eu, etc.).
+
+    Returns:
+        tuple: The (region, realm, name) key.
+    """
+    return (region.lower(), realm.strip().lower(), name.strip().lower())
+
+def _intern(value):
+    """Intern short repeated strings (classes, realms, dungeons, affixes)."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+@dataclass(frozen=True)
+class Guild:
+    """A character's guild."""
+    __slots__ = ('name', 'realm')
+
+    name: str
+    realm: str
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(name=data['name'], realm=_intern(data.get('realm')))
+
+    def to_dict(self):
+        data = {'name': self.name}
+        if self.realm is not None:
+            data['realm'] = self.realm
+        return data
+
+@dataclass(frozen=True)
+class MythicPlusRun:
+    """One of a character's best Mythic+ runs."""
+    __slots__ = ('dungeon', 'short_name', 'map_challenge_mode_id', 'mythic_level', 'score', 'url',
+                 'num_keystone_upgrades', 'affixes')
+
+    dungeon: str
+    short_name: str
+    map_challenge_mode_id: int
+    mythic_level: int
+    score: float
+    url: str
+    num_keystone_upgrades: int
+    affixes: tuple
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            dungeon=_intern(data['dungeon']),
+            short_name=_intern(data.get('short_name')),
+            map_challenge_mode_id=data.get('map_challenge_mode_id'),
+            mythic_level=data['mythic_level'],
+            score=data.get('score'),
+            url=data.get('url'),
+            num_keystone_upgrades=data.get('num_keystone_upgrades'),
+            affixes=tuple(_intern(affix['name']) for affix in data.get('affixes') or ())
+        )
+
+    def to_dict(self):
+        data = {'dungeon': self.dungeon, 'mythic_level': self.mythic_level}
+        for name in ('short_name', 'map_challenge_mode_id', 'score', 'url', 'num_keystone_upgrades'):
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        data['affixes'] = [{'name': affix} for affix in self.affixes]
+        return data
+
+@dataclass(frozen=True)
+class RaidProgress:
+    """Progress in one raid."""
+    __slots__ = ('slug', 'summary', 'total_bosses', 'normal_bosses_killed', 'heroic_bosses_killed',
+                 'mythic_bosses_killed')
+
+    slug: str
+    summary: str
+    total_bosses: int
+    normal_bosses_killed: int
+    heroic_bosses_killed: int
+    mythic_bosses_killed: int
+
+    @classmethod
+    def from_dict(cls, slug, data):
+        return cls(
+            slug=_intern(slug),
+            summary=_intern(data.get('summary')),
+            total_bosses=data.get('total_bosses', 0),
+            normal_bosses_killed=data.get('normal_bosses_killed', 0),
+            heroic_bosses_killed=data.get('heroic_bosses_killed', 0),
+            mythic_bosses_killed=data.get('mythic_bosses_killed', 0)
+        )
+
+    def to_dict(self):
+        return {
+            'summary': self.summary,
+            'total_bosses': self.total_bosses,
+            'normal_bosses_killed': self.normal_bosses_killed,
+            'heroic_bosses_killed': self.heroic_bosses_killed,
+            'mythic_bosses_killed': self.mythic_bosses_killed,
+        }
+
+@dataclass(frozen=True)
+class MythicPlusRank:
+    """A Mythic+ rank on the realm, in the region and in the world."""
+    __slots__ = ('key', 'realm', 'region', 'world')
+
+    key: str
+    realm: int
+    region: int
+    world: int
+
+    @classmethod
+    def from_dict(cls, key, data):
+        return cls(key=_intern(key), realm=data['realm'], region=data['region'], world=data['world'])
+
+    def to_dict(self):
+        return {'realm': self.realm, 'region': self.region, 'world': self.world}
+
+@dataclass(frozen=True)
+class CharacterProfile:
+    """
+    The parts of a Raider.io profile the bot renders.
+
+    Optional fields are None (or empty tuples) when the profile was fetched
+    without them, so ``to_dict()`` gives back a dict with the same keys the
+    embed builders read from a raw profile.
+    """
+    __slots__ = ('name', 'realm', 'region', 'character_class', 'race', 'active_spec_name', 'active_spec_role',
+                 'faction', 'achievement_points', 'thumbnail_url', 'profile_url', 'last_crawled_at',
+                 'item_level', 'guild', 'season', 'score', 'best_runs', 'raids', 'ranks')
+
+    name: str
+    realm: str
+    region: str
+    character_class: str
+    race: str
+    active_spec_name: str
+    active_spec_role: str
+    faction: str
+    achievement_points: int
+    thumbnail_url: str
+    profile_url: str
+    last_crawled_at: str
+    item_level: float
+    guild: Guild
+    season: str
+    score: float
+    best_runs: tuple
+    raids: tuple
+    ranks: tuple
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Project a raw Raider.io profile.
+
+        Args:
+            data (dict): Profile JSON from Raider.io.
+
+        Returns:
+            CharacterProfile: The projected profile.
+        """
+        gear = data.get('gear') or {}
+        guild = data.get('guild')
+
+        season = score = None
+        seasons = data.get('mythic_plus_scores_by_season')
+        if seasons:
+            season = _intern(seasons[0].get('season'))
+            score = seasons[0].get('scores', {}).get('all')
+
+        ranks = ()
+        raw_ranks = data.get('mythic_plus_ranks')
+        if raw_ranks:
+            role = data.get('active_spec_role')
+            keys = _RANK_KEYS + ((f"class_{role.lower()}",) if role else ())
+            ranks = tuple(MythicPlusRank.from_dict(key, raw_ranks[key]) for key in keys if key in raw_ranks)
+
+        return cls(
+            name=data['name'],
+            realm=_intern(data['realm']),
+            region=_intern(data['region']),
+            character_class=_intern(data['class']),
+            race=_intern(data.get('race')),
+            active_spec_name=_intern(data.get('active_spec_name')),
+            active_spec_role=_intern(data.get('active_spec_role')),
+            faction=_intern(data.get('faction')),
+            achievement_points=data.get('achievement_points'),
+            thumbnail_url=data.get('thumbnail_url'),
+            profile_url=data.get('profile_url'),
+            last_crawled_at=data.get('last_crawled_at'),
+            item_level=gear.get('item_level_equipped'),
+            guild=Guild.from_dict(guild) if guild else None,
+            season=season,
+            score=score,
+            best_runs=tuple(MythicPlusRun.from_dict(run) for run in data.get('mythic_plus_best_runs') or ()),
+            raids=tuple(
+                RaidProgress.from_dict(slug, raid) for slug, raid in (data.get('raid_progression') or {}).items()
+            ),
+            ranks=ranks
+        )
+
+    def rank(self, key):
+        """
+        Get one of the projected ranks.
+
+        Args:
+            key (str): Raider.io rank key, such as ``overall`` or ``class_tank``.
+
+        Returns:
+            MythicPlusRank: The rank, or None if the profile doesn't have it.
+        """
+        for rank in self.ranks:
+            if rank.key == key:
+                return rank
+        return None
+
+    def to_dict(self):
+        """
+        Rebuild a Raider.io-shaped dict with only the projected fields.
+
+        Returns:
+            dict: Profile data the embed builders accept.
+        """
+        data = {
+            'name': self.name,
+            'realm': self.realm,
+            'region': self.region,
+            'class': self.character_class,
+        }
+        for key, value in (('race', self.race), ('active_spec_name', self.active_spec_name),
+                           ('active_spec_role', self.active_spec_role), ('faction', self.faction),
+                           ('achievement_points', self.achievement_points), ('thumbnail_url', self.thumbnail_url),
+                           ('profile_url', self.profile_url), ('last_crawled_at', self.last_crawled_at)):
+            if value is not None:
+                data[key] = value
+
+        if self.item_level is not None:
+            data['gear'] = {'item_level_equipped': self.item_level}
+        if self.guild is not None:
+            data['guild'] = self.guild.to_dict()
+        if self.season is not None:
+            data['mythic_plus_scores_by_season'] = [{'season': self.season, 'scores': {'all': self.score}}]
+        if self.best_runs:
+            data['mythic_plus_best_runs'] = [run.to_dict() for run in self.best_runs]
+        if self.raids:
+            data['raid_progression'] = {raid.slug: raid.to_dict() for raid in self.raids}
+        if self.ranks:
+            data['mythic_plus_ranks'] = {rank.key: rank.to_dict() for rank in self.ranks}
+        return data
@@ -0,0 +1,112 @@
+"""
+Circuit breaker used to skip Raider.io regions that are failing.
+"""
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """
+    Stop calling something after repeated failures, then probe it again later.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    every call is rejected for ``reset_timeout`` seconds. It then lets a
+    single trial call through: success closes it again, failure re-opens it.
+    A trial that gets no result within ``reset_timeout`` is given up, so a
+    lost trial can't keep the breaker half open for good.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        """
+        Args:
+            name (str): Name used in logs, e.g. the region.
+            failure_threshold (int, optional): Consecutive failures before opening.
+            reset_timeout (float, optional): Seconds to stay open before a trial call.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started = 0.0
+
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self):
+        """The current state: closed, open or half_open."""
+        now = time.monotonic()
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+        elif self._trial_in_flight and now - self._trial_started >= self.reset_timeout:
+            logger.warning(f"Giving up the trial call for {self.name} after {self.reset_timeout}s without a result")
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self):
+        """
+        Check whether a call may go through.
+
+        Returns:
+            bool: True if the call should be made.
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+
+        if state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            self._trial_started = time.monotonic()
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        """Record a successful call."""
+        if self._state != CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self._state = CLOSED
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        """Record a failed call."""
+        self._failures += 1
+        self._trial_in_flight = False
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self._failures} failure(s)")
+                self.opened += 1
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self):
+        """Give up a trial call without a result, e.g. when it was cancelled or rate limited."""
+        self._trial_in_flight = False
+
+    def stats(self):
+        """
+        Get the breaker state and counters.
+
+        Returns:
+            dict: State, consecutive failures and counters.
+        """
+        state = self.state
+        return {
+            'state': state,
+            'failures': self._failures,
+            'retry_in': max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)) if state == OPEN else 0.0,
+            'opened': self.opened,
+            'rejected': self.rejected,
+        }
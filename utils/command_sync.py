@@ -0,0 +1,80 @@
+"""
+Syncs the application command tree with Discord only when it has changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+def _command_payload(command, tree):
+    # discord.py 2.4 added the tree argument
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        return command.to_dict()
+
+def command_tree_fingerprint(tree):
+    """
+    Hash the global commands the way they would be sent to Discord.
+
+    Args:
+        tree (discord.app_commands.CommandTree): The bot's command tree.
+
+    Returns:
+        str: Hex digest that changes whenever a command, option or description changes.
+    """
+    payload = sorted(
+        (_command_payload(command, tree) for command in tree.get_commands()),
+        key=lambda command: (command.get('type', 1), command['name'])
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def _load_fingerprints(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable command sync state in {path}: {e}")
+        return {}
+
+def _save_fingerprints(path, fingerprints):
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(fingerprints, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.error(f"Failed to save command sync state to {path}: {e}")
+
+async def sync_if_changed(tree, application_id, path, force=False):
+    """
+    Sync the command tree if it differs from the last one synced for this application.
+
+    Args:
+        tree (discord.app_commands.CommandTree): The bot's command tree.
+        application_id (int): The bot's application id; fingerprints are kept per application.
+        path (str): JSON file the last synced fingerprints are stored in.
+        force (bool, optional): Sync even if the fingerprint is unchanged.
+
+    Returns:
+        int: Number of commands synced, or None if the sync was skipped.
+    """
+    fingerprint = command_tree_fingerprint(tree)
+    fingerprints = _load_fingerprints(path)
+    key = str(application_id)
+    if not force and fingerprints.get(key) == fingerprint:
+        logger.info(f"Command tree unchanged ({fingerprint[:12]}), skipping sync")
+        return None
+
+    synced = await tree.sync()
+    fingerprints[key] = fingerprint
+    _save_fingerprints(path, fingerprints)
+    logger.info(f"Synced {len(synced)} command(s) ({fingerprint[:12]})")
+    return len(synced)
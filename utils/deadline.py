@@ -0,0 +1,164 @@
+"""
+Time budget for answering one Discord interaction.
+"""
+
+import datetime
+import logging
+import time
+from contextlib import contextmanager
+
+from config import DEADLINE_OPTIONAL_MIN, DEADLINE_REPLY_RESERVE
+from utils import metrics
+from utils.logging_config import log_fields
+
+logger = logging.getLogger(__name__)
+
+class Deadline:
+    """
+    How much of an interaction's time budget is left, and where the rest went.
+
+    The budget counts from when the user submitted the interaction, so time
+    spent before the bot got to it counts too. ``reserve`` seconds are kept
+    back for sending the reply: remaining() is the time lookups may still
+    spend, and it reaches zero while there is still time to answer.
+    Raider.io calls cap their timeouts with timeout() and only start optional
+    work while allows_optional() says enough is left.
+    """
+
+    def __init__(self, budget, command, reserve=DEADLINE_REPLY_RESERVE, optional_min=DEADLINE_OPTIONAL_MIN,
+                 elapsed=0.0):
+        """
+        Args:
+            budget (float): Seconds from submission until the user must have a reply.
+            command (str): Command name, used to label the phase metrics.
+            reserve (float, optional): Seconds kept back for sending the reply.
+            optional_min (float, optional): Seconds that must be left to start optional work.
+            elapsed (float, optional): Seconds already spent before the deadline was created.
+        """
+        self.budget = budget
+        self.command = command
+        self.reserve = reserve
+        self.optional_min = optional_min
+        self.started = time.monotonic() - elapsed
+        self.expires_at = self.started + budget
+        self.phases = {}
+        if elapsed > 0:
+            self._record("queued", elapsed)
+
+    @classmethod
+    def for_interaction(cls, interaction, budget, command, **kwargs):
+        """
+        Start the budget of an interaction from the time Discord created it.
+
+        Args:
+            interaction (discord.Interaction): The interaction being answered.
+            budget (float): Seconds from submission until the user must have a reply.
+            command (str): Command name, used to label the phase metrics.
+            **kwargs: Passed on to the constructor.
+
+        Returns:
+            Deadline: The interaction's deadline.
+        """
+        created_at = getattr(interaction, 'created_at', None)
+        elapsed = 0.0
+        if isinstance(created_at, datetime.datetime):
+            now = datetime.datetime.now(datetime.timezone.utc)
+            # Clamped, since the host clock and Discord's don't agree exactly
+            elapsed = min(max(0.0, (now - created_at).total_seconds()), budget)
+        return cls(budget, command, elapsed=elapsed, **kwargs)
+
+    def remaining(self):
+        """Seconds left for work before the reply has to go out."""
+        return max(0.0, self.expires_at - self.reserve - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self, limit):
+        """
+        Shrink a timeout to the time that is left.
+
+        Args:
+            limit (float): The timeout that would apply without a deadline, or None for no limit.
+
+        Returns:
+            float: The smaller of ``limit`` and the remaining time.
+        """
+        remaining = self.remaining()
+        return remaining if limit is None else min(limit, remaining)
+
+    def allows_optional(self):
+        """Whether enough time is left to start work the reply can do without."""
+        return self.remaining() >= self.optional_min
+
+    def _record(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        metrics.deadline_phase_seconds.observe(seconds, self.command, phase)
+
+    @contextmanager
+    def phase(self, name):
+        """Record the time spent in a block as one phase of the budget."""
+        started = time.monotonic()
+        try:
+            yield self
+        finally:
+            self._record(name, time.monotonic() - started)
+
+    def finish(self):
+        """
+        Record whether the reply went out within the budget, and where the time went.
+
+        Returns:
+            bool: True if the reply was in time.
+        """
+        spent = time.monotonic() - self.started
+        on_time = spent <= self.budget
+        metrics.deadline_replies.inc(self.command, "on_time" if on_time else "late")
+        level = logging.INFO if on_time else logging.WARNING
+        logger.log(level, "Interaction budget spent", extra=log_fields(
+            "deadline.spent", command=self.command, budget=self.budget, spent=round(spent, 3),
+            **{phase: round(seconds, 3) for phase, seconds in self.phases.items()}
+        ))
+        return on_time
+
+class SharedDeadline:
+    """
+    The most generous deadline of the callers sharing one request.
+
+    Offers the remaining()/expired/timeout() part of Deadline that Raider.io
+    calls use, so shared work keeps going while any caller still has time,
+    and has no limit once a caller without a deadline joins. Each caller
+    still stops waiting at its own deadline.
+    """
+
+    def __init__(self):
+        self._deadlines = []
+        self._unbounded = False
+
+    def add(self, deadline):
+        """
+        Add the deadline of a caller that joined.
+
+        Args:
+            deadline (Deadline): The caller's deadline, or None if it has none.
+        """
+        if deadline is None:
+            self._unbounded = True
+        else:
+            self._deadlines.append(deadline)
+
+    def remaining(self):
+        """Seconds left for work, by the most generous deadline."""
+        if self._unbounded or not self._deadlines:
+            return float('inf')
+        return max(deadline.remaining() for deadline in self._deadlines)
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self, limit):
+        """Shrink a timeout to the time the most generous deadline leaves."""
+        remaining = self.remaining()
+        return remaining if limit is None or remaining < limit else limit
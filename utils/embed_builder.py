@@ -0,0 +1,476 @@
+"""
+Builds the Discord embed shown for a Raider.io character profile.
+"""
+
+from collections import OrderedDict
+
+import dateutil.parser
+import discord
+
+from config import FALLBACK_EMOJIS, FACTION_EMOJIS, IMAGES_DIR, MAX_MYTHIC_PLUS_RUNS, SEASON_DATA_PATH, SHOW_AFFIXES
+from utils.character_profile import CharacterProfile
+from utils.season_data import DEFAULT_DUNGEON_EMOJI, SeasonData
+
+CLASS_COLORS = {
+    'Warrior': 0xC79C6E,
+    'Paladin': 0xF58CBA,
+    'Hunter': 0xABD473,
+    'Rogue': 0xFFF569,
+    'Priest': 0xFFFFFF,
+    'Death Knight': 0xC41F3B,
+    'Shaman': 0x0070DE,
+    'Mage': 0x69CCF0,
+    'Warlock': 0x9482C9,
+    'Monk': 0x00FF96,
+    'Druid': 0xFF7D0A,
+    'Demon Hunter': 0xA330C9,
+    'Evoker': 0x33937F
+}
+
+FOOTER_ICON_URL = "https://cdnassets.raider.io/images/brand/Icon_Light_32.png"
+
+_FACTION_EMOJIS = {
+    faction: FACTION_EMOJIS.get(faction) or FALLBACK_EMOJIS.get(faction, "🔴" if faction == "horde" else "🔵")
+    for faction in ('horde', 'alliance')
+}
+
+# Dungeons of the current season, reloaded by the bot when the file changes
+season_data = SeasonData(SEASON_DATA_PATH, IMAGES_DIR)
+
+# Built embeds keyed by (profile, last_crawled_at, season data version)
+_EMBED_CACHE_SIZE = 256
+_embed_cache = OrderedDict()
+
+def get_class_color(class_name):
+    """Get the color for a class."""
+    return CLASS_COLORS.get(class_name, 0x0099ff)
+
+def get_dungeon(run):
+    """
+    Get the season's dungeon for a Raider.io run.
+
+    Args:
+        run (dict): A run from ``mythic_plus_best_runs``.
+
+    Returns:
+        Dungeon: The dungeon, or None if the season data doesn't list it.
+    """
+    return season_data.for_run(run)
+
+def get_faction_emoji(faction):
+    """Get the emoji for a faction."""
+    faction = faction.lower()
+    return _FACTION_EMOJIS.get(faction) or FALLBACK_EMOJIS.get(faction, "🔴" if faction == "horde" else "🔵")
+
+def build_character_embed(profile, cached_age=None):
+    """
+    Build the embed for a character profile.
+
+    Embeds are memoized on the profile, its ``last_crawled_at``, the fields
+    it holds and the season data version, so looking up an unchanged
+    character again reuses the embed that was already built.
+
+    Args:
+        profile (dict | CharacterProfile): Character profile data from Raider.io.
+        cached_age (float, optional): Seconds since a cached profile was fetched; shown
+            in the footer when the reply is sent before the profile is refreshed.
+
+    Returns:
+        discord.Embed: The embed to send.
+    """
+    if isinstance(profile, CharacterProfile):
+        profile = profile.to_dict()
+
+    cache_key = None
+    embed = None
+    if profile.get('last_crawled_at'):
+        cache_key = (profile.get('profile_url'), profile['last_crawled_at'], tuple(profile), season_data.version)
+        embed = _embed_cache.get(cache_key)
+        if embed is not None:
+            _embed_cache.move_to_end(cache_key)
+
+    if embed is None:
+        embed = _render_character_embed(profile)
+        if cache_key is not None:
+            _embed_cache[cache_key] = embed
+            if len(_embed_cache) > _EMBED_CACHE_SIZE:
+                _embed_cache.popitem(last=False)
+
+    if cache_key is not None:
+        embed = embed.copy()
+    if cached_age is not None:
+        embed.set_footer(
+            text=f"{_footer_text(profile)} • Cached {_format_age(cached_age)} ago",
+            icon_url=FOOTER_ICON_URL
+        )
+    return embed
+
+def _render_character_embed(character_data):
+    """Render a character profile into a new embed."""
+    main_embed = discord.Embed(
+        title=f"{character_data['name']} - {character_data['realm']} ({character_data['region'].upper()})",
+        url=character_data['profile_url'],
+        color=get_class_color(character_data['class'])
+    )
+
+    # Class icon as author, class name formatted for the URL
+    formatted_class_name = character_data['class'].lower().replace(' ', '').replace("'", "").replace("-", "")
+    main_embed.set_author(
+        name=f"{character_data['active_spec_name']} {character_data['class']}",
+        icon_url=f"https://wow.zamimg.com/images/wow/icons/large/classicon_{formatted_class_name}.jpg"
+    )
+
+    if 'thumbnail_url' in character_data:
+        main_embed.set_thumbnail(url=character_data['thumbnail_url'])
+
+    # Add basic character info
+    main_embed.add_field(name="Class", value=character_data['class'], inline=True)
+    main_embed.add_field(name="Race", value=character_data['race'], inline=True)
+    main_embed.add_field(name="Spec", value=character_data['active_spec_name'], inline=True)
+
+    # Add faction if available
+    if 'faction' in character_data:
+        main_embed.add_field(
+            name="Faction",
+            value=f"{get_faction_emoji(character_data['faction'])} {character_data['faction'].capitalize()}",
+            inline=True
+        )
+
+    # Add item level if available
+    if 'gear' in character_data and 'item_level_equipped' in character_data['gear']:
+        main_embed.add_field(
+            name="Item Level",
+            value=str(character_data['gear']['item_level_equipped']),
+            inline=True
+        )
+
+    # Add guild if available
+    if 'guild' in character_data and character_data['guild']:
+        guild_text = character_data['guild']['name']
+        if 'realm' in character_data['guild'] and character_data['guild']['realm'] != character_data['realm']:
+            guild_text += f" ({character_data['guild']['realm']})"
+        main_embed.add_field(
+            name="Guild",
+            value=guild_text,
+            inline=True
+        )
+
+    # Add Mythic+ score if available
+    if 'mythic_plus_scores_by_season' in character_data and character_data['mythic_plus_scores_by_season']:
+        current_season = character_data['mythic_plus_scores_by_season'][0]
+        score = current_season['scores']['all']
+        main_embed.add_field(
+            name=f"M+ Score ({current_season['season']})",
+            value=f"[{score}]({character_data['profile_url']})",
+            inline=True
+        )
+
+    # Add Mythic+ ranks if available
+    if 'mythic_plus_ranks' in character_data:
+        ranks = character_data['mythic_plus_ranks']
+        role = character_data['active_spec_role'].lower() if 'active_spec_role' in character_data else None
+
+        # Only show the class-role specific rank (e.g., Protection Paladin)
+        class_role_key = f"class_{role}"
+        if role and class_role_key in ranks:
+            rank_value = ranks[class_role_key]['realm']
+            main_embed.add_field(
+                name=f"{character_data['active_spec_name']} {character_data['class']} Realm Rank",
+                value=f"#{rank_value:,} on {character_data['realm']}",
+                inline=True
+            )
+
+    # Add best Mythic+ runs
+    if 'mythic_plus_best_runs' in character_data and character_data['mythic_plus_best_runs']:
+        top_runs = sorted(character_data['mythic_plus_best_runs'], key=lambda x: x['score'], reverse=True)
+        main_embed.add_field(
+            name="Best M+ Runs",
+            value=_format_runs(top_runs[:MAX_MYTHIC_PLUS_RUNS]),
+            inline=False
+        )
+
+    # Add raid progression if available
+    raid_prog = character_data.get('raid_progression')
+    if raid_prog:
+        # The latest raid is first in the list
+        latest_raid_name = next(iter(raid_prog))
+        latest_raid = raid_prog[latest_raid_name]
+
+        if 'summary' in latest_raid and latest_raid['summary']:  # Only show if there's actual progress
+            main_embed.add_field(
+                name=f"Raid Progress ({latest_raid_name.replace('-', ' ').title()})",
+                value=latest_raid['summary'],
+                inline=False
+            )
+
+        # Lean profiles only hold the current tier, where the total would repeat the line above
+        if len(raid_prog) > 1:
+            main_embed.add_field(
+                name="Total Raid Progress",
+                value=_total_raid_progress(raid_prog),
+                inline=False
+            )
+
+    # Add achievement points if available
+    if 'achievement_points' in character_data:
+        main_embed.add_field(
+            name="Achievement Points",
+            value=f"{character_data['achievement_points']:,}",
+            inline=True
+        )
+
+    main_embed.set_footer(text=_footer_text(character_data), icon_url=FOOTER_ICON_URL)
+    return main_embed
+
+def build_details_embed(profile):
+    """
+    Build the "More details" embed: realm ranks, every M+ run and the full raid history.
+
+    Args:
+        profile (dict | CharacterProfile): Character profile data including the detail fields.
+
+    Returns:
+        discord.Embed: The embed to send.
+    """
+    if isinstance(profile, CharacterProfile):
+        profile = profile.to_dict()
+
+    embed = discord.Embed(
+        title=f"{profile['name']} - {profile['realm']} ({profile['region'].upper()}) Details",
+        url=profile['profile_url'],
+        color=get_class_color(profile['class'])
+    )
+
+    ranks = profile.get('mythic_plus_ranks')
+    if ranks:
+        role = profile['active_spec_role'].lower() if 'active_spec_role' in profile else None
+        rank_lines = []
+        for key, label in (('overall', "Overall"), ('class', profile['class']),
+                           (f"class_{role}", f"{profile['active_spec_name']} {profile['class']}")):
+            if key in ranks:
+                rank = ranks[key]
+                rank_lines.append(
+                    f"**{label}**: #{rank['realm']:,} realm | #{rank['region']:,} region | #{rank['world']:,} world"
+                )
+        if rank_lines:
+            embed.add_field(name="M+ Ranks", value="\n".join(rank_lines), inline=False)
+
+    runs = profile.get('mythic_plus_best_runs')
+    if runs:
+        runs = sorted(runs, key=lambda x: x['score'], reverse=True)
+        _add_chunked_field(embed, "All M+ Runs", _format_runs(runs, show_affixes=True).strip().split("\n\n"))
+
+    raid_prog = profile.get('raid_progression')
+    if raid_prog:
+        raid_lines = [
+            f"**{name.replace('-', ' ').title()}**: {raid['summary']}"
+            for name, raid in raid_prog.items()
+        ]
+        _add_chunked_field(embed, "Raid History", raid_lines)
+        embed.add_field(name="Total Raid Progress", value=_total_raid_progress(raid_prog), inline=False)
+
+    embed.set_footer(text=_footer_text(profile), icon_url=FOOTER_ICON_URL)
+    return embed
+
+def build_roster_embed(results, total, invalid=()):
+    """
+    Build the /raider-batch leaderboard, sorted by M+ score and then item level.
+
+    Args:
+        results (list): (name, realm, profile, error) tuples for the lookups done so far,
+                        where profile is a CharacterProfile or None.
+        total (int): Number of characters being looked up.
+        invalid (list, optional): Entries that couldn't be parsed.
+
+    Returns:
+        discord.Embed: The embed to send or edit in.
+    """
+    done = len(results) == total
+    found = [profile for _, _, profile, _ in results if profile is not None]
+    found.sort(key=lambda profile: (profile.score or 0, profile.item_level or 0), reverse=True)
+
+    embed = discord.Embed(
+        title=f"Roster Leaderboard ({len(results)}/{total} looked up)",
+        color=0x2ECC71 if done else 0x0099ff
+    )
+
+    lines = []
+    for index, profile in enumerate(found):
+        score = f"{profile.score:,.1f}" if profile.score is not None else "no score"
+        item_level = f"{profile.item_level:.1f} ilvl" if profile.item_level is not None else "? ilvl"
+        lines.append(
+            f"**{index + 1}.** [{profile.name}]({profile.profile_url}) • {score} • {item_level} • "
+            f"{profile.active_spec_name} {profile.character_class} ({profile.region.upper()})"
+        )
+    _set_truncated_description(embed, lines)
+
+    not_found = [f"{name}-{realm}" for name, realm, profile, error in results if profile is None and error is None]
+    failed = [f"{name}-{realm}" for name, realm, profile, error in results if error is not None]
+    for name, entries in (("Not Found", not_found), ("Lookup Failed", failed), ("Couldn't Parse", list(invalid))):
+        if entries:
+            embed.add_field(name=name, value=_truncate(", ".join(entries), 1024), inline=False)
+
+    embed.set_footer(
+        text="Data provided by Raider.io" if done else "Data provided by Raider.io • More results on the way",
+        icon_url=FOOTER_ICON_URL
+    )
+    return embed
+
+LEADERBOARD_TITLES = {
+    'score': "M+ Score",
+    'item_level': "Item Level",
+    'realm_rank': "Realm Rank",
+}
+
+def build_leaderboard_embed(entries, metric, ranked, offset=0, value_range=None):
+    """
+    Build the /raider-top leaderboard for one server.
+
+    Args:
+        entries (list): LeaderboardEntry objects to show, best first.
+        metric (str): The metric the entries are ranked by.
+        ranked (int): Number of characters on the server's leaderboard for this metric.
+        offset (int, optional): Position of the first entry, for numbering.
+        value_range (tuple, optional): (low, high) bounds the entries were filtered by.
+
+    Returns:
+        discord.Embed: The embed to send.
+    """
+    title = f"Top {LEADERBOARD_TITLES[metric]}"
+    if value_range:
+        low, high = value_range
+        title += f" ({'…' if low is None else f'{low:g}'} to {'…' if high is None else f'{high:g}'})"
+    embed = discord.Embed(title=title, color=0x0099ff)
+
+    lines = []
+    for index, entry in enumerate(entries, start=offset + 1):
+        score = f"{entry.score:,.1f}" if entry.score is not None else "no score"
+        item_level = f"{entry.item_level:.1f} ilvl" if entry.item_level is not None else "? ilvl"
+        realm_rank = f"#{entry.realm_rank:,} on realm" if entry.realm_rank is not None else "unranked"
+        values = {'score': score, 'item_level': item_level, 'realm_rank': realm_rank}
+        shown = [values[metric]] + [value for key, value in values.items() if key != metric]
+        lines.append(
+            f"**{index}.** [{entry.name}]({entry.profile_url}) • " + " • ".join(shown) +
+            f" • {entry.character_class} ({entry.realm}, {entry.region.upper()})"
+        )
+    if not lines:
+        lines.append("No characters looked up in this server match yet. Use `/raider` to add some.")
+    _set_truncated_description(embed, lines)
+
+    embed.set_footer(
+        text=f"{ranked} character(s) ranked • Updated from lookups in this server • Data provided by Raider.io",
+        icon_url=FOOTER_ICON_URL
+    )
+    return embed
+
+def build_watch_changes_embed(profile, changes):
+    """
+    Build the roster watcher's post for a character whose watched fields changed.
+
+    Args:
+        profile (CharacterProfile): The refreshed profile.
+        changes (list): (label, old value, new value) tuples.
+
+    Returns:
+        discord.Embed: The embed to post.
+    """
+    embed = discord.Embed(
+        title=f"{profile.name} - {profile.realm} ({profile.region.upper()})",
+        url=profile.profile_url,
+        color=get_class_color(profile.character_class),
+        description="\n".join(
+            f"**{label}**: {_format_watched_value(before)} → {_format_watched_value(after)}"
+            for label, before, after in changes
+        )
+    )
+    embed.set_footer(text=_footer_text({'last_crawled_at': profile.last_crawled_at}), icon_url=FOOTER_ICON_URL)
+    return embed
+
+def _format_watched_value(value):
+    if value is None:
+        return "—"
+    if isinstance(value, float):
+        return f"{value:,.1f}"
+    return str(value)
+
+def _set_truncated_description(embed, lines, limit=4096):
+    """Use the lines as the description, dropping the ones past Discord's limit."""
+    description = ""
+    for index, line in enumerate(lines):
+        remaining = len(lines) - index
+        more = f"\n…and {remaining} more"
+        if len(description) + len(line) + 1 + len(more) > limit:
+            description += more
+            break
+        description += ("\n" if description else "") + line
+    embed.description = description or "No characters found yet."
+
+def _truncate(text, limit):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def _add_chunked_field(embed, name, entries, limit=1024):
+    """Add entries as one field, split over continuation fields if they exceed Discord's limit."""
+    chunk = ""
+    for entry in entries:
+        separator = "\n\n" if "\n" in entry else "\n"
+        candidate = f"{chunk}{separator}{entry}" if chunk else entry
+        if len(candidate) > limit and chunk:
+            embed.add_field(name=name, value=chunk, inline=False)
+            name = f"{name} (cont.)" if not name.endswith("(cont.)") else name
+            candidate = entry
+        chunk = candidate
+    if chunk:
+        embed.add_field(name=name, value=chunk[:limit], inline=False)
+
+def _total_raid_progress(raid_prog):
+    """Bosses killed per difficulty across every raid."""
+    total_normal = sum(raid['normal_bosses_killed'] for raid in raid_prog.values())
+    total_heroic = sum(raid['heroic_bosses_killed'] for raid in raid_prog.values())
+    total_mythic = sum(raid['mythic_bosses_killed'] for raid in raid_prog.values())
+    return f"Normal: {total_normal} | Heroic: {total_heroic} | Mythic: {total_mythic}"
+
+def _format_runs(runs, show_affixes=SHOW_AFFIXES):
+    """Format M+ runs as numbered entries with dungeon emojis."""
+    runs_text = ""
+    for index, run in enumerate(runs):
+        dungeon = get_dungeon(run)
+        dungeon_name = dungeon.name if dungeon else run['dungeon']
+        level = run['mythic_level']
+
+        runs_text += f"**#{index + 1}**\n"
+        runs_text += f"{dungeon.display_emoji if dungeon else DEFAULT_DUNGEON_EMOJI} "
+
+        if 'url' in run:
+            runs_text += f"**+{level}** [{dungeon_name}]({run['url']})"
+        else:
+            runs_text += f"**+{level}** {dungeon_name}"
+
+        if 'score' in run:
+            runs_text += f"\nScore: {run['score']:.1f}"
+
+        if show_affixes and 'affixes' in run and run['affixes']:
+            affix_names = ", ".join([affix['name'] for affix in run['affixes']])
+            runs_text += f"\nAffixes: {affix_names}"
+
+        # Add spacing between runs
+        runs_text += "\n\n"
+    return runs_text
+
+def _format_age(seconds):
+    """Short age such as 45s, 12m or 3h."""
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds // 60:.0f}m"
+    return f"{seconds // 3600:.0f}h"
+
+def _footer_text(character_data):
+    """Footer with the time Raider.io last crawled the character, if it can be parsed."""
+    footer_text = "Data provided by Raider.io"
+    if character_data.get('last_crawled_at'):
+        try:
+            last_updated = dateutil.parser.parse(character_data['last_crawled_at'])
+            footer_text = f"Data provided by Raider.io • Last updated: {last_updated.strftime('%Y-%m-%d %H:%M')} UTC"
+        except (ValueError, OverflowError):
+            pass
+    return footer_text
@@ -0,0 +1,44 @@
+"""
+JSON encoding and decoding, using orjson when it is installed and the standard library otherwise.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Name of the decoder in use, for logs and benchmarks
+BACKEND = "orjson" if orjson is not None else "json"
+
+def loads(data):
+    """
+    Decode JSON.
+
+    Args:
+        data (str | bytes): The JSON document.
+
+    Returns:
+        The decoded value.
+
+    Raises:
+        ValueError: If the document isn't valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(value):
+    """
+    Encode a value as compact JSON.
+
+    Args:
+        value: The value to encode.
+
+    Returns:
+        bytes: UTF-8 encoded JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
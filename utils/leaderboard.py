@@ -0,0 +1,438 @@
+"""
+Per-server leaderboards of the characters looked up in each Discord server.
+
+Every profile a lookup returns is recorded for the server the lookup came
+from, so /raider-top answers from memory without any Raider.io request.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+from config import LEADERBOARD_DIR, LEADERBOARD_FLUSH_INTERVAL, LEADERBOARD_MAX_AGE, LEADERBOARD_MAX_PER_GUILD
+from utils.character_profile import character_key
+
+logger = logging.getLogger(__name__)
+
+# Server the current interaction came from, inherited by the tasks it starts
+current_guild = contextvars.ContextVar('leaderboard_guild', default=None)
+
+# Leaderboard metrics, and whether higher values rank first
+METRICS = {
+    'score': True,
+    'item_level': True,
+    'realm_rank': False,
+}
+
+def set_guild(interaction=None):
+    """
+    Record profiles looked up by the current task on the leaderboard of an interaction's server.
+
+    Args:
+        interaction (discord.Interaction, optional): The interaction being handled;
+            lookups outside a server aren't recorded.
+
+    Returns:
+        int: The server id, or None.
+    """
+    guild_id = getattr(interaction, 'guild_id', None)
+    guild_id = guild_id if isinstance(guild_id, int) else None
+    current_guild.set(guild_id)
+    return guild_id
+
+@dataclass(frozen=True)
+class LeaderboardEntry:
+    """A character's ranked values as of its last lookup."""
+    __slots__ = ('name', 'realm', 'region', 'character_class', 'profile_url', 'score', 'item_level',
+                 'realm_rank', 'updated_at')
+
+    name: str
+    realm: str
+    region: str
+    character_class: str
+    profile_url: str
+    score: float
+    item_level: float
+    realm_rank: int
+    updated_at: float
+
+    @property
+    def key(self):
+        return character_key(self.name, self.realm, self.region)
+
+    @classmethod
+    def from_profile(cls, data, previous=None, now=None):
+        """
+        Take the ranked values from a Raider.io profile.
+
+        Lookups don't always request every field (the "More details" lookup
+        has ranks but no score or gear), so values the profile lacks are kept
+        from the previous entry.
+
+        Args:
+            data (dict): Profile JSON from Raider.io.
+            previous (LeaderboardEntry, optional): The character's current entry.
+            now (float, optional): Wall clock time of the lookup. Defaults to now.
+
+        Returns:
+            LeaderboardEntry: The updated entry.
+        """
+        score = item_level = realm_rank = None
+        seasons = data.get('mythic_plus_scores_by_season')
+        if seasons:
+            score = seasons[0].get('scores', {}).get('all')
+        gear = data.get('gear')
+        if gear:
+            item_level = gear.get('item_level_equipped')
+        ranks = data.get('mythic_plus_ranks')
+        if ranks and 'overall' in ranks:
+            # Raider.io reports 0 for characters without a rank
+            realm_rank = ranks['overall'].get('realm') or None
+
+        if previous is not None:
+            score = previous.score if score is None else score
+            item_level = previous.item_level if item_level is None else item_level
+            realm_rank = previous.realm_rank if realm_rank is None else realm_rank
+
+        return cls(
+            name=data['name'],
+            realm=data['realm'],
+            region=data['region'],
+            character_class=data.get('class') or (previous.character_class if previous else None),
+            profile_url=data.get('profile_url') or (previous.profile_url if previous else None),
+            score=score,
+            item_level=item_level,
+            realm_rank=realm_rank,
+            updated_at=time.time() if now is None else now
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class SortedIndex:
+    """
+    Character keys ordered by one metric, in parallel sorted lists.
+
+    Values are stored negated for metrics where higher ranks first, so both
+    kinds are kept in ascending order and looked up with bisect.
+    """
+
+    def __init__(self, descending):
+        self.descending = descending
+        self._values = []
+        self._keys = []
+
+    def _sort_value(self, value):
+        return -value if self.descending else value
+
+    def add(self, value, key):
+        """Insert a key with its value; keys with equal values are ordered by key."""
+        sort_value = self._sort_value(value)
+        index = self._position(sort_value, key)
+        self._values.insert(index, sort_value)
+        self._keys.insert(index, key)
+
+    def _position(self, sort_value, key):
+        """Index where (sort_value, key) is or would be inserted."""
+        index = bisect_left(self._values, sort_value)
+        end = bisect_right(self._values, sort_value, index)
+        while index < end and self._keys[index] < key:
+            index += 1
+        return index
+
+    def remove(self, value, key):
+        """Remove a key that was added with this value."""
+        index = self._position(self._sort_value(value), key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._values[index]
+            del self._keys[index]
+
+    def top(self, count, offset=0):
+        """Keys of the best ``count`` values after skipping ``offset``."""
+        return self._keys[offset:offset + count]
+
+    def between(self, low=None, high=None):
+        """
+        Keys whose value is within an inclusive range, best first.
+
+        Args:
+            low (float, optional): Smallest value to include.
+            high (float, optional): Largest value to include.
+
+        Returns:
+            list: Character keys.
+        """
+        if self.descending:
+            low, high = (None if high is None else -high), (None if low is None else -low)
+        start = 0 if low is None else bisect_left(self._values, low)
+        end = len(self._values) if high is None else bisect_right(self._values, high)
+        return self._keys[start:end]
+
+    def __len__(self):
+        return len(self._keys)
+
+class GuildLeaderboard:
+    """The characters seen in one server, indexed by every leaderboard metric."""
+
+    def __init__(self, guild_id, max_size=LEADERBOARD_MAX_PER_GUILD):
+        self.guild_id = guild_id
+        self.max_size = max_size
+        self.entries = {}
+        self.indexes = {metric: SortedIndex(descending) for metric, descending in METRICS.items()}
+        self.dirty = False
+
+    def _index(self, entry):
+        for metric, index in self.indexes.items():
+            value = getattr(entry, metric)
+            if value is not None:
+                index.add(value, entry.key)
+
+    def _unindex(self, entry):
+        for metric, index in self.indexes.items():
+            value = getattr(entry, metric)
+            if value is not None:
+                index.remove(value, entry.key)
+
+    def record(self, data, now=None):
+        """
+        Add or update a character from a looked up profile.
+
+        When the leaderboard is full, the character that was looked up least
+        recently makes room.
+
+        Args:
+            data (dict): Profile JSON from Raider.io.
+            now (float, optional): Wall clock time of the lookup. Defaults to now.
+
+        Returns:
+            LeaderboardEntry: The character's entry.
+        """
+        key = character_key(data['name'], data['realm'], data['region'])
+        previous = self.entries.get(key)
+        entry = LeaderboardEntry.from_profile(data, previous, now)
+        if previous is not None:
+            self._unindex(previous)
+        elif len(self.entries) >= self.max_size:
+            self.remove(min(self.entries.values(), key=lambda e: e.updated_at).key)
+        self.entries[key] = entry
+        self._index(entry)
+        self.dirty = True
+        return entry
+
+    def add(self, entry):
+        """Add an entry loaded from disk."""
+        previous = self.entries.get(entry.key)
+        if previous is not None:
+            self._unindex(previous)
+        self.entries[entry.key] = entry
+        self._index(entry)
+
+    def remove(self, key):
+        """Remove a character."""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._unindex(entry)
+            self.dirty = True
+        return entry
+
+    def evict(self, cutoff):
+        """
+        Remove characters not looked up since a point in time.
+
+        Args:
+            cutoff (float): Wall clock time; older entries are removed.
+
+        Returns:
+            int: Number of characters removed.
+        """
+        expired = [key for key, entry in self.entries.items() if entry.updated_at < cutoff]
+        for key in expired:
+            self.remove(key)
+        return len(expired)
+
+    def top(self, metric, count, offset=0):
+        """
+        Get the best characters by a metric.
+
+        Args:
+            metric (str): One of METRICS.
+            count (int): Number of characters.
+            offset (int, optional): Characters to skip, for paging.
+
+        Returns:
+            list: LeaderboardEntry objects, best first.
+        """
+        return [self.entries[key] for key in self.indexes[metric].top(count, offset)]
+
+    def between(self, metric, low=None, high=None):
+        """
+        Get the characters whose value for a metric is within a range.
+
+        Args:
+            metric (str): One of METRICS.
+            low (float, optional): Smallest value to include.
+            high (float, optional): Largest value to include.
+
+        Returns:
+            list: LeaderboardEntry objects, best first.
+        """
+        return [self.entries[key] for key in self.indexes[metric].between(low, high)]
+
+    def ranked(self, metric):
+        """Number of characters that have a value for a metric."""
+        return len(self.indexes[metric])
+
+    def __len__(self):
+        return len(self.entries)
+
+class LeaderboardIndex:
+    """
+    Leaderboards for every server, kept in memory and stored one JSON file per server.
+
+    A server's file is read the first time its leaderboard is used, and only
+    leaderboards that changed are written back, every ``flush_interval``
+    seconds. One file per server also keeps cluster workers, which each own
+    a disjoint set of servers, from overwriting each other.
+    """
+
+    def __init__(self, directory=LEADERBOARD_DIR, max_age=LEADERBOARD_MAX_AGE,
+                 max_per_guild=LEADERBOARD_MAX_PER_GUILD, flush_interval=LEADERBOARD_FLUSH_INTERVAL):
+        """
+        Args:
+            directory (str): Directory the per-server files are stored in.
+            max_age (float): Seconds a character stays listed without being looked up again.
+            max_per_guild (int): Most characters kept per server.
+            flush_interval (float): Seconds between writes of changed leaderboards.
+        """
+        self.directory = directory
+        self.max_age = max_age
+        self.max_per_guild = max_per_guild
+        self.flush_interval = flush_interval
+        self._guilds = {}
+        self._flush_task = None
+
+        self.recorded = 0
+        self.evicted = 0
+
+    def _path(self, guild_id):
+        return os.path.join(self.directory, f"{guild_id}.json")
+
+    def get(self, guild_id):
+        """
+        Get a server's leaderboard, loading it from disk on first use.
+
+        Args:
+            guild_id (int): The server.
+
+        Returns:
+            GuildLeaderboard: The leaderboard, empty if the server has none yet.
+        """
+        board = self._guilds.get(guild_id)
+        if board is None:
+            board = self._guilds[guild_id] = self._load(guild_id)
+        return board
+
+    def _load(self, guild_id):
+        board = GuildLeaderboard(guild_id, self.max_per_guild)
+        path = self._path(guild_id)
+        if not os.path.exists(path):
+            return board
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for entry in data.get('characters', []):
+                board.add(LeaderboardEntry.from_dict(entry))
+        except Exception as e:
+            logger.error(f"Failed to load leaderboard from {path}: {e}")
+        self.evicted += board.evict(time.time() - self.max_age)
+        return board
+
+    def record(self, guild_id, data):
+        """
+        Record a looked up profile on a server's leaderboard.
+
+        Args:
+            guild_id (int): The server the lookup came from.
+            data (dict): Profile JSON from Raider.io.
+        """
+        if guild_id is None or not data.get('region'):
+            return
+        self.get(guild_id).record(data)
+        self.recorded += 1
+
+    def record_current(self, data):
+        """Record a looked up profile for the server of the current interaction, if any."""
+        self.record(current_guild.get(), data)
+
+    def start(self):
+        """Start writing changed leaderboards in the background."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stop the background writer and write what changed since its last run."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write leaderboards: {e}")
+
+    async def flush(self):
+        """Evict expired characters and write every leaderboard that changed."""
+        cutoff = time.time() - self.max_age
+        pending = []
+        for guild_id, board in self._guilds.items():
+            self.evicted += board.evict(cutoff)
+            if board.dirty:
+                pending.append((self._path(guild_id), [entry.to_dict() for entry in board.entries.values()]))
+                board.dirty = False
+        if pending:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, pending)
+
+    def _write(self, pending):
+        os.makedirs(self.directory, exist_ok=True)
+        for path, characters in pending:
+            try:
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'characters': characters}, f)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.error(f"Failed to save leaderboard to {path}: {e}")
+
+    def stats(self):
+        """
+        Get leaderboard statistics.
+
+        Returns:
+            dict: Servers loaded, characters listed, profiles recorded and characters evicted.
+        """
+        return {
+            'guilds': len(self._guilds),
+            'characters': sum(len(board) for board in self._guilds.values()),
+            'recorded': self.recorded,
+            'evicted': self.evicted,
+        }
+
+leaderboards = LeaderboardIndex()
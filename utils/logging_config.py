@@ -0,0 +1,192 @@
+"""
+Logging setup: records are queued on the calling thread and written from a background thread.
+
+Records carry the correlation id of the interaction they belong to, plus
+optional key/value fields. High-volume per-lookup records are tagged with an
+event name and can be sampled or rate limited before they are queued.
+"""
+
+import contextvars
+import copy
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+import uuid
+
+# Correlation id of the interaction being handled, inherited by tasks it starts
+correlation_id = contextvars.ContextVar('correlation_id', default='-')
+
+_LOG_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+def log_fields(event=None, **fields):
+    """
+    Build the ``extra`` argument for a structured record.
+
+    Records with an event name are subject to sampling and rate limiting at
+    INFO level and below.
+
+    Args:
+        event (str, optional): Name of the high-volume event, such as ``raiderio.request``.
+        **fields: Key/value pairs to include in the record.
+
+    Returns:
+        dict: Pass as ``extra=`` to a logging call.
+    """
+    return {'event': event, 'fields': fields}
+
+def set_correlation_id(interaction=None):
+    """
+    Start a new correlation id for the current task.
+
+    Args:
+        interaction (discord.Interaction, optional): The interaction being handled;
+            its id is used when it has one.
+
+    Returns:
+        str: The correlation id.
+    """
+    interaction_id = getattr(interaction, 'id', None)
+    value = f"{interaction_id:x}" if isinstance(interaction_id, int) else uuid.uuid4().hex[:12]
+    correlation_id.set(value)
+    return value
+
+class CorrelationFilter(logging.Filter):
+    """Stamp records with the current correlation id; runs on the thread that logged."""
+
+    def filter(self, record):
+        record.correlation_id = correlation_id.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """
+    Drop some of the records tagged with an event name.
+
+    Only records at INFO level and below with an ``event`` are affected, so
+    warnings, errors and untagged records always get through.
+    """
+
+    def __init__(self, sample_rate=1.0, rate_limit=0):
+        """
+        Args:
+            sample_rate (float, optional): Share of tagged records to keep, between 0 and 1.
+            rate_limit (float, optional): Maximum tagged records per second for each event, 0 for no limit.
+        """
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.rate_limit = rate_limit
+        self.dropped = 0
+        self._windows = {}
+
+    def filter(self, record):
+        event = getattr(record, 'event', None)
+        if event is None or record.levelno > logging.INFO:
+            return True
+
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            self.dropped += 1
+            return False
+
+        if self.rate_limit:
+            now = time.monotonic()
+            window = self._windows.get(event)
+            if window is None or now - window[0] >= 1:
+                self._windows[event] = [now, 1]
+            elif window[1] >= self.rate_limit:
+                self.dropped += 1
+                return False
+            else:
+                window[1] += 1
+        return True
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread."""
+
+    def prepare(self, record):
+        # Only merge the message arguments here; formatting and tracebacks are rendered by the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+def _quote(value):
+    text = str(value)
+    if not text or any(c in text for c in ' ="\n'):
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+    return text
+
+def _record_fields(record):
+    fields = dict(getattr(record, 'fields', None) or {})
+    # Plain extra={...} arguments are included as fields too
+    for key, value in vars(record).items():
+        if key not in _LOG_RECORD_ATTRIBUTES and key not in ('fields', 'event', 'correlation_id'):
+            fields.setdefault(key, value)
+    return fields
+
+class KeyValueFormatter(logging.Formatter):
+    """Format records as ``key=value`` pairs."""
+
+    def format(self, record):
+        parts = [
+            f"ts={self.formatTime(record)}",
+            f"level={record.levelname}",
+            f"logger={record.name}",
+            f"cid={getattr(record, 'correlation_id', '-')}",
+        ]
+        if getattr(record, 'event', None):
+            parts.append(f"event={record.event}")
+        parts.append(f"msg={_quote(record.getMessage())}")
+        parts.extend(f"{key}={_quote(value)}" for key, value in _record_fields(record).items())
+
+        text = " ".join(parts)
+        if record.exc_info:
+            text += "\n" + self.formatException(record.exc_info)
+        return text
+
+class TextFormatter(logging.Formatter):
+    """The bot's original text format, with the correlation id and any fields appended."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    def formatMessage(self, record):
+        text = super().formatMessage(record)
+        fields = _record_fields(record)
+        if fields:
+            text += " " + " ".join(f"{key}={_quote(value)}" for key, value in fields.items())
+        return f"{text} [cid={getattr(record, 'correlation_id', '-')}]"
+
+def setup_logging(level="INFO", log_format="kv", sample_rate=1.0, rate_limit=0, stream=None):
+    """
+    Route every record through a queue to a background writer thread.
+
+    Args:
+        level (str, optional): Root log level.
+        log_format (str, optional): ``kv`` for key/value records, ``text`` for the classic format.
+        sample_rate (float, optional): Share of high-volume event records to keep.
+        rate_limit (float, optional): Maximum high-volume records per second for each event, 0 for no limit.
+        stream (file, optional): Where records are written. Defaults to stderr.
+
+    Returns:
+        tuple: (QueueListener, SamplingFilter). Stop the listener on shutdown to flush queued records.
+    """
+    writer = logging.StreamHandler(stream or sys.stderr)
+    writer.setFormatter(KeyValueFormatter() if log_format == "kv" else TextFormatter())
+
+    log_queue = queue.SimpleQueue()
+    handler = BackgroundQueueHandler(log_queue)
+    sampling = SamplingFilter(sample_rate, rate_limit)
+    handler.addFilter(sampling)
+    handler.addFilter(CorrelationFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, writer, respect_handler_level=True)
+    listener.start()
+    return listener, sampling
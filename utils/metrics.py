@@ -0,0 +1,254 @@
+"""
+Lightweight metrics for the lookup pipeline, exposed in Prometheus text format.
+"""
+
+import bisect
+import logging
+import time
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        """Increase the counter for the given label values."""
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        """Get the counter for the given label values."""
+        return self._values.get(labels, 0)
+
+    def values(self):
+        """Get every labelled value."""
+        return dict(self._values)
+
+    def render(self):
+        """Render the counter in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+class Histogram:
+    """Histogram with fixed buckets and optional labels."""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value, *labels):
+        """Record a value for the given label values."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+        series['counts'][bisect.bisect_left(self.buckets, value)] += 1
+        series['sum'] += value
+        series['count'] += 1
+
+    def time(self, *labels):
+        """Context manager that observes the time spent in its block."""
+        return _Timer(self, labels)
+
+    def count(self, *labels):
+        """Number of observations for the given label values."""
+        series = self._series.get(labels)
+        return series['count'] if series else 0
+
+    def counts(self):
+        """Number of observations for every labelled series."""
+        return {labels: series['count'] for labels, series in self._series.items()}
+
+    def quantile(self, q, *labels):
+        """
+        Estimate a quantile from the buckets.
+
+        Args:
+            q (float): Quantile between 0 and 1.
+            *labels: Label values, or none to merge every series.
+
+        Returns:
+            float: The estimated value, or None if nothing was observed.
+        """
+        if labels:
+            series = [self._series[labels]] if labels in self._series else []
+        else:
+            series = list(self._series.values())
+
+        counts = [sum(s['counts'][i] for s in series) for i in range(len(self.buckets) + 1)]
+        total = sum(counts)
+        if not total:
+            return None
+
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * ((rank - seen) / count)
+            seen += count
+        return self.buckets[-1]
+
+    def render(self):
+        """Render the histogram in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series['counts']):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames + ('le',), labels + (le,))} {cumulative}"
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {series['sum']}")
+            lines.append(f"{self.name}_count{label_text} {series['count']}")
+        return lines
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+class Registry:
+    """Collection of metrics plus callbacks that report gauges at scrape time."""
+
+    def __init__(self):
+        self._metrics = []
+        self._gauge_callbacks = []
+
+    def register(self, metric):
+        """Add a metric to the registry."""
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Create and register a counter."""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Create and register a histogram."""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_gauge_callback(self, callback):
+        """
+        Register a callback that returns gauges when metrics are rendered.
+
+        Args:
+            callback (callable): Returns an iterable of (name, documentation, labels dict, value).
+        """
+        self._gauge_callbacks.append(callback)
+
+    def gauges(self):
+        """Collect every gauge from the registered callbacks."""
+        gauges = []
+        for callback in self._gauge_callbacks:
+            try:
+                gauges.extend(callback())
+            except Exception as e:
+                logger.error(f"Metrics gauge callback failed: {e}")
+        return gauges
+
+    def render(self):
+        """
+        Render every metric in Prometheus text format.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+
+        # Samples of one gauge have to be grouped under a single HELP/TYPE header
+        families = {}
+        for name, documentation, labels, value in self.gauges():
+            if name not in families:
+                families[name] = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+            families[name].append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {value}")
+        for family in families.values():
+            lines.extend(family)
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# Raider.io client
+raiderio_request_seconds = registry.histogram(
+    "raiderio_request_duration_seconds", "Time spent on a single Raider.io HTTP request.", ("region", "endpoint")
+)
+raiderio_requests = registry.counter(
+    "raiderio_requests_total", "Raider.io HTTP requests by outcome.", ("region", "endpoint", "outcome")
+)
+lookup_seconds = registry.histogram(
+    "raider_lookup_duration_seconds", "Time to find a character across regions.", ("outcome",)
+)
+
+# Discord interactions
+followup_seconds = registry.histogram(
+    "raider_interaction_followup_seconds", "Time from deferring an interaction to sending its followup.",
+    ("command",)
+)
+deadline_phase_seconds = registry.histogram(
+    "raider_deadline_phase_seconds", "Seconds of an interaction's time budget spent in each phase.",
+    ("command", "phase")
+)
+deadline_replies = registry.counter(
+    "raider_deadline_replies_total", "Interaction replies by whether they were sent within the time budget.",
+    ("command", "outcome")
+)
+progressive_replies = registry.counter(
+    "raider_progressive_replies_total", "Replies sent from a stale cached profile, by what its refresh did.",
+    ("outcome",)
+)
+
+async def start_metrics_server(host, port):
+    """
+    Serve ``/metrics`` in Prometheus text format.
+
+    Args:
+        host (str): Interface to listen on.
+        port (int): Port to listen on.
+
+    Returns:
+        aiohttp.web.AppRunner: The runner, to be cleaned up on shutdown.
+    """
+    async def handle_metrics(request):
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,270 @@
+"""
+Optional SQLite-backed store for profiles and realm regions, so caches survive restarts.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import fast_json
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_fetched_at ON profiles (fetched_at);
+CREATE TABLE IF NOT EXISTS realm_regions (
+    realm TEXT PRIMARY KEY,
+    region TEXT NOT NULL
+);
+"""
+
+class PersistentCache:
+    """
+    On-disk cache of compressed profile JSON and realm to region mappings.
+
+    All disk access runs on a single background thread, so the event loop
+    never blocks on SQLite. Reads happen on demand; writes are queued and
+    flushed in batches. Rows older than ``max_age`` are deleted periodically.
+    """
+
+    def __init__(self, path, max_age=86400, flush_interval=5, batch_size=100, compact_interval=3600):
+        """
+        Args:
+            path (str): SQLite database file.
+            max_age (float, optional): Seconds a stored profile is kept.
+            flush_interval (float, optional): Seconds between batched writes.
+            batch_size (int, optional): Pending writes that trigger an early flush.
+            compact_interval (float, optional): Seconds between expiry/compaction runs.
+        """
+        self.path = path
+        self.max_age = max_age
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.compact_interval = compact_interval
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistent-cache")
+        self._db = None
+        self._pending_profiles = {}
+        self._pending_realms = {}
+        self._flush_event = None
+        self._flush_task = None
+
+        self.reads = 0
+        self.read_hits = 0
+        self.writes = 0
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def open(self):
+        """Open the database and start the background writer."""
+        await self._run(self._open)
+        self._flush_event = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Opened persistent cache at {self.path}")
+        return self
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        # Only takes effect on a new database, lets compact() free pages without a full VACUUM
+        self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    async def close(self):
+        """Flush pending writes and close the database."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        await self.flush()
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)
+        logger.info("Closed persistent cache")
+
+    def _close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @staticmethod
+    def _encode_key(key):
+        return "|".join(str(part) for part in key)
+
+    async def get_profile(self, key):
+        """
+        Read a stored profile.
+
+        Args:
+            key (tuple): Profile cache key.
+
+        Returns:
+            tuple: (profile, age in seconds), or None if nothing usable is stored.
+        """
+        encoded = self._encode_key(key)
+        pending = self._pending_profiles.get(encoded)
+        if pending is not None:
+            data, fetched_at = pending
+            return data, time.time() - fetched_at
+
+        self.reads += 1
+        row = await self._run(self._read_profile, encoded)
+        if row is None:
+            return None
+
+        blob, fetched_at = row
+        age = time.time() - fetched_at
+        if age > self.max_age:
+            return None
+
+        try:
+            data = fast_json.loads(zlib.decompress(blob))
+        except (zlib.error, ValueError) as e:
+            logger.warning(f"Discarding unreadable cached profile {encoded}: {e}")
+            return None
+
+        self.read_hits += 1
+        return data, age
+
+    def _read_profile(self, encoded):
+        if self._db is None:
+            return None
+        return self._db.execute(
+            "SELECT data, fetched_at FROM profiles WHERE key = ?", (encoded,)
+        ).fetchone()
+
+    def put_profile(self, key, data):
+        """
+        Queue a profile to be written.
+
+        Args:
+            key (tuple): Profile cache key.
+            data (dict): The profile data.
+        """
+        self._pending_profiles[self._encode_key(key)] = (data, time.time())
+        self._maybe_flush()
+
+    async def load_realms(self):
+        """
+        Read every stored realm to region mapping.
+
+        Returns:
+            dict: Regions keyed by realm.
+        """
+        rows = await self._run(self._read_realms)
+        return dict(rows)
+
+    def _read_realms(self):
+        if self._db is None:
+            return []
+        return self._db.execute("SELECT realm, region FROM realm_regions").fetchall()
+
+    def put_realm(self, realm, region):
+        """Queue a realm to region mapping to be written."""
+        self._pending_realms[realm] = region
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if self._flush_event is not None and \
+                len(self._pending_profiles) + len(self._pending_realms) >= self.batch_size:
+            self._flush_event.set()
+
+    async def flush(self):
+        """Write every queued profile and realm mapping in one transaction."""
+        if not self._pending_profiles and not self._pending_realms:
+            return
+
+        profiles, self._pending_profiles = self._pending_profiles, {}
+        realms, self._pending_realms = self._pending_realms, {}
+        try:
+            await self._run(self._write, profiles, realms)
+            self.writes += len(profiles) + len(realms)
+        except Exception as e:
+            logger.error(f"Failed to write persistent cache: {e}")
+
+    def _write(self, profiles, realms):
+        if self._db is None:
+            return
+        # Encoding happens here too, to keep JSON and zlib work off the event loop
+        profile_rows = [
+            (encoded, zlib.compress(fast_json.dumps(data)), fetched_at)
+            for encoded, (data, fetched_at) in profiles.items()
+        ]
+        realm_rows = list(realms.items())
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO profiles (key, data, fetched_at) VALUES (?, ?, ?)", profile_rows
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO realm_regions (realm, region) VALUES (?, ?)", realm_rows
+            )
+
+    async def compact(self):
+        """Delete expired profiles and give the space back to the filesystem."""
+        try:
+            removed = await self._run(self._compact, time.time() - self.max_age)
+            if removed:
+                logger.info(f"Removed {removed} expired profile(s) from persistent cache")
+        except Exception as e:
+            logger.error(f"Failed to compact persistent cache: {e}")
+
+    def _compact(self, cutoff):
+        if self._db is None:
+            return 0
+        with self._db:
+            removed = self._db.execute("DELETE FROM profiles WHERE fetched_at < ?", (cutoff,)).rowcount
+        if removed:
+            self._db.execute("PRAGMA incremental_vacuum")
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return removed
+
+    async def _flush_loop(self):
+        """Flush on a timer or when enough writes are queued, and compact now and then."""
+        last_compact = time.monotonic()
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self.flush()
+
+            if time.monotonic() - last_compact >= self.compact_interval:
+                await self.compact()
+                last_compact = time.monotonic()
+
+    def stats(self):
+        """
+        Get the store counters.
+
+        Returns:
+            dict: Pending writes and read/write counters.
+        """
+        return {
+            'pending': len(self._pending_profiles) + len(self._pending_realms),
+            'reads': self.reads,
+            'read_hits': self.read_hits,
+            'writes': self.writes,
+        }
@@ -0,0 +1,277 @@
+"""
+In-memory caches for Raider.io character lookups.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+
+from utils.character_profile import character_key
+
+logger = logging.getLogger(__name__)
+
+class ProfileCache:
+    """
+    Bounded LRU cache of character profiles with a time-to-live.
+
+    Entries younger than ``ttl`` are fresh. Entries between ``ttl`` and
+    ``ttl + stale_ttl`` are stale: they are still returned, but callers are
+    expected to refresh them in the background. Older entries are dropped.
+    """
+
+    def __init__(self, max_size=1024, ttl=300, stale_ttl=600):
+        """
+        Args:
+            max_size (int, optional): Maximum number of profiles to keep.
+            ttl (float, optional): Seconds a profile is considered fresh.
+            stale_ttl (float, optional): Extra seconds a stale profile may still be served.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()
+        # Keys restored from a persistent cache that no lookup has been served from yet
+        self._restored = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.restored_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.unchanged = 0
+
+    @staticmethod
+    def make_key(character_name, realm, region, fields):
+        """
+        Build a normalized cache key.
+
+        Args:
+            character_name (str): The name of the character.
+            realm (str): The realm/server the character is on.
+            region (str): The region (us, eu, etc.).
+            fields (str): The comma separated fields requested.
+
+        Returns:
+            tuple: The (region, realm, name, fields) key.
+        """
+        return character_key(character_name, realm, region) + (fields,)
+
+    def get(self, key, count_miss=True):
+        """
+        Look up a profile.
+
+        Args:
+            key (tuple): Key from make_key().
+            count_miss (bool, optional): Count a miss. Callers that try a persistent
+                                         cache next call get() again after it.
+
+        Returns:
+            tuple: (profile, is_stale), or None on a miss.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            if count_miss:
+                self.misses += 1
+            return None
+
+        data, fetched_at = entry
+        age = time.monotonic() - fetched_at
+        if age > self.ttl + self.stale_ttl:
+            del self._entries[key]
+            self._restored.discard(key)
+            if count_miss:
+                self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.count_hit(key, age > self.ttl)
+        return data, age > self.ttl
+
+    def count_hit(self, key, is_stale):
+        """
+        Count a lookup served from the cache without get(), e.g. after peek().
+
+        The first lookup served from a profile restored from a persistent
+        cache counts as a restored hit, later ones as normal hits.
+
+        Args:
+            key (tuple): Key from make_key().
+            is_stale (bool): Whether the profile served was stale.
+        """
+        if key in self._restored:
+            self._restored.discard(key)
+            self.restored_hits += 1
+        elif is_stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+
+    def peek(self, key):
+        """
+        Look up a profile and its age without counting a hit or miss.
+
+        Args:
+            key (tuple): Key from make_key().
+
+        Returns:
+            tuple: (profile, age in seconds), or None if it isn't cached or has expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        data, fetched_at = entry
+        age = time.monotonic() - fetched_at
+        if age > self.ttl + self.stale_ttl:
+            return None
+        return data, age
+
+    def restore(self, key, data, age):
+        """
+        Store a profile loaded from a persistent cache.
+
+        Nothing is counted yet; the first lookup served from it counts as a
+        restored hit, however it reads the profile.
+
+        Args:
+            key (tuple): Key from make_key().
+            data (dict): The profile data.
+            age (float): Seconds since the profile was fetched.
+        """
+        self.set(key, data, age=age)
+        self._restored.add(key)
+
+    def set(self, key, data, age=0):
+        """
+        Store a profile, evicting the least recently used entry if full.
+
+        If the cached profile has the same ``last_crawled_at`` as the new one,
+        the cached object is kept and only its timestamp is renewed.
+
+        Args:
+            key (tuple): Key from make_key().
+            data (dict): The profile data.
+            age (float, optional): Seconds since the profile was fetched, for
+                                   profiles restored from disk. Defaults to 0.
+
+        Returns:
+            dict: The profile object now held in the cache.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and data.get('last_crawled_at') and \
+                entry[0].get('last_crawled_at') == data.get('last_crawled_at'):
+            data = entry[0]
+            self.unchanged += 1
+
+        self._entries[key] = (data, time.monotonic() - age)
+        self._entries.move_to_end(key)
+        self._restored.discard(key)
+
+        while len(self._entries) > self.max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            self._restored.discard(evicted)
+            self.evictions += 1
+        return data
+
+    def invalidate(self, key):
+        """Remove a single profile from the cache."""
+        self._entries.pop(key, None)
+        self._restored.discard(key)
+
+    def clear(self):
+        """Remove every profile from the cache."""
+        self._entries.clear()
+        self._restored.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Size and hit/miss/eviction counters.
+        """
+        found = self.hits + self.stale_hits + self.restored_hits
+        lookups = found + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'restored_hits': self.restored_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'unchanged': self.unchanged,
+            'hit_ratio': found / lookups if lookups else 0.0,
+        }
+
+class NegativeCache:
+    """
+    Short-lived record of lookups that are known to have no result.
+
+    Used to answer repeated lookups for misspelled or deleted characters
+    without going back to Raider.io.
+    """
+
+    def __init__(self, max_size=4096, ttl=120):
+        """
+        Args:
+            max_size (int, optional): Maximum number of misses to remember.
+            ttl (float, optional): Seconds a miss is remembered.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        expires_at = self._entries.get(key)
+        if expires_at is None:
+            self.misses += 1
+            return False
+
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return False
+
+        self.hits += 1
+        return True
+
+    def add(self, key):
+        """Remember a miss for the key."""
+        self._entries[key] = time.monotonic() + self.ttl
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, key):
+        """Forget a miss for the key."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Forget every miss."""
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Size and hit/miss counters.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
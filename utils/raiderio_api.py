@@ -3,10 +3,57 @@ Utility functions for interacting with the Raider.io API.
 """
 
 import aiohttp
+import asyncio
+import contextlib
 import logging
 import os
+import random
+import time
 from dotenv import load_dotenv
-from config import RAIDERIO_API_URL, DEFAULT_REGIONS
+from config import (
+    RAIDERIO_API_URL,
+    DEFAULT_REGIONS,
+    CONCURRENT_REGION_LOOKUP,
+    RAIDERIO_MAX_CONNECTIONS,
+    RAIDERIO_CONNECTIONS_PER_HOST,
+    RAIDERIO_DNS_CACHE_TTL,
+    RAIDERIO_KEEPALIVE_TIMEOUT,
+    RAIDERIO_CONNECT_TIMEOUT,
+    RAIDERIO_REQUEST_TIMEOUT,
+    RAIDERIO_LOOKUP_TIMEOUT,
+    RAIDERIO_HEDGE_DELAY,
+    REGION_FAILURE_THRESHOLD,
+    REGION_RESET_TIMEOUT,
+    RAIDERIO_RATE_LIMIT,
+    RAIDERIO_RATE_BURST,
+    RAIDERIO_MAX_RETRIES,
+    RAIDERIO_RETRY_BASE_DELAY,
+    RAIDERIO_MAX_RETRY_WAIT,
+    PROFILE_CACHE_SIZE,
+    PROFILE_CACHE_TTL,
+    PROFILE_CACHE_STALE_TTL,
+    NEGATIVE_CACHE_TTL,
+    REALM_INDEX_PATH,
+    PERSISTENT_CACHE_PATH,
+    PERSISTENT_CACHE_MAX_AGE,
+    PERSISTENT_CACHE_FLUSH_INTERVAL,
+    CLUSTER_RATE_BUDGET_PATH,
+    CLUSTER_SYNC_INTERVAL,
+    REALM_LIST_PATH,
+)
+from utils import fast_json, metrics
+from utils.character_profile import CharacterProfile
+from utils.deadline import SharedDeadline
+from utils.logging_config import log_fields
+from utils.circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN
+from utils.leaderboard import leaderboards
+from utils.persistent_cache import PersistentCache
+from utils.profile_cache import ProfileCache, NegativeCache
+from utils.rate_limiter import RateLimiter, SharedPriority, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from utils.realm_index import RealmRegionIndex
+from utils.realm_list import RealmList
+from utils.shared_budget import SharedRateBudget
+from utils.single_flight import SingleFlight
 
 # Load environment variables
 load_dotenv()
@@ -14,81 +61,948 @@ RAIDERIO_API_KEY = os.getenv('RAIDERIO_API_KEY')
 
 logger = logging.getLogger(__name__)
 
-async def get_character_profile(character_name, realm, region="us", fields=None):
+DEFAULT_HEADERS = {
+    'Accept': 'application/json',
+    'User-Agent': 'RaiderBot Discord Bot'
+}
+
+PROFILE_ENDPOINT = "characters/profile"
+
+DEFAULT_FIELDS = "gear,guild,raid_progression,mythic_plus_scores_by_season:current,mythic_plus_best_runs,mythic_plus_ranks"
+
+# What the first reply needs, and what "More details" fetches on demand
+LEAN_FIELDS = "gear,guild,raid_progression:current-tier,mythic_plus_scores_by_season:current,mythic_plus_best_runs"
+DETAIL_FIELDS = "raid_progression,mythic_plus_best_runs:all,mythic_plus_ranks"
+# Detail fields without the ranks, for when there's little time left to answer
+DETAIL_FIELDS_WITHOUT_RANKS = "raid_progression,mythic_plus_best_runs:all"
+
+# Shared profile cache, in-flight request coalescing and background refreshes
+profile_cache = ProfileCache(PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL, PROFILE_CACHE_STALE_TTL)
+profile_requests = SingleFlight()
+not_found_cache = NegativeCache(ttl=NEGATIVE_CACHE_TTL)
+realm_list = RealmList(REALM_LIST_PATH)
+realm_index = RealmRegionIndex(REALM_INDEX_PATH, realm_list)
+rate_limiter = RateLimiter(RAIDERIO_RATE_LIMIT, RAIDERIO_RATE_BURST)
+region_breakers = {}
+persistent_cache = None
+shared_budget = None
+_cluster_sync_task = None
+_background_tasks = set()
+# Profiles just found missing from the persistent cache, so one lookup reads each from disk once
+_disk_misses = NegativeCache(ttl=PERSISTENT_CACHE_FLUSH_INTERVAL)
+# What the callers of each profile request in flight need from it; see _Flight
+_flights = {}
+
+class RaiderIOError(Exception):
+    """Raised when Raider.io couldn't answer a lookup, as opposed to the character not existing."""
+
+class RaiderIORateLimited(RaiderIOError):
+    """Raised when Raider.io keeps answering with 429 Too Many Requests."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class RaiderIOUnavailable(RaiderIOError):
+    """Raised on server errors (5xx) or when Raider.io can't be reached."""
+
+class RaiderIOTimeout(RaiderIOUnavailable):
+    """Raised when a lookup runs out of time before Raider.io answered."""
+
+    def __init__(self, message, checked=()):
+        super().__init__(message)
+        # Regions the character was confirmed missing from before time ran out
+        self.checked = tuple(checked)
+
+class RaiderIOClient:
+    """
+    Long-lived HTTP client for the Raider.io API.
+
+    Owns a single aiohttp session and connection pool so that keep-alive
+    connections and resolved DNS entries are reused between lookups.
+    """
+
+    def __init__(self, limit=RAIDERIO_MAX_CONNECTIONS, limit_per_host=RAIDERIO_CONNECTIONS_PER_HOST,
+                 dns_cache_ttl=RAIDERIO_DNS_CACHE_TTL, keepalive_timeout=RAIDERIO_KEEPALIVE_TIMEOUT,
+                 connect_timeout=RAIDERIO_CONNECT_TIMEOUT, request_timeout=RAIDERIO_REQUEST_TIMEOUT):
+        """
+        Args:
+            limit (int, optional): Maximum number of open connections in the pool.
+            limit_per_host (int, optional): Maximum number of open connections per host.
+            dns_cache_ttl (int, optional): Seconds to cache resolved DNS entries.
+            keepalive_timeout (int, optional): Seconds to keep idle connections open.
+            connect_timeout (float, optional): Seconds allowed to get a connection.
+            request_timeout (float, optional): Seconds allowed for a whole request.
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=request_timeout, connect=connect_timeout)
+        self._session = None
+
+    async def start(self):
+        """Create the underlying session if it isn't open yet."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=DEFAULT_HEADERS,
+                timeout=self.timeout
+            )
+            logger.info(
+                f"Opened Raider.io connection pool (limit={self.limit}, per_host={self.limit_per_host})"
+            )
+        return self
+
+    async def close(self):
+        """Close the underlying session and its connection pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Closed Raider.io connection pool")
+        self._session = None
+
+    async def get_session(self):
+        """
+        Get the shared session, opening it on first use.
+
+        Returns:
+            aiohttp.ClientSession: The pooled session.
+        """
+        await self.start()
+        return self._session
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+_client = None
+
+def set_client(client):
+    """
+    Set the shared client used by every function in this module.
+
+    Args:
+        client (RaiderIOClient): The client to use, or None to clear it.
+    """
+    global _client
+    _client = client
+
+def get_client():
+    """
+    Get the shared client, creating a default one if none was set.
+
+    Returns:
+        RaiderIOClient: The shared client.
+    """
+    global _client
+    if _client is None:
+        _client = RaiderIOClient()
+    return _client
+
+async def open_persistent_cache(path=PERSISTENT_CACHE_PATH, flush_interval=PERSISTENT_CACHE_FLUSH_INTERVAL):
+    """
+    Open the on-disk cache and use it under the in-memory caches.
+
+    Args:
+        path (str, optional): SQLite database file. Defaults to PERSISTENT_CACHE_PATH.
+        flush_interval (float, optional): Seconds between batched writes.
+            Defaults to PERSISTENT_CACHE_FLUSH_INTERVAL.
+
+    Returns:
+        PersistentCache: The opened cache.
+    """
+    global persistent_cache
+    store = PersistentCache(path, PERSISTENT_CACHE_MAX_AGE, flush_interval)
+    await store.open()
+    await realm_index.attach_store(store)
+    persistent_cache = store
+    return store
+
+async def close_persistent_cache():
+    """Flush and close the on-disk cache if it is open."""
+    global persistent_cache
+    if persistent_cache is not None:
+        store, persistent_cache = persistent_cache, None
+        realm_index.store = None
+        await store.close()
+
+async def join_cluster(cache_path=PERSISTENT_CACHE_PATH, budget_path=CLUSTER_RATE_BUDGET_PATH,
+                       sync_interval=CLUSTER_SYNC_INTERVAL):
+    """
+    Share the profile cache, realm index and rate limit with the other worker processes of a cluster.
+
+    Profiles and realm mappings go through the persistent cache, which every
+    worker opens on the same file and flushes every ``sync_interval`` seconds,
+    so a profile one worker fetched is read from disk instead of Raider.io by
+    the others. Tokens are leased from one shared budget, so the cluster as a
+    whole stays within RAIDERIO_RATE_LIMIT no matter how many workers run.
+
+    Args:
+        cache_path (str, optional): Shared SQLite cache file. Defaults to PERSISTENT_CACHE_PATH.
+        budget_path (str, optional): Shared SQLite rate budget file. Defaults to CLUSTER_RATE_BUDGET_PATH.
+        sync_interval (float, optional): Seconds between cache flushes and realm index reloads.
+    """
+    global shared_budget, _cluster_sync_task
+    if persistent_cache is None:
+        await open_persistent_cache(cache_path, flush_interval=sync_interval)
+    shared_budget = await SharedRateBudget(budget_path, RAIDERIO_RATE_LIMIT, RAIDERIO_RATE_BURST).open()
+    rate_limiter.attach_budget(shared_budget)
+    _cluster_sync_task = asyncio.create_task(_sync_cluster(sync_interval))
+
+async def _sync_cluster(interval):
+    """Reload realm mappings learned by other workers."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await realm_index.refresh()
+        except Exception as e:
+            logger.warning(f"Failed to reload shared realm index: {e}")
+
+async def leave_cluster():
+    """Stop sharing state with the other workers and close the shared stores."""
+    global shared_budget, _cluster_sync_task
+    if _cluster_sync_task is not None:
+        _cluster_sync_task.cancel()
+        _cluster_sync_task = None
+    await rate_limiter.detach_budget()
+    if shared_budget is not None:
+        budget, shared_budget = shared_budget, None
+        await budget.close()
+    await close_persistent_cache()
+
+def get_region_breaker(region):
+    """
+    Get the circuit breaker for a region, creating it on first use.
+
+    Args:
+        region (str): The region (us, eu, etc.).
+
+    Returns:
+        CircuitBreaker: The region's breaker.
+    """
+    region = region.lower()
+    breaker = region_breakers.get(region)
+    if breaker is None:
+        breaker = region_breakers[region] = CircuitBreaker(
+            f"{region.upper()} region", REGION_FAILURE_THRESHOLD, REGION_RESET_TIMEOUT
+        )
+    return breaker
+
+def get_region_states():
+    """
+    Get the circuit breaker state of every region seen so far.
+
+    Returns:
+        dict: Breaker stats keyed by region.
+    """
+    return {region: breaker.stats() for region, breaker in region_breakers.items()}
+
+def get_stats():
+    """
+    Get the state of every cache, the rate limiter and the region breakers.
+
+    Returns:
+        dict: Stats keyed by component.
+    """
+    stats = {
+        'profile_cache': profile_cache.stats(),
+        'not_found_cache': not_found_cache.stats(),
+        'coalescing': profile_requests.stats(),
+        'rate_limiter': rate_limiter.stats(),
+        'regions': get_region_states(),
+        'known_realms': len(realm_index),
+        'leaderboards': leaderboards.stats(),
+    }
+    if persistent_cache is not None:
+        stats['persistent_cache'] = persistent_cache.stats()
+    if shared_budget is not None:
+        stats['shared_budget'] = shared_budget.stats()
+    return stats
+
+def _collect_gauges():
+    """Report cache, limiter and breaker state as metrics gauges."""
+    stats = get_stats()
+    for cache in ('profile_cache', 'not_found_cache'):
+        yield ("raider_cache_hit_ratio", "Share of cache lookups that were hits.",
+               {'cache': cache}, stats[cache]['hit_ratio'])
+        yield ("raider_cache_entries", "Entries held in a cache.", {'cache': cache}, stats[cache]['size'])
+    yield ("raider_coalesced_requests", "Requests that joined an identical request already in flight.",
+           {}, stats['coalescing']['shared'])
+    yield ("raider_rate_limiter_queued", "Requests waiting for a rate limiter token.",
+           {}, stats['rate_limiter']['queued'])
+    for region, breaker in stats['regions'].items():
+        state = {CLOSED: 0, HALF_OPEN: 1}.get(breaker['state'], 2)
+        yield ("raider_region_circuit_state", "Region circuit breaker state (0 closed, 1 half open, 2 open).",
+               {'region': region}, state)
+
+metrics.registry.add_gauge_callback(_collect_gauges)
+
+async def get_character_profile(character_name, realm, region="us", fields=None, priority=PRIORITY_INTERACTIVE,
+                                as_model=False, deadline=None):
     """
     Get character profile information from Raider.io API.
 
+    Profiles are served from the shared profile cache when possible. A stale
+    cached profile is returned immediately while a refresh runs in the background.
+    Found profiles are recorded on the leaderboard of the server the lookup came from.
+
     Args:
         character_name (str): The name of the character.
         realm (str): The realm/server the character is on.
         region (str, optional): The region (us, eu, etc.). Defaults to "us".
         fields (list, optional): Additional fields to include in the response.
                                 Default fields are gear, guild, covenant, and raid_progression.
+        priority (int, optional): Rate limiter priority. Defaults to PRIORITY_INTERACTIVE.
+        as_model (bool, optional): Return a compact CharacterProfile instead of the raw dict.
+        deadline (Deadline, optional): Time budget of the interaction; request timeouts
+            and retries are cut to fit what is left.
 
     Returns:
-        dict: Character profile data or None if an error occurred.
+        dict | CharacterProfile: Character profile data or None if the character doesn't exist.
+
+    Raises:
+        RaiderIORateLimited: If Raider.io is still throttling us after retrying.
+        RaiderIOUnavailable: If Raider.io is failing or can't be reached.
     """
-    # Use the simplest possible approach that we know works
-    base_url = f"{RAIDERIO_API_URL}/characters/profile?region={region}&realm={realm}&name={character_name}"
+    fields_str = _fields_str(fields)
+    key = ProfileCache.make_key(character_name, realm, region, fields_str)
+    if key[:3] in not_found_cache:
+        logger.info("Skipping known miss", extra=log_fields(
+            "cache.known_miss", character=character_name, realm=realm, region=region
+        ))
+        return None
 
-    # Add fields if specified
-    if fields:
-        fields_str = ",".join(fields) if isinstance(fields, list) else fields
-        base_url += f"&fields={fields_str}"
+    cached = profile_cache.get(key, count_miss=persistent_cache is None)
+    if not cached and persistent_cache is not None:
+        await _restore_from_disk(key)
+        cached = profile_cache.get(key)
+    if cached:
+        data, is_stale = cached
+        if is_stale:
+            _schedule_refresh(key, character_name, realm, region, fields_str)
     else:
-        # Default fields
-        base_url += "&fields=gear,guild,raid_progression,mythic_plus_scores_by_season:current,mythic_plus_best_runs,mythic_plus_ranks"
+        data = await _fetch_and_cache(key, character_name, realm, region, fields_str, priority, deadline)
+
+    if data is not None:
+        leaderboards.record_current(data)
+    if as_model and data is not None:
+        return CharacterProfile.from_dict(data)
+    return data
+
+def _fields_str(fields):
+    if fields:
+        return ",".join(fields) if isinstance(fields, list) else fields
+    return DEFAULT_FIELDS
+
+async def find_stale_character(character_name, realm, regions=None, fields=None):
+    """
+    Find a cached profile that is past its TTL, without making any request.
+
+    Used to answer right away from local data and refresh afterwards. Regions
+    are checked in the same order find_character_in_regions() would try them.
+
+    Args:
+        character_name (str): The name of the character.
+        realm (str): The realm/server the character is on.
+        regions (list, optional): Regions to check. Defaults to DEFAULT_REGIONS.
+        fields (list, optional): Fields the profile was fetched with. Defaults to DEFAULT_FIELDS.
+
+    Returns:
+        tuple: (profile, age in seconds), or None if no stale profile is cached.
+            Fresh profiles also return None; get_character_profile() serves them without a request.
+    """
+    fields_str = _fields_str(fields)
+    regions = list(regions or DEFAULT_REGIONS)
+    known_region = realm_index.get(realm)
+    if known_region in regions:
+        regions.remove(known_region)
+        regions.insert(0, known_region)
+
+    for region in regions:
+        key = ProfileCache.make_key(character_name, realm, region, fields_str)
+        cached = profile_cache.peek(key)
+        if cached is None and persistent_cache is not None and await _restore_from_disk(key):
+            cached = profile_cache.peek(key)
+        if cached is None:
+            continue
+
+        data, age = cached
+        if age <= profile_cache.ttl:
+            # Counted by the lookup that serves it
+            return None
+        profile_cache.count_hit(key, is_stale=True)
+        leaderboards.record_current(data)
+        return data, age
+    return None
+
+async def refresh_character_profile(character_name, realm, region, fields=None, priority=PRIORITY_INTERACTIVE):
+    """
+    Fetch a profile from Raider.io even if it is cached, and update the cache.
+
+    Concurrent refreshes and lookups of the same profile share one request.
+
+    Args:
+        character_name (str): The name of the character.
+        realm (str): The realm/server the character is on.
+        region (str): The region (us, eu, etc.).
+        fields (list, optional): Fields to include in the response. Defaults to DEFAULT_FIELDS.
+        priority (int, optional): Rate limiter priority. Defaults to PRIORITY_INTERACTIVE.
+
+    Returns:
+        dict: Character profile data or None if the character no longer exists.
+
+    Raises:
+        RaiderIORateLimited: If Raider.io is still throttling us after retrying.
+        RaiderIOUnavailable: If Raider.io is failing or can't be reached.
+    """
+    fields_str = _fields_str(fields)
+    key = ProfileCache.make_key(character_name, realm, region, fields_str)
+    data = await _fetch_and_cache(key, character_name, realm, region, fields_str, priority)
+    if data is not None:
+        leaderboards.record_current(data)
+    return data
+
+async def _restore_from_disk(key, fresh=False):
+    """
+    Load a profile saved before a restart, or by another worker, into the in-memory cache.
+
+    Args:
+        key (tuple): Profile cache key.
+        fresh (bool, optional): Read the disk even if the key was just found missing there.
+
+    Returns:
+        bool: True if a usable profile was restored.
+    """
+    if not fresh and key in _disk_misses:
+        return False
+
+    stored = await persistent_cache.get_profile(key)
+    if stored is None or stored[1] > profile_cache.ttl + profile_cache.stale_ttl:
+        _disk_misses.add(key)
+        return False
+
+    data, age = stored
+    profile_cache.restore(key, data, age)
+    return True
+
+class _Flight:
+    """The callers waiting on one profile request: their most urgent priority and most generous deadline."""
+
+    __slots__ = ('priority', 'deadline', 'waiters')
+
+    def __init__(self, priority):
+        self.priority = SharedPriority(priority)
+        self.deadline = SharedDeadline()
+        self.waiters = 0
+
+    def join(self, priority, deadline):
+        self.priority.raise_to(priority)
+        self.deadline.add(deadline)
+        self.waiters += 1
+
+async def _fetch_and_cache(key, character_name, realm, region, fields_str, priority, deadline=None):
+    """
+    Fetch a profile and store it in the profile cache.
+
+    Concurrent calls for the same key share a single outstanding request. It
+    waits for rate limiter tokens at the most urgent priority of its callers,
+    so an interactive lookup joining a background refresh isn't queued
+    behind other background work, and runs until the most generous of their
+    deadlines. Each caller stops waiting at its own deadline.
+
+    Raises:
+        RaiderIOTimeout: If the caller's deadline passed before the request finished.
+    """
+    flight = _flights.get(key)
+    if flight is None:
+        flight = _flights[key] = _Flight(priority)
+    flight.join(priority, deadline)
+
+    async def fetch():
+        token_acquired = False
+        if shared_budget is not None:
+            # Another worker may have fetched the profile while this one waited for a token
+            await rate_limiter.acquire(flight.priority)
+            if await _restore_from_disk(key, fresh=True):
+                rate_limiter.deposit(1)
+                return profile_cache.peek(key)[0]
+            token_acquired = True
+
+        breaker = get_region_breaker(region)
+        if not breaker.allow():
+            if token_acquired:
+                rate_limiter.deposit(1)
+            raise RaiderIOUnavailable(f"Skipping {region.upper()} region while it is failing")
+
+        try:
+            data = await _fetch_character_profile(
+                character_name, realm, region, fields_str, flight.priority, flight.deadline, token_acquired
+            )
+        except RaiderIOTimeout:
+            # Running out of interaction time says nothing about the region's health
+            breaker.release()
+            raise
+        except RaiderIOUnavailable:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Rate limits, client errors and cancellation don't show whether the region is healthy,
+            # but a half-open trial has to be handed back or the region stays skipped
+            breaker.release()
+            raise
+        breaker.record_success()
+
+        if data:
+            data = profile_cache.set(key, data)
+            not_found_cache.discard(key[:3])
+            if persistent_cache is not None:
+                persistent_cache.put_profile(key, data)
+                _disk_misses.discard(key)
+        return data
+
+    try:
+        if deadline is None:
+            return await profile_requests.do(key, fetch)
+        try:
+            return await asyncio.wait_for(profile_requests.do(key, fetch), deadline.remaining())
+        except asyncio.TimeoutError:
+            raise RaiderIOTimeout(f"Ran out of time waiting for {character_name}-{realm} ({region})") from None
+    finally:
+        flight.waiters -= 1
+        if flight.waiters == 0 and _flights.get(key) is flight:
+            del _flights[key]
+
+def _schedule_refresh(key, character_name, realm, region, fields_str):
+    """Refresh a stale profile in the background unless a request is already running."""
+    if profile_requests.in_flight(key):
+        return
+
+    task = asyncio.create_task(_refresh(key, character_name, realm, region, fields_str))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def _refresh(key, character_name, realm, region, fields_str):
+    """Refresh a cached profile at background priority, keeping the old one on failure."""
+    try:
+        await _fetch_and_cache(key, character_name, realm, region, fields_str, PRIORITY_BACKGROUND)
+    except RaiderIOError as e:
+        logger.warning(f"Background refresh failed for {character_name}-{realm} ({region}): {e}")
+
+async def _fetch_character_profile(character_name, realm, region, fields_str, priority=PRIORITY_INTERACTIVE,
+                                   deadline=None, token_acquired=False):
+    """
+    Fetch a character profile from the Raider.io API, bypassing the cache.
+
+    Throttled (429) and failed (5xx) requests are retried with jittered
+    exponential backoff, honoring any Retry-After header. With a deadline,
+    each request's timeout is cut to the time left, and retries that
+    couldn't finish in time aren't attempted.
+
+    Args:
+        character_name (str): The name of the character.
+        realm (str): The realm/server the character is on.
+        region (str): The region (us, eu, etc.).
+        fields_str (str): Comma separated fields to include in the response.
+        priority (int or SharedPriority, optional): Rate limiter priority. Defaults to PRIORITY_INTERACTIVE.
+        deadline (Deadline or SharedDeadline, optional): Time budget of the interaction.
+        token_acquired (bool, optional): The caller already holds a rate limiter token for the first request.
+
+    Returns:
+        dict: Character profile data or None if the character doesn't exist.
+
+    Raises:
+        RaiderIORateLimited: If Raider.io is still throttling us after retrying.
+        RaiderIOUnavailable: If Raider.io is failing or can't be reached.
+        RaiderIOTimeout: If the deadline left no time for a request or a retry.
+    """
+    # Use the simplest possible approach that we know works
+    base_url = f"{RAIDERIO_API_URL}/characters/profile?region={region}&realm={realm}&name={character_name}"
+    base_url += f"&fields={fields_str}"
 
     # Don't use the API key as it seems to be causing issues
     # if RAIDERIO_API_KEY:
     #     base_url += f"&api_key={RAIDERIO_API_KEY}"
 
-    logger.info(f"Making request to: {base_url}")
+    for attempt in range(RAIDERIO_MAX_RETRIES + 1):
+        timeout = None
+        if deadline is not None:
+            timeout = deadline.timeout(get_client().timeout.total)
+            if timeout <= 0:
+                raise RaiderIOTimeout(f"No time left to look up {character_name}-{realm} ({region})")
 
-    headers = {
-        'Accept': 'application/json',
-        'User-Agent': 'RaiderBot Discord Bot'
-    }
+        try:
+            status, headers, body = await _hedged_get(
+                base_url, region, priority, timeout, token_acquired=token_acquired and attempt == 0
+            )
+            if status == 200:
+                logger.info("Character found", extra=log_fields(
+                    "raiderio.found", character=body['name'], realm=body['realm'], region=region
+                ))
+                return body
+
+            logger.debug("API Response: %s", body)
+
+            if status in (400, 404):
+                # Character not found or invalid parameters
+                logger.info("Character not found", extra=log_fields(
+                    "raiderio.not_found", character=character_name, realm=realm, region=region
+                ))
+                not_found_cache.add(ProfileCache.make_key(character_name, realm, region, None)[:3])
+                return None
+
+            if status == 429:
+                retry_after = _parse_retry_after(headers.get('Retry-After'))
+                delay = retry_after if retry_after is not None else _backoff_delay(attempt)
+                rate_limiter.pause(delay)
+                if attempt == RAIDERIO_MAX_RETRIES or delay > RAIDERIO_MAX_RETRY_WAIT:
+                    raise RaiderIORateLimited(
+                        f"Rate limited by Raider.io looking up {character_name}-{realm} ({region})",
+                        retry_after=delay
+                    )
+                logger.warning(f"Rate limited by Raider.io, retrying in {delay:.1f}s")
+            elif status >= 500:
+                delay = _backoff_delay(attempt)
+                if attempt == RAIDERIO_MAX_RETRIES:
+                    raise RaiderIOUnavailable(
+                        f"Raider.io returned {status} looking up {character_name}-{realm} ({region})"
+                    )
+                logger.warning(f"Raider.io returned {status}, retrying in {delay:.1f}s")
+            else:
+                raise RaiderIOError(
+                    f"Raider.io returned {status} looking up {character_name}-{realm} ({region})"
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if deadline is not None and deadline.expired:
+                raise RaiderIOTimeout(f"Ran out of time looking up {character_name}-{realm} ({region})") from e
+            delay = _backoff_delay(attempt)
+            if attempt == RAIDERIO_MAX_RETRIES:
+                raise RaiderIOUnavailable(f"Couldn't reach Raider.io: {e!r}") from e
+            logger.warning(f"Exception while fetching character data, retrying in {delay:.1f}s: {e!r}")
+
+        if deadline is not None and deadline.remaining() <= delay:
+            raise RaiderIOTimeout(f"No time left to retry {character_name}-{realm} ({region})")
+        await asyncio.sleep(delay)
+
+async def _get(url, region, priority, timeout=None, token_acquired=False):
+    """
+    Send one rate limited GET request and record its latency and outcome.
+
+    Args:
+        timeout (float, optional): Seconds allowed for the request, instead of the client's timeout.
+        token_acquired (bool, optional): The caller already took the rate limiter token for this request.
+
+    Returns:
+        tuple: (status, headers, body) where body is the decoded JSON for a
+               200 response and the response text otherwise.
+    """
+    if not token_acquired:
+        await rate_limiter.acquire(priority)
+    logger.info("Raider.io request", extra=log_fields("raiderio.request", region=region, url=url))
 
+    started = time.perf_counter()
+    outcome = "error"
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(base_url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    logger.info(f"Success! Character found: {data['name']} on {data['realm']}")
-                    return data
-                else:
-                    # Character not found or invalid parameters
-                    logger.warning(f"Character not found: {character_name}-{realm} ({region})")
-                    response_text = await response.text()
-                    logger.debug(f"API Response: {response_text}")
-                    return None
-    except Exception as e:
-        logger.error(f"Exception while fetching character data: {e}")
+        client = get_client()
+        session = await client.get_session()
+        request_timeout = client.timeout
+        if timeout is not None and timeout < client.timeout.total:
+            request_timeout = aiohttp.ClientTimeout(total=timeout, connect=min(client.timeout.connect, timeout))
+        async with session.get(url, timeout=request_timeout) as response:
+            outcome = _status_outcome(response.status)
+            if response.status == 200:
+                return response.status, response.headers, await response.json(loads=fast_json.loads)
+            return response.status, response.headers, await response.text()
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        raise
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        metrics.raiderio_request_seconds.observe(time.perf_counter() - started, region, PROFILE_ENDPOINT)
+        metrics.raiderio_requests.inc(region, PROFILE_ENDPOINT, outcome)
+
+def _status_outcome(status):
+    """Name the outcome of a response for metrics."""
+    if status == 200:
+        return "hit"
+    if status in (400, 404):
+        return "404"
+    if status == 429:
+        return "429"
+    if status >= 500:
+        return "5xx"
+    return str(status)
+
+async def _hedged_get(url, region, priority, timeout=None, token_acquired=False):
+    """
+    Send a GET request, and a second copy if the first is slow to answer.
+
+    Whichever copy finishes first wins and the other is cancelled. Hedging is
+    disabled when RAIDERIO_HEDGE_DELAY is 0.
+    """
+    if RAIDERIO_HEDGE_DELAY <= 0:
+        return await _get(url, region, priority, timeout, token_acquired)
+
+    primary = asyncio.create_task(_get(url, region, priority, timeout, token_acquired))
+    tasks = {primary}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=RAIDERIO_HEDGE_DELAY)
+        if not done:
+            logger.info(f"No answer after {RAIDERIO_HEDGE_DELAY:.1f}s, sending hedged request")
+            tasks.add(asyncio.create_task(_get(url, region, priority, timeout)))
+
+        while True:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                # Only give up on a failed copy if the other one has failed too
+                if task.exception() is None or not tasks:
+                    return task.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+def _parse_retry_after(value):
+    """Parse a Retry-After header given in seconds."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
         return None
 
-async def find_character_in_regions(character_name, realm, regions=None):
+def _backoff_delay(attempt):
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, RAIDERIO_RETRY_BASE_DELAY * (2 ** attempt))
+
+async def find_character_in_regions(character_name, realm, regions=None, concurrent=None,
+                                    priority=PRIORITY_INTERACTIVE, timeout=RAIDERIO_LOOKUP_TIMEOUT, fields=None,
+                                    deadline=None):
     """
     Try to find a character in multiple regions.
 
+    With a deadline, the lookup ends by the time the interaction has to be
+    answered, and regions after the first ones tried are skipped once too
+    little time is left for them.
+
     Args:
         character_name (str): The name of the character.
         realm (str): The realm/server the character is on.
-        regions (list, optional): List of regions to try. Defaults to DEFAULT_REGIONS.
+        regions (list, optional): List of regions to try, in priority order. Defaults to DEFAULT_REGIONS.
+        concurrent (bool, optional): Probe all regions at once. Defaults to CONCURRENT_REGION_LOOKUP.
+        priority (int, optional): Rate limiter priority. Defaults to PRIORITY_INTERACTIVE.
+        timeout (float, optional): Seconds allowed for the whole lookup. Defaults to RAIDERIO_LOOKUP_TIMEOUT.
+        fields (list, optional): Fields to include in the response. Defaults to DEFAULT_FIELDS.
+        deadline (Deadline, optional): Time budget of the interaction the lookup answers.
 
     Returns:
         dict: Character profile data or None if not found in any region.
+
+    Raises:
+        RaiderIOError: If the character wasn't found and at least one region
+                       couldn't be checked because of throttling or server errors.
+        RaiderIOTimeout: If the lookup ran out of time.
+    """
+    if deadline is not None:
+        timeout = deadline.timeout(timeout)
+    # Regions the character is known to be missing from, for partial answers when time runs out
+    checked = []
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        character_data = await asyncio.wait_for(
+            _find_character(character_name, realm, regions, concurrent, priority, fields, checked, deadline),
+            timeout
+        )
+        outcome = "found" if character_data else "not_found"
+        return character_data
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        raise RaiderIOTimeout(
+            f"Lookup for {character_name}-{realm} took longer than {timeout:.1f}s", list(checked)
+        ) from None
+    except RaiderIOTimeout:
+        outcome = "timeout"
+        raise
+    except RaiderIORateLimited:
+        outcome = "rate_limited"
+        raise
+    except RaiderIOUnavailable:
+        outcome = "unavailable"
+        raise
+    finally:
+        metrics.lookup_seconds.observe(time.perf_counter() - started, outcome)
+
+def _phase(deadline, name):
+    """Time a block as a phase of the deadline's budget, if there is a deadline."""
+    return deadline.phase(name) if deadline is not None else contextlib.nullcontext()
+
+def _check_time_for_more_regions(character_name, realm, deadline, checked):
+    """Give up before probing more regions when the deadline leaves too little time for them."""
+    if deadline is not None and not deadline.allows_optional():
+        logger.info("Skipping remaining regions", extra=log_fields(
+            "lookup.out_of_time", character=character_name, realm=realm, checked=",".join(checked)
+        ))
+        raise RaiderIOTimeout(f"No time left to check more regions for {character_name}-{realm}", checked)
+
+async def _find_character(character_name, realm, regions, concurrent, priority, fields, checked, deadline=None):
+    """
+    Look a character up across regions; see find_character_in_regions.
+
+    Regions the character is confirmed missing from are added to ``checked``
+    as soon as they answer, so a caller that times out can still tell which
+    regions were ruled out.
     """
     if regions is None:
         regions = DEFAULT_REGIONS
+    if concurrent is None:
+        concurrent = CONCURRENT_REGION_LOOKUP
+    errors = []
 
-    for region in regions:
-        logger.info(f"Trying to find {character_name} on {realm} in {region.upper()} region")
-        character_data = await get_character_profile(character_name, realm, region)
-
+    # Go straight to the realm's region, when the realm list or an earlier lookup pins it to one
+    known_region = realm_index.get(realm)
+    if known_region in regions:
+        logger.info("Trying known region", extra=log_fields(
+            "lookup.region", character=character_name, realm=realm, region=known_region
+        ))
+        with _phase(deadline, "known_region"):
+            character_data = await _try_region(character_name, realm, known_region, priority, fields, errors, deadline)
         if character_data:
-            logger.info(f"Character found in {region.upper()} region")
             return character_data
+        if not errors:
+            checked.append(known_region)
+        regions = [region for region in regions if region != known_region]
+        if regions:
+            _check_time_for_more_regions(character_name, realm, deadline, checked)
+
+    if concurrent:
+        with _phase(deadline, "regions"):
+            character_data = await _find_character_concurrently(
+                character_name, realm, regions, priority, fields, errors, checked, deadline
+            )
+    else:
+        character_data = None
+        with _phase(deadline, "regions"):
+            for index, region in enumerate(regions):
+                if index:
+                    _check_time_for_more_regions(character_name, realm, deadline, checked)
+                logger.info("Trying region", extra=log_fields(
+                    "lookup.region", character=character_name, realm=realm, region=region
+                ))
+                failures = len(errors)
+                character_data = await _try_region(character_name, realm, region, priority, fields, errors, deadline)
+
+                if character_data:
+                    logger.info("Character found in region", extra=log_fields("lookup.found", region=region))
+                    break
+                if len(errors) == failures:
+                    checked.append(region)
+
+    if character_data:
+        if character_data.get('region'):
+            realm_index.learn(realm, character_data['region'])
+        return character_data
 
-    logger.warning(f"Character {character_name} not found on {realm} in any region")
+    if errors:
+        # A region we couldn't check might have had the character, so don't report it as missing
+        raise errors[0]
+
+    logger.info("Character not found in any region", extra=log_fields(
+        "lookup.not_found", character=character_name, realm=realm
+    ))
     return None
+
+async def _try_region(character_name, realm, region, priority, fields, errors, deadline=None):
+    """Look a character up in one region, collecting Raider.io errors instead of raising them."""
+    try:
+        return await get_character_profile(
+            character_name, realm, region, fields=fields, priority=priority, deadline=deadline
+        )
+    except RaiderIOError as e:
+        logger.warning(f"Couldn't check {region.upper()} region for {character_name}-{realm}: {e}")
+        errors.append(e)
+        return None
+
+async def _find_character_concurrently(character_name, realm, regions, priority, fields, errors, checked,
+                                      deadline=None):
+    """
+    Probe every region at once and return the highest-priority hit.
+
+    Results are awaited in region order, so a character that exists in several
+    regions always resolves to the same one. Requests still in flight once the
+    winner is known are cancelled. Each region that answers without the
+    character is added to ``checked`` as soon as it does.
+    """
+    logger.info("Trying regions", extra=log_fields(
+        "lookup.region", character=character_name, realm=realm, regions=",".join(regions)
+    ))
+
+    async def probe(region):
+        region_errors = []
+        character_data = await _try_region(character_name, realm, region, priority, fields, region_errors, deadline)
+        errors.extend(region_errors)
+        if not character_data and not region_errors:
+            checked.append(region)
+        return character_data
+
+    tasks = {region: asyncio.create_task(probe(region)) for region in regions}
+
+    try:
+        for region in regions:
+            character_data = await tasks[region]
+
+            if character_data:
+                logger.info("Character found in region", extra=log_fields("lookup.found", region=region))
+                return character_data
+        return None
+    finally:
+        for task in tasks.values():
+            if not task.done():
+                task.cancel()
+
+async def get_character_details(profile, realm, priority=PRIORITY_INTERACTIVE, deadline=None):
+    """
+    Fetch the expensive fields for a profile that was looked up with LEAN_FIELDS.
+
+    Only DETAIL_FIELDS are requested; they are merged over the base profile,
+    so nothing already fetched is requested again. When the deadline leaves
+    little time, the ranks are left out.
+
+    Args:
+        profile (dict): The base character profile.
+        realm (str): The realm as it was used for the base lookup.
+        priority (int, optional): Rate limiter priority. Defaults to PRIORITY_INTERACTIVE.
+        deadline (Deadline, optional): Time budget of the interaction the details answer.
+
+    Returns:
+        dict: The base profile with the detail fields added, or None if the character is gone.
+
+    Raises:
+        RaiderIOTimeout: If the details couldn't be fetched before the deadline.
+    """
+    fields = DETAIL_FIELDS
+    if deadline is not None and not deadline.allows_optional():
+        fields = DETAIL_FIELDS_WITHOUT_RANKS
+    lookup = get_character_profile(
+        profile['name'], realm, profile['region'], fields=fields, priority=priority, deadline=deadline
+    )
+    if deadline is None:
+        details = await lookup
+    else:
+        try:
+            details = await asyncio.wait_for(lookup, deadline.remaining())
+        except asyncio.TimeoutError:
+            raise RaiderIOTimeout(f"Details for {profile['name']}-{realm} took too long") from None
+    if details is None:
+        return None
+
+    merged = dict(profile)
+    merged.update(details)
+    return merged
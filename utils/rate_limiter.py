@@ -0,0 +1,271 @@
+"""
+Client-side rate limiting for outbound Raider.io requests.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0
+# Roster lookups someone is waiting on, behind single lookups
+PRIORITY_BATCH = 5
+PRIORITY_BACKGROUND = 10
+
+class SharedPriority:
+    """
+    Priority of a request several callers wait on, raised when a more urgent caller joins.
+
+    Pass it to RateLimiter.acquire() instead of a number: a request still
+    waiting for its token moves up the queue as soon as raise_to() lowers
+    its priority.
+    """
+
+    __slots__ = ('value', '_listeners')
+
+    def __init__(self, value):
+        """
+        Args:
+            value (int): Priority of the caller that started the request.
+        """
+        self.value = value
+        self._listeners = set()
+
+    def raise_to(self, value):
+        """
+        Serve the request at least as early as a caller with this priority.
+
+        Args:
+            value (int): Priority of the caller that joined.
+        """
+        if value >= self.value:
+            return
+        self.value = value
+        for listener in list(self._listeners):
+            listener(value)
+
+class RateLimiter:
+    """
+    Token bucket shared by every outbound request.
+
+    Callers wait in a priority queue, so interactive lookups are always
+    granted a token before background work. The whole bucket can be paused,
+    which is used to honor ``Retry-After`` on 429 responses.
+
+    In cluster mode the bucket stops refilling on its own and leases tokens
+    from a budget shared with the other processes instead; see attach_budget().
+    """
+
+    def __init__(self, rate, burst):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            burst (int): Maximum number of tokens the bucket can hold.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []
+        self._counter = itertools.count()
+        self._timer = None
+        self.budget = None
+        self._demand = None
+        self._lease_task = None
+        self._budget_tasks = set()
+
+        self.granted = 0
+        self.waited = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.budget is None:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return now
+
+    def attach_budget(self, budget, lease_interval=0.1):
+        """
+        Lease tokens from a budget shared with other processes instead of refilling locally.
+
+        Waiting callers still queue here in priority order; a background task
+        takes just enough tokens from the shared budget to serve them, and
+        429 pauses are shared in both directions.
+
+        Args:
+            budget (SharedRateBudget): An open shared budget.
+            lease_interval (float, optional): Seconds between leases while the budget is empty.
+        """
+        self.budget = budget
+        self._tokens = 0.0
+        self._demand = asyncio.Event()
+        self._lease_task = asyncio.create_task(self._lease_loop(lease_interval))
+
+    async def detach_budget(self):
+        """Stop leasing from the shared budget and go back to refilling locally."""
+        if self._lease_task is not None:
+            self._lease_task.cancel()
+            try:
+                await self._lease_task
+            except asyncio.CancelledError:
+                pass
+            self._lease_task = None
+        self.budget = None
+
+    async def _lease_loop(self, interval):
+        while True:
+            try:
+                await asyncio.wait_for(self._demand.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._demand.clear()
+
+            # Keep one token in hand, so a lone request doesn't wait for a lease
+            wanted = self._queued() + 1 - int(self._tokens)
+            if wanted <= 0:
+                continue
+            try:
+                granted, paused_for = await self.budget.take(wanted)
+            except Exception as e:
+                logger.error(f"Failed to lease from the shared rate budget: {e}")
+                continue
+            if paused_for > 0:
+                self.pause(paused_for, share=False)
+            if granted:
+                self.deposit(granted)
+
+    def deposit(self, tokens):
+        """
+        Add leased tokens and serve waiting callers.
+
+        Args:
+            tokens (int): Tokens taken from the shared budget.
+        """
+        self._tokens = min(self.burst, self._tokens + tokens)
+        if self._waiters and self._timer is None:
+            self._pump()
+
+    def _queued(self):
+        # A waiter whose priority was raised is queued twice
+        return len({id(future) for _, _, future in self._waiters if not future.done()})
+
+    async def acquire(self, priority=PRIORITY_INTERACTIVE):
+        """
+        Wait until a request may be sent.
+
+        Args:
+            priority (int or SharedPriority, optional): Queue priority, lower is
+                served first. Defaults to PRIORITY_INTERACTIVE.
+        """
+        shared = priority if isinstance(priority, SharedPriority) else None
+        if shared is not None:
+            priority = shared.value
+
+        now = self._refill()
+        if not self._waiters and now >= self._paused_until and self._tokens >= 1:
+            self._tokens -= 1
+            self.granted += 1
+            if self.budget is not None and self._tokens < 1:
+                self._demand.set()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self.waited += 1
+        if self._timer is None:
+            self._pump()
+        if shared is None:
+            await future
+            return
+
+        def requeue(value):
+            # The old entry stays behind and is skipped once the future is done
+            if not future.done():
+                heapq.heappush(self._waiters, (value, next(self._counter), future))
+
+        shared._listeners.add(requeue)
+        try:
+            await future
+        finally:
+            shared._listeners.discard(requeue)
+
+    def pause(self, seconds, share=True):
+        """
+        Stop granting tokens for a while.
+
+        Args:
+            seconds (float): How long to pause, e.g. from a Retry-After header.
+            share (bool, optional): Also pause the other processes sharing the budget, if any.
+        """
+        if share and self.budget is not None:
+            task = asyncio.create_task(self.budget.pause(seconds))
+            self._budget_tasks.add(task)
+            task.add_done_callback(self._budget_tasks.discard)
+
+        paused_until = time.monotonic() + seconds
+        if paused_until <= self._paused_until:
+            return
+
+        logger.warning(f"Pausing Raider.io requests for {seconds:.1f}s")
+        self._paused_until = paused_until
+        self._tokens = 0.0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._waiters:
+            self._pump()
+
+    def _pump(self):
+        """Hand out tokens to waiters in priority order and schedule the next run."""
+        self._timer = None
+        now = self._refill()
+
+        while self._waiters:
+            _, _, future = self._waiters[0]
+            if future.done():
+                # The waiter was cancelled
+                heapq.heappop(self._waiters)
+                continue
+
+            if now < self._paused_until:
+                delay = self._paused_until - now
+                break
+
+            if self._tokens < 1:
+                if self.budget is not None:
+                    # More tokens arrive through deposit()
+                    self._demand.set()
+                    return
+                delay = (1 - self._tokens) / self.rate
+                break
+
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            self.granted += 1
+            future.set_result(None)
+        else:
+            return
+
+        self._timer = asyncio.get_running_loop().call_later(delay, self._pump)
+
+    def stats(self):
+        """
+        Get the limiter state and counters.
+
+        Returns:
+            dict: Available tokens, queue length and grant counters.
+        """
+        self._refill()
+        return {
+            'tokens': round(self._tokens, 2),
+            'queued': self._queued(),
+            'shared': self.budget is not None,
+            'paused_for': max(0.0, self._paused_until - time.monotonic()),
+            'granted': self.granted,
+            'waited': self.waited,
+        }
@@ -0,0 +1,138 @@
+"""
+Persisted index of which region each realm belongs to.
+"""
+
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+class RealmRegionIndex:
+    """
+    Realm to region mapping, from the realm list or learned from successful lookups.
+
+    A realm the realm list has in exactly one region is in that region. Many
+    realm names exist in several regions; for those the region a lookup last
+    found doesn't say where the next name is, so they have no known region
+    and keep the default region order. Only realms missing from the list,
+    such as ones added after it was bundled, are learned.
+
+    Learned mappings are loaded from disk on first use and written back
+    whenever a new one is learned. Realms are few and rarely new, so writes
+    are rare. If a persistent cache is attached, mappings are stored there
+    instead.
+    """
+
+    def __init__(self, path, realm_list=None):
+        """
+        Args:
+            path (str): JSON file the index is stored in.
+            realm_list (RealmList, optional): Known realms per region. Without it every realm is learned.
+        """
+        self.path = path
+        self.realm_list = realm_list
+        self.store = None
+        self._regions = None
+
+    async def attach_store(self, store):
+        """
+        Keep mappings in a persistent cache instead of the JSON file.
+
+        Mappings already in the JSON file are carried over to the store.
+
+        Args:
+            store (PersistentCache): An open persistent cache.
+        """
+        self._load()
+        for realm, region in self._regions.items():
+            store.put_realm(realm, region)
+        self._regions.update(await store.load_realms())
+        self.store = store
+
+    async def refresh(self):
+        """Pick up mappings other processes wrote to the attached store."""
+        if self.store is None:
+            return
+        self._load()
+        self._regions.update(await self.store.load_realms())
+
+    @staticmethod
+    def normalize(realm):
+        """Normalize a realm name the way lookups receive it."""
+        return realm.strip().lower()
+
+    def _load(self):
+        if self._regions is not None:
+            return
+
+        self._regions = {}
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._regions = json.load(f)
+            logger.info(f"Loaded {len(self._regions)} realm region mapping(s) from {self.path}")
+        except Exception as e:
+            logger.error(f"Failed to load realm region index from {self.path}: {e}")
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._regions, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to save realm region index to {self.path}: {e}")
+
+    def listed_regions(self, realm):
+        """Regions the realm list has the realm in; empty if it isn't listed."""
+        if self.realm_list is None:
+            return set()
+        return {known.region for known in self.realm_list.resolve(realm)}
+
+    def get(self, realm):
+        """
+        Get the known region for a realm.
+
+        Args:
+            realm (str): The realm/server name.
+
+        Returns:
+            str: The region, or None if the realm exists in several regions or
+                 is missing from the realm list and hasn't been seen.
+        """
+        listed = self.listed_regions(realm)
+        if listed:
+            return listed.pop() if len(listed) == 1 else None
+        self._load()
+        return self._regions.get(self.normalize(realm))
+
+    def learn(self, realm, region):
+        """
+        Record the region a realm was found in.
+
+        Args:
+            realm (str): The realm/server name.
+            region (str): The region the character was found in.
+        """
+        # The realm list already says where listed realms are
+        if self.listed_regions(realm):
+            return
+        self._load()
+        realm = self.normalize(realm)
+        region = region.lower()
+        if self._regions.get(realm) == region:
+            return
+
+        self._regions[realm] = region
+        if self.store is not None:
+            self.store.put_realm(realm, region)
+        else:
+            self._save()
+
+    def __len__(self):
+        self._load()
+        return len(self._regions)
@@ -0,0 +1,167 @@
+"""
+Prefix index over the bundled realm list, for realm autocomplete and realm name cleanup.
+"""
+
+import bisect
+import json
+import logging
+import re
+import unicodedata
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+Realm = namedtuple('Realm', ['name', 'slug', 'region'])
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+def normalize_realm(text):
+    """
+    Reduce a realm name to the letters and digits that identify it.
+
+    "Area 52", "area-52" and "AREA52" all become "area52", and "Aggra (Português)"
+    becomes "aggraportugues", so typos in spacing, punctuation and accents still match.
+
+    Args:
+        text (str): A realm name or slug as typed.
+
+    Returns:
+        str: The normalized key.
+    """
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    return _NON_ALNUM.sub('', text)
+
+def _words(text):
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    return [word for word in re.split(r"[\s\-()]+", text.replace("'", "")) if word]
+
+class RealmList:
+    """
+    Every known realm, indexed for prefix search.
+
+    The index is a sorted list of normalized keys searched with bisect: one
+    key per realm name, plus one per later word so "52" finds "Area 52" and
+    "nerub" finds "Azjol-Nerub". Everything is in memory, so a search takes
+    microseconds and never touches the network.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): JSON file with a list of {"name", "slug"} realms per region.
+        """
+        self.path = path
+        self.realms = None
+        self._keys = []
+        self._entries = []
+        self._exact = {}
+        self._by_name = []
+
+    def load(self):
+        """Load the realm list and build the index."""
+        realms = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for region, entries in data.items():
+                for entry in entries:
+                    realms.append(Realm(entry['name'], entry['slug'], region.lower()))
+        except Exception as e:
+            logger.error(f"Failed to load realm list from {self.path}: {e}")
+
+        index = []
+        exact = {}
+        for position, realm in enumerate(realms):
+            full = normalize_realm(realm.name)
+            # Word keys rank after full-name keys for the same prefix
+            index.append((full, 0, position))
+            for word in _words(realm.name)[1:]:
+                index.append((normalize_realm(word), 1, position))
+            for key in {full, normalize_realm(realm.slug)}:
+                exact.setdefault(key, []).append(realm)
+        index.sort()
+
+        self.realms = realms
+        self._keys = [key for key, _, _ in index]
+        self._entries = [(is_word, position) for _, is_word, position in index]
+        self._exact = exact
+        self._by_name = sorted(realms, key=lambda realm: (realm.name.lower(), realm.region))
+        logger.info(f"Indexed {len(realms)} realm(s) from {self.path}")
+
+    def _ensure_loaded(self):
+        if self.realms is None:
+            self.load()
+
+    def search(self, text, region=None, limit=25):
+        """
+        Find realms whose name, or a word in it, starts with the text.
+
+        Args:
+            text (str): What the user has typed so far.
+            region (str, optional): Only return realms in this region.
+            limit (int, optional): Maximum number of realms to return.
+
+        Returns:
+            list: Matching Realm tuples, name matches before word matches.
+        """
+        self._ensure_loaded()
+        prefix = normalize_realm(text or "")
+        region = region.lower() if region else None
+        if not prefix:
+            return [realm for realm in self._by_name if not region or realm.region == region][:limit]
+
+        # Realm position -> 0 if its name matched, 1 if only a later word did
+        ranks = {}
+        start = bisect.bisect_left(self._keys, prefix)
+        for index in range(start, len(self._keys)):
+            if not self._keys[index].startswith(prefix):
+                break
+            is_word, position = self._entries[index]
+            if region and self.realms[position].region != region:
+                continue
+            ranks[position] = min(is_word, ranks.get(position, is_word))
+
+        positions = sorted(
+            ranks,
+            key=lambda position: (ranks[position], self.realms[position].name.lower(), self.realms[position].region)
+        )
+        return [self.realms[position] for position in positions[:limit]]
+
+    def resolve(self, text):
+        """
+        Find the realms a typed realm name refers to, ignoring spacing, punctuation and case.
+
+        Args:
+            text (str): A realm name or slug.
+
+        Returns:
+            list: Realm tuples with that name, one per region it exists in.
+        """
+        self._ensure_loaded()
+        return list(self._exact.get(normalize_realm(text), ()))
+
+    def slug(self, text):
+        """
+        Turn a typed realm name into the slug lookups use.
+
+        Listed realms get their slug, so spacing, punctuation and case typos
+        ("area52", "Area 52") all become "area-52"; other names are only
+        lowercased.
+
+        Args:
+            text (str): A realm name or slug.
+
+        Returns:
+            str: The realm slug.
+        """
+        known_realms = self.resolve(text)
+        return known_realms[0].slug if known_realms else text.strip().lower()
+
+    def regions(self):
+        """Regions in the realm list."""
+        self._ensure_loaded()
+        return sorted({realm.region for realm in self.realms})
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self.realms)
@@ -0,0 +1,109 @@
+"""
+Refreshes the profiles behind lookup replies that were answered from a stale cache, and edits the replies in place.
+"""
+
+import asyncio
+import logging
+import time
+
+import discord
+
+from utils import metrics
+from utils.embed_builder import build_character_embed
+from utils.raiderio_api import LEAN_FIELDS, RaiderIOError, refresh_character_profile
+from utils.scorecard import scorecards
+
+logger = logging.getLogger(__name__)
+
+def _rendered(embed):
+    """The parts of an embed a refresh can change, leaving out the footer with the cache age."""
+    data = embed.to_dict()
+    data.pop('footer', None)
+    return data
+
+class ReplyRefresher:
+    """
+    Brings replies sent from a stale cached profile up to date.
+
+    Replies are grouped by character: a burst of lookups of the same
+    character shares one Raider.io refresh and one render, and only replies
+    whose embed actually changed are edited, one at a time and at least
+    ``edit_interval`` seconds apart, so a burst stays under Discord's edit
+    rate limits.
+    """
+
+    def __init__(self, edit_interval=1.0):
+        """
+        Args:
+            edit_interval (float, optional): Minimum seconds between edits for the same character.
+        """
+        self.edit_interval = edit_interval
+        # Character key -> replies waiting for its refresh, as (message, rendered embed, view)
+        self._pending = {}
+        self._tasks = {}
+
+    def add(self, message, profile, realm, view=None):
+        """
+        Refresh a reply's profile in the background and edit the reply if it changed.
+
+        Args:
+            message (discord.WebhookMessage): The reply showing the cached profile.
+            profile (dict): The cached profile the reply was built from.
+            realm (str): The realm as it was used for the lookup.
+            view (CharacterDetailsView, optional): The reply's view; it is given the refreshed profile.
+        """
+        key = (profile['region'], realm.lower(), profile['name'].lower())
+        self._pending.setdefault(key, []).append((message, _rendered(build_character_embed(profile)), view))
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._run(key, profile['name'], realm, profile['region']))
+
+    def __len__(self):
+        return sum(len(replies) for replies in self._pending.values())
+
+    async def close(self):
+        """Cancel refreshes still running."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, key, character_name, realm, region):
+        """Refresh one character, then edit every reply waiting for it, including ones added meanwhile."""
+        try:
+            try:
+                fresh = await refresh_character_profile(character_name, realm, region, fields=LEAN_FIELDS)
+            except RaiderIOError as e:
+                logger.warning(f"Couldn't refresh cached reply for {character_name}-{realm} ({region}): {e}")
+                fresh = None
+
+            embed = build_character_embed(fresh) if fresh else None
+            rendered = _rendered(embed) if embed else None
+            last_edit = None
+            while self._pending.get(key):
+                message, shown, view = self._pending[key].pop(0)
+                if embed is None:
+                    metrics.progressive_replies.inc("failed")
+                    continue
+                if rendered == shown:
+                    metrics.progressive_replies.inc("unchanged")
+                    continue
+
+                if last_edit is not None:
+                    wait = last_edit + self.edit_interval - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                if view is not None:
+                    view.profile = fresh
+                try:
+                    edited = embed.copy()
+                    files = await scorecards.attach(edited, fresh)
+                    await message.edit(embeds=[edited], attachments=files, view=view)
+                    metrics.progressive_replies.inc("edited")
+                except discord.HTTPException as e:
+                    logger.warning(f"Failed to update cached reply for {character_name}-{realm}: {e}")
+                    metrics.progressive_replies.inc("failed")
+                last_edit = time.monotonic()
+        finally:
+            # No await between the last check of the queue and here, so add() can't miss a running task
+            self._pending.pop(key, None)
+            del self._tasks[key]
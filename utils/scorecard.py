@@ -0,0 +1,311 @@
+"""
+Renders a character's best M+ runs as a scorecard image, using the dungeon art in images/.
+
+Rendering needs Pillow; without it scorecards are turned off and lookups reply with the embed alone.
+"""
+
+import asyncio
+import io
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import discord
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = None
+
+from config import IMAGES_DIR, MAX_MYTHIC_PLUS_RUNS, SCORECARD_CACHE_SIZE, SCORECARD_WORKERS
+from utils.character_profile import CharacterProfile
+from utils.embed_builder import CLASS_COLORS, season_data
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Whether Pillow is installed
+AVAILABLE = Image is not None
+
+SCORECARD_FILENAME = "scorecard.png"
+
+WIDTH = 520
+HEADER_HEIGHT = 72
+ROW_HEIGHT = 60
+ICON_SIZE = 44
+FACTION_ICON_SIZE = 40
+PADDING = 14
+
+BACKGROUND = (30, 31, 34)
+ROW_BACKGROUND = (43, 45, 49)
+TEXT = (242, 243, 245)
+MUTED = (181, 186, 193)
+FALLBACK_TILE = (78, 80, 88)
+
+FACTION_IMAGES = {'horde': 'horde.jpg', 'alliance': 'alliance.png'}
+
+def _load_font(size):
+    # Pillow 10.1+ ships a scalable default font; older versions only have a fixed bitmap one
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+def _rgb(color):
+    return (color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF
+
+class ScorecardAtlas:
+    """
+    Dungeon and faction art, decoded and resized once, plus the fonts the cards use.
+
+    Rendering only pastes these prepared tiles, so no image is decoded or
+    resampled per card.
+    """
+
+    def __init__(self, tiles, version):
+        self.tiles = tiles
+        self.version = version
+        self.fallback = Image.new('RGBA', (ICON_SIZE, ICON_SIZE), FALLBACK_TILE + (255,))
+        self.title_font = _load_font(24)
+        self.text_font = _load_font(18)
+        self.small_font = _load_font(14)
+
+    @classmethod
+    def build(cls, season, images_dir):
+        """
+        Decode and resize every image the cards can show.
+
+        Args:
+            season (SeasonData): Season data naming each dungeon's image.
+            images_dir (str): Directory the images are in.
+
+        Returns:
+            ScorecardAtlas: The prepared tiles, keyed by dungeon slug and ``faction:<name>``.
+        """
+        sources = {dungeon.slug: (dungeon.image, ICON_SIZE) for dungeon in season.dungeons if dungeon.image}
+        sources.update({f"faction:{name}": (image, FACTION_ICON_SIZE) for name, image in FACTION_IMAGES.items()})
+
+        tiles = {}
+        for key, (filename, size) in sources.items():
+            try:
+                with Image.open(os.path.join(images_dir, filename)) as image:
+                    tiles[key] = image.convert('RGBA').resize((size, size), Image.LANCZOS)
+            except OSError as e:
+                logger.warning(f"Couldn't load scorecard image {filename}: {e}")
+        return cls(tiles, season.version)
+
+def render_scorecard(card, atlas):
+    """
+    Draw a scorecard. Runs on a worker thread, so it only touches its arguments.
+
+    Args:
+        card (dict): Header text and the rows to draw, from ScorecardRenderer.
+        atlas (ScorecardAtlas): Prepared images and fonts.
+
+    Returns:
+        bytes: The PNG image.
+    """
+    rows = card['rows']
+    height = HEADER_HEIGHT + PADDING + len(rows) * (ROW_HEIGHT + 6)
+    image = Image.new('RGBA', (WIDTH, height), BACKGROUND + (255,))
+    draw = ImageDraw.Draw(image)
+
+    # Header: class color stripe, faction icon, name, spec and overall score
+    draw.rectangle((0, 0, 5, HEADER_HEIGHT), fill=card['color'])
+    text_x = PADDING + 6
+    faction_tile = atlas.tiles.get(f"faction:{card['faction']}")
+    if faction_tile is not None:
+        image.paste(faction_tile, (text_x, (HEADER_HEIGHT - FACTION_ICON_SIZE) // 2), faction_tile)
+        text_x += FACTION_ICON_SIZE + 10
+    draw.text((text_x, 12), card['title'], font=atlas.title_font, fill=TEXT)
+    draw.text((text_x, 44), card['subtitle'], font=atlas.small_font, fill=MUTED)
+    if card['score'] is not None:
+        score_text = f"{card['score']:.1f}"
+        draw.text((WIDTH - PADDING, 14), score_text, font=atlas.title_font, fill=card['color'], anchor='ra')
+        draw.text((WIDTH - PADDING, 44), "M+ score", font=atlas.small_font, fill=MUTED, anchor='ra')
+
+    y = HEADER_HEIGHT + PADDING // 2
+    for row in rows:
+        draw.rounded_rectangle((PADDING, y, WIDTH - PADDING, y + ROW_HEIGHT), radius=6, fill=ROW_BACKGROUND)
+        tile = atlas.tiles.get(row['slug']) or atlas.fallback
+        image.paste(tile, (PADDING + 8, y + (ROW_HEIGHT - ICON_SIZE) // 2), tile)
+
+        text_x = PADDING + 8 + ICON_SIZE + 12
+        draw.text((text_x, y + 9), f"+{row['level']}", font=atlas.text_font, fill=TEXT)
+        draw.text((text_x + 46, y + 9), row['name'], font=atlas.text_font, fill=TEXT)
+        if row['upgrades']:
+            draw.text((text_x, y + 34), f"Timed, +{row['upgrades']} upgrade{'s' if row['upgrades'] > 1 else ''}",
+                      font=atlas.small_font, fill=MUTED)
+        elif row['upgrades'] == 0:
+            draw.text((text_x, y + 34), "Not timed", font=atlas.small_font, fill=MUTED)
+        if row['score'] is not None:
+            draw.text((WIDTH - PADDING - 10, y + 20), f"{row['score']:.1f}", font=atlas.text_font, fill=TEXT,
+                      anchor='ra')
+        y += ROW_HEIGHT + 6
+
+    output = io.BytesIO()
+    image.save(output, format='PNG')
+    return output.getvalue()
+
+class ScorecardRenderer:
+    """
+    Renders scorecards on a thread pool and caches the finished PNGs.
+
+    Cards are cached by character, ``last_crawled_at`` and season data
+    version, so looking up an unchanged character again sends the bytes
+    already rendered. Concurrent requests for the same card share one render.
+    """
+
+    def __init__(self, season, images_dir, workers=2, cache_size=128):
+        """
+        Args:
+            season (SeasonData): Season data for dungeon names and images.
+            images_dir (str): Directory the images are in.
+            workers (int, optional): Render threads.
+            cache_size (int, optional): Finished cards to keep.
+        """
+        self.season = season
+        self.images_dir = images_dir
+        self.workers = workers
+        self.cache_size = cache_size
+        self._atlas = None
+        self._executor = None
+        self._cache = OrderedDict()
+        self._renders = SingleFlight()
+
+        self.rendered = 0
+        self.hits = 0
+
+    @property
+    def enabled(self):
+        """Whether start() has run and cards can be rendered."""
+        return self._executor is not None
+
+    def start(self):
+        """
+        Build the asset atlas and start the render threads.
+
+        Returns:
+            bool: False if Pillow isn't installed, so scorecards stay off.
+        """
+        if not AVAILABLE:
+            logger.warning("Scorecards are enabled but Pillow isn't installed; replying without them")
+            return False
+        self._atlas = ScorecardAtlas.build(self.season, self.images_dir)
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="scorecard")
+        logger.info(f"Scorecard atlas ready with {len(self._atlas.tiles)} image(s)")
+        return True
+
+    def close(self):
+        """Stop the render threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _card(self, profile):
+        """Everything render_scorecard() draws, resolved on the event loop."""
+        runs = sorted(profile.get('mythic_plus_best_runs') or (), key=lambda run: run.get('score') or 0, reverse=True)
+        rows = []
+        for run in runs[:MAX_MYTHIC_PLUS_RUNS]:
+            dungeon = self.season.for_run(run)
+            rows.append({
+                'slug': dungeon.slug if dungeon else None,
+                'name': dungeon.name if dungeon else run['dungeon'],
+                'level': run['mythic_level'],
+                'score': run.get('score'),
+                'upgrades': run.get('num_keystone_upgrades'),
+            })
+
+        seasons = profile.get('mythic_plus_scores_by_season') or ()
+        return {
+            'title': f"{profile['name']} - {profile['realm']}",
+            'subtitle': f"{profile.get('active_spec_name', '')} {profile.get('class', '')} ({profile['region'].upper()})",
+            'faction': (profile.get('faction') or '').lower(),
+            'color': _rgb(CLASS_COLORS.get(profile.get('class'), 0x0099ff)),
+            'score': seasons[0]['scores']['all'] if seasons else None,
+            'rows': rows,
+        }
+
+    async def render(self, profile):
+        """
+        Get the scorecard for a profile, rendering it if it isn't cached.
+
+        Args:
+            profile (dict | CharacterProfile): Character profile data from Raider.io.
+
+        Returns:
+            bytes: The PNG image, or None if scorecards are off or the profile has no runs.
+        """
+        if not self.enabled:
+            return None
+        if isinstance(profile, CharacterProfile):
+            profile = profile.to_dict()
+        if not profile.get('mythic_plus_best_runs'):
+            return None
+
+        key = None
+        if profile.get('last_crawled_at'):
+            key = (profile.get('profile_url'), profile['last_crawled_at'], self.season.version)
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return data
+
+        loop = asyncio.get_running_loop()
+        if self._atlas.version != self.season.version:
+            # The season file was reloaded, so its images may have changed too
+            self._atlas = await loop.run_in_executor(
+                self._executor, ScorecardAtlas.build, self.season, self.images_dir
+            )
+
+        card = self._card(profile)
+        atlas = self._atlas
+
+        async def draw():
+            self.rendered += 1
+            return await loop.run_in_executor(self._executor, render_scorecard, card, atlas)
+
+        data = await self._renders.do(key or id(card), draw)
+        if key is not None:
+            self._cache[key] = data
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return data
+
+    async def attach(self, embed, profile):
+        """
+        Render the scorecard for a profile and show it as the embed's image.
+
+        Rendering failures are logged and leave the embed without an image.
+
+        Args:
+            embed (discord.Embed): The embed to add the image to.
+            profile (dict | CharacterProfile): Character profile data from Raider.io.
+
+        Returns:
+            list: The discord.File to send with the embed, or an empty list.
+        """
+        try:
+            data = await self.render(profile)
+        except Exception as e:
+            logger.error(f"Failed to render scorecard: {e}")
+            return []
+        if data is None:
+            return []
+
+        embed.set_image(url=f"attachment://{SCORECARD_FILENAME}")
+        return [discord.File(io.BytesIO(data), filename=SCORECARD_FILENAME)]
+
+    def stats(self):
+        """
+        Get the scorecard counters.
+
+        Returns:
+            dict: Renders, cache hits and cached cards.
+        """
+        return {'rendered': self.rendered, 'hits': self.hits, 'cached': len(self._cache)}
+
+# Shared renderer; bot.py starts it when SCORECARD_ENABLED is set
+scorecards = ScorecardRenderer(season_data, IMAGES_DIR, SCORECARD_WORKERS, SCORECARD_CACHE_SIZE)
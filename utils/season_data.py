@@ -0,0 +1,231 @@
+"""
+Static data for the current Mythic+ season, loaded from a bundled JSON file.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DUNGEON_EMOJI = "🏰"
+
+_SLUG = re.compile(r'^[a-z0-9]+(?:-[a-z0-9]+)*$')
+_EMOJI_ID = re.compile(r'^\d{15,21}$')
+_EMOJI_NAME = re.compile(r'^\w{2,32}$')
+
+class SeasonDataError(ValueError):
+    """Raised when the season data file is missing or invalid."""
+
+@dataclass(frozen=True)
+class Dungeon:
+    """One dungeon of the season."""
+    __slots__ = ('slug', 'short_name', 'name', 'challenge_mode_id', 'emoji', 'fallback_emoji', 'image')
+
+    slug: str
+    short_name: str
+    name: str
+    challenge_mode_id: int
+    emoji: str
+    fallback_emoji: str
+    image: str
+
+    @property
+    def display_emoji(self):
+        """The custom emoji if one is configured, otherwise the fallback."""
+        return self.emoji or self.fallback_emoji or DEFAULT_DUNGEON_EMOJI
+
+class SeasonData:
+    """
+    Dungeons of the current season with O(1) lookups by slug, Raider.io id and name.
+
+    The file is validated when it is loaded; an invalid file raises
+    SeasonDataError on the first load and is ignored (keeping the data
+    already loaded) on a reload. ``watch()`` reloads the file whenever it
+    changes, so a new season only needs a new file, not a restart.
+    """
+
+    def __init__(self, path, images_dir=None):
+        """
+        Args:
+            path (str): JSON file with the season's dungeons.
+            images_dir (str, optional): Directory dungeon images must exist in.
+        """
+        self.path = path
+        self.images_dir = images_dir
+        self.season = None
+        self.name = None
+        # Bumped on every successful (re)load, so callers can tell cached renders apart
+        self.version = 0
+        self._by_slug = {}
+        self._by_id = {}
+        self._by_name = {}
+        self._stamp = None
+
+    def load(self):
+        """
+        Load and validate the season file.
+
+        Raises:
+            SeasonDataError: If the file can't be read or doesn't validate.
+        """
+        stamp = self._file_stamp()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise SeasonDataError(f"Couldn't read season data from {self.path}: {e}") from e
+
+        dungeons = self._validate(data)
+
+        self.season = data['season']
+        self.name = data.get('name', data['season'])
+        self._by_slug = {dungeon.slug: dungeon for dungeon in dungeons}
+        self._by_id = {dungeon.challenge_mode_id: dungeon for dungeon in dungeons}
+        self._by_name = {}
+        for dungeon in dungeons:
+            self._by_name[dungeon.name.lower()] = dungeon
+            self._by_name[dungeon.short_name.lower()] = dungeon
+        self._stamp = stamp
+        self.version += 1
+        logger.info(f"Loaded {len(dungeons)} dungeon(s) for {self.season} from {self.path}")
+
+    def _validate(self, data):
+        if not isinstance(data, dict) or not isinstance(data.get('season'), str):
+            raise SeasonDataError(f"{self.path}: expected an object with a 'season' string")
+        entries = data.get('dungeons')
+        if not isinstance(entries, list) or not entries:
+            raise SeasonDataError(f"{self.path}: 'dungeons' must be a non-empty list")
+
+        dungeons = []
+        seen = {'slug': set(), 'short_name': set(), 'challenge_mode_id': set()}
+        for index, entry in enumerate(entries):
+            where = f"{self.path}: dungeons[{index}]"
+            if not isinstance(entry, dict):
+                raise SeasonDataError(f"{where} must be an object")
+            for field, kind in (('slug', str), ('short_name', str), ('name', str), ('challenge_mode_id', int)):
+                if not isinstance(entry.get(field), kind) or isinstance(entry.get(field), bool):
+                    raise SeasonDataError(f"{where}.{field} must be a {kind.__name__}")
+            if not _SLUG.match(entry['slug']):
+                raise SeasonDataError(f"{where}.slug {entry['slug']!r} isn't a lowercase hyphenated slug")
+            for field in seen:
+                value = entry[field].lower() if isinstance(entry[field], str) else entry[field]
+                if value in seen[field]:
+                    raise SeasonDataError(f"{where}.{field} {entry[field]!r} is used twice")
+                seen[field].add(value)
+
+            dungeons.append(Dungeon(
+                slug=entry['slug'],
+                short_name=entry['short_name'],
+                name=entry['name'],
+                challenge_mode_id=entry['challenge_mode_id'],
+                emoji=self._validate_emoji(where, entry.get('emoji')),
+                fallback_emoji=entry.get('fallback_emoji') or DEFAULT_DUNGEON_EMOJI,
+                image=self._validate_image(where, entry.get('image'))
+            ))
+        return dungeons
+
+    @staticmethod
+    def _validate_emoji(where, emoji):
+        if emoji is None:
+            return None
+        if not isinstance(emoji, dict) or not _EMOJI_NAME.match(str(emoji.get('name', ''))):
+            raise SeasonDataError(f"{where}.emoji needs a 'name' of 2-32 letters, digits or underscores")
+
+        # Per-dungeon environment variables from earlier versions still override the file
+        emoji_id = os.getenv(emoji['env']) if emoji.get('env') else None
+        emoji_id = str(emoji_id or emoji.get('id', ''))
+        if not _EMOJI_ID.match(emoji_id):
+            raise SeasonDataError(f"{where}.emoji id {emoji_id!r} isn't a Discord emoji id")
+        return f"<:{emoji['name']}:{emoji_id}>"
+
+    def _validate_image(self, where, image):
+        if image is None:
+            return None
+        if not isinstance(image, str) or os.path.basename(image) != image:
+            raise SeasonDataError(f"{where}.image must be a file name under the images directory")
+        if self.images_dir is not None and not os.path.isfile(os.path.join(self.images_dir, image)):
+            raise SeasonDataError(f"{where}.image {image!r} doesn't exist in {self.images_dir}")
+        return image
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _ensure_loaded(self):
+        if not self.version:
+            self.load()
+
+    def reload_if_changed(self):
+        """
+        Reload the file if it changed since it was last loaded.
+
+        Returns:
+            bool: True if new data was loaded.
+        """
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        try:
+            self.load()
+        except SeasonDataError as e:
+            # Remember the bad file so it's only reported once, and keep serving the last good data
+            self._stamp = stamp
+            logger.error(f"Keeping the previous season data: {e}")
+            return False
+        return True
+
+    async def watch(self, interval):
+        """
+        Poll the file and reload it when it changes. Runs until cancelled.
+
+        Args:
+            interval (float): Seconds between checks.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_if_changed()
+
+    def get(self, slug):
+        """Get a dungeon by slug, or None."""
+        self._ensure_loaded()
+        return self._by_slug.get(slug)
+
+    def by_id(self, challenge_mode_id):
+        """Get a dungeon by Raider.io's ``map_challenge_mode_id``, or None."""
+        self._ensure_loaded()
+        return self._by_id.get(challenge_mode_id)
+
+    def by_name(self, name):
+        """Get a dungeon by display name or short name, ignoring case, or None."""
+        self._ensure_loaded()
+        return self._by_name.get(name.lower())
+
+    def for_run(self, run):
+        """
+        Find the dungeon of a Raider.io run.
+
+        Args:
+            run (dict): A run from ``mythic_plus_best_runs``.
+
+        Returns:
+            Dungeon: The dungeon, or None if it isn't part of this season's data.
+        """
+        self._ensure_loaded()
+        return (
+            self._by_id.get(run.get('map_challenge_mode_id'))
+            or self._by_name.get(str(run.get('dungeon', '')).lower())
+            or self._by_name.get(str(run.get('short_name', '')).lower())
+        )
+
+    @property
+    def dungeons(self):
+        """Every dungeon, in file order."""
+        self._ensure_loaded()
+        return list(self._by_slug.values())
@@ -0,0 +1,148 @@
+"""
+Token bucket stored in SQLite, so every worker process of a cluster shares one Raider.io rate limit.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_budget (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    paused_until REAL NOT NULL
+);
+"""
+
+class SharedRateBudget:
+    """
+    Rate limit budget shared between processes through a SQLite file.
+
+    Each take() refills the bucket from the wall clock and removes tokens in
+    one write transaction, so processes can't hand out the same tokens twice.
+    Pauses from ``Retry-After`` are stored too, so a 429 seen by one process
+    pauses all of them. Disk access runs on a background thread.
+    """
+
+    def __init__(self, path, rate, burst, name="raiderio"):
+        """
+        Args:
+            path (str): SQLite database file, the same for every process.
+            rate (float): Tokens added per second, across all processes.
+            burst (int): Maximum number of tokens the bucket can hold.
+            name (str, optional): Bucket name, so one file can hold several budgets.
+        """
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-budget")
+        self._db = None
+
+        self.leases = 0
+        self.leased = 0
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def open(self):
+        """Open the database, creating the bucket if it doesn't exist yet."""
+        await self._run(self._open)
+        logger.info(f"Sharing the Raider.io rate budget through {self.path}")
+        return self
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Transactions are managed explicitly, so take() can hold the write lock while it reads
+        self._db = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db.execute(
+            "INSERT OR IGNORE INTO rate_budget (name, tokens, updated_at, paused_until) VALUES (?, ?, ?, 0)",
+            (self.name, float(self.burst), time.time())
+        )
+
+    async def close(self):
+        """Close the database."""
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)
+
+    def _close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def take(self, count):
+        """
+        Take up to ``count`` tokens.
+
+        Args:
+            count (int): Tokens wanted.
+
+        Returns:
+            tuple: (tokens granted, seconds the budget is still paused for).
+        """
+        granted, paused_for = await self._run(self._take, count)
+        if granted:
+            self.leases += 1
+            self.leased += granted
+        return granted, paused_for
+
+    def _take(self, count):
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, updated_at, paused_until = self._db.execute(
+                "SELECT tokens, updated_at, paused_until FROM rate_budget WHERE name = ?", (self.name,)
+            ).fetchone()
+            tokens = min(self.burst, tokens + max(0.0, now - updated_at) * self.rate)
+            granted = 0 if now < paused_until else min(count, math.floor(tokens))
+            self._db.execute(
+                "UPDATE rate_budget SET tokens = ?, updated_at = ? WHERE name = ?",
+                (tokens - granted, now, self.name)
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return granted, max(0.0, paused_until - now)
+
+    async def pause(self, seconds):
+        """
+        Pause every process sharing the budget.
+
+        Args:
+            seconds (float): How long to pause, e.g. from a Retry-After header.
+        """
+        try:
+            await self._run(self._pause, time.time() + seconds)
+        except Exception as e:
+            logger.error(f"Failed to share a Raider.io pause: {e}")
+
+    def _pause(self, paused_until):
+        self._db.execute(
+            "UPDATE rate_budget SET paused_until = MAX(paused_until, ?), tokens = 0, updated_at = ? WHERE name = ?",
+            (paused_until, paused_until, self.name)
+        )
+
+    def stats(self):
+        """
+        Get the lease counters.
+
+        Returns:
+            dict: Leases made and tokens leased by this process.
+        """
+        return {'leases': self.leases, 'leased': self.leased}
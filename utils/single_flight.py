@@ -0,0 +1,76 @@
+"""
+Coalescing of identical concurrent requests.
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """
+    Share one outstanding call between concurrent callers with the same key.
+
+    The first caller for a key starts the call; everyone who asks for the same
+    key while it is running awaits the same task and gets its result or its
+    error. The call is only cancelled once every caller waiting on it has been
+    cancelled.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self.calls = 0
+        self.shared = 0
+
+    def in_flight(self, key):
+        """Check whether a call for the key is currently running."""
+        return key in self._flights
+
+    async def do(self, key, coro_factory):
+        """
+        Run a call for the key, or join the one already running.
+
+        Args:
+            key (hashable): Identifies identical calls.
+            coro_factory (callable): Returns the coroutine to run if no call is in flight.
+
+        Returns:
+            Any: The result of the shared call.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.create_task(coro_factory())
+            flight = self._flights[key] = [task, 0]
+            task.add_done_callback(lambda _: self._forget(key, flight))
+            self.calls += 1
+        else:
+            self.shared += 1
+
+        task = flight[0]
+        flight[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            flight[1] -= 1
+            if flight[1] == 0 and not task.done():
+                # Nobody is waiting any more, so don't let a new caller join a dying call
+                self._forget(key, flight)
+                task.cancel()
+
+    def _forget(self, key, flight):
+        """Drop a finished or abandoned call."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self):
+        """
+        Get the coalescing counters.
+
+        Returns:
+            dict: Calls started, calls joined and calls currently in flight.
+        """
+        return {
+            'calls': self.calls,
+            'shared': self.shared,
+            'in_flight': len(self._flights),
+        }
@@ -0,0 +1,332 @@
+"""
+Persisted watch lists for the roster watcher, plus the snapshot and diff of watched fields.
+"""
+
+import json
+import logging
+import os
+
+from utils.character_profile import character_key
+from utils.realm_list import normalize_realm
+
+logger = logging.getLogger(__name__)
+
+# Snapshot fields that are reported when they change, with their labels
+WATCHED_FIELDS = (
+    ('score', "M+ Score"),
+    ('item_level', "Item Level"),
+    ('raid', "Raid Progress"),
+)
+
+class WatchedCharacter:
+    """A character watched in one or more channels, with the last values seen."""
+
+    __slots__ = ('name', 'realm', 'region', 'channels', 'snapshot')
+
+    def __init__(self, name, realm, region, channels=None, snapshot=None):
+        self.name = name
+        self.realm = realm
+        self.region = region
+        self.channels = set(channels or ())
+        self.snapshot = snapshot or {}
+
+    @property
+    def key(self):
+        return character_key(self.name, self.realm, self.region)
+
+    def to_dict(self, channels=None):
+        return {
+            'name': self.name,
+            'realm': self.realm,
+            'region': self.region,
+            'channels': sorted(self.channels if channels is None else channels),
+            'snapshot': self.snapshot,
+        }
+
+class WatchList:
+    """
+    Characters watched per channel, stored in one JSON file per server.
+
+    A character watched in several channels, or on several servers, is kept
+    (and refreshed) once. Only servers ``owns`` accepts are loaded, so each
+    cluster worker watches just the servers on its own shards. A server's
+    file is re-read before every change if it changed on disk, and written
+    whenever its list or one of its snapshots changes.
+    """
+
+    def __init__(self, directory, owns=None):
+        """
+        Args:
+            directory (str): Directory the per-server files are stored in.
+            owns (callable, optional): Takes a server id and returns whether to load it. Defaults to every server.
+        """
+        self.directory = directory
+        self.owns = owns or (lambda guild_id: True)
+        self.characters = {}
+        # Server id -> {character key: channel ids}, and the file modification time last loaded
+        self._guilds = {}
+        self._mtimes = {}
+
+    def _path(self, guild_id):
+        return os.path.join(self.directory, f"{guild_id}.json")
+
+    def _mtime(self, guild_id):
+        try:
+            return os.stat(self._path(guild_id)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _stored_guilds(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [int(name[:-5]) for name in names if name.endswith('.json') and name[:-5].isdigit()]
+
+    def load(self):
+        """Load the watch lists of every owned server from disk."""
+        self.characters = {}
+        self._guilds = {}
+        self._mtimes = {}
+        self.sync()
+        logger.info(f"Loaded {len(self.characters)} watched character(s) from {self.directory}")
+
+    def sync(self):
+        """Pick up owned servers whose file was created, changed or deleted since it was last read."""
+        guild_ids = {guild_id for guild_id in self._stored_guilds() if self.owns(guild_id)} | set(self._guilds)
+        for guild_id in guild_ids:
+            self.reload(guild_id)
+
+    def reload(self, guild_id):
+        """Re-read a server's file if it changed on disk since it was last read."""
+        mtime = self._mtime(guild_id)
+        if guild_id in self._mtimes and self._mtimes[guild_id] == mtime:
+            return
+
+        self._mtimes[guild_id] = mtime
+        watched = {}
+        if mtime is not None:
+            path = self._path(guild_id)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for entry in data.get('characters', []):
+                    character = WatchedCharacter(
+                        entry['name'], entry['realm'], entry['region'], snapshot=entry.get('snapshot')
+                    )
+                    channels = set(entry.get('channels') or ())
+                    if not channels:
+                        continue
+                    watched[character.key] = channels
+                    # A character shared with another server keeps the snapshot already in memory
+                    self.characters.setdefault(character.key, character)
+            except Exception as e:
+                logger.error(f"Failed to load watch lists from {path}: {e}")
+                return
+
+        previous = self._guilds.pop(guild_id, {})
+        if watched:
+            self._guilds[guild_id] = watched
+        for key in set(previous) | set(watched):
+            self._update_channels(key)
+
+    def _update_channels(self, key):
+        """Recompute a character's channels from every server watching it, dropping it if none are left."""
+        channels = set()
+        for watched in self._guilds.values():
+            channels |= watched.get(key, set())
+        if channels:
+            self.characters[key].channels = channels
+        else:
+            self.characters.pop(key, None)
+
+    def save(self, guild_id):
+        """Write a server's watch list to disk, or delete its file once nothing is watched there."""
+        path = self._path(guild_id)
+        watched = self._guilds.get(guild_id, {})
+        try:
+            if not watched:
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                os.makedirs(self.directory, exist_ok=True)
+                characters = [self.characters[key].to_dict(channels) for key, channels in watched.items()]
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'characters': characters}, f, indent=2)
+                os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Failed to save watch lists to {path}: {e}")
+        self._mtimes[guild_id] = self._mtime(guild_id)
+
+    def save_snapshot(self, character):
+        """Write the files of every server watching a character after its snapshot changed."""
+        for guild_id in self.guilds_of(character.key):
+            self.reload(guild_id)
+            if character.key in self._guilds.get(guild_id, {}):
+                self.save(guild_id)
+
+    def guilds_of(self, key):
+        """Ids of the servers watching a character."""
+        return [guild_id for guild_id, watched in self._guilds.items() if key in watched]
+
+    def add(self, guild_id, channel_id, name, realm, region, snapshot):
+        """
+        Watch a character in a channel.
+
+        Args:
+            guild_id (int): The server the channel is in.
+            channel_id (int): The channel changes are posted to.
+            name (str): The character name.
+            realm (str): The realm/server name.
+            region (str): The region the character was found in.
+            snapshot (dict): The character's current watched values.
+
+        Returns:
+            tuple: (WatchedCharacter, bool) where the bool is True if the
+                   character wasn't watched anywhere before.
+        """
+        self.reload(guild_id)
+        key = character_key(name, realm, region)
+        character = self.characters.get(key)
+        is_new = character is None
+        if is_new:
+            character = self.characters[key] = WatchedCharacter(name, realm, region, snapshot=snapshot)
+        self._guilds.setdefault(guild_id, {}).setdefault(key, set()).add(channel_id)
+        self._update_channels(key)
+        self.save(guild_id)
+        return character, is_new
+
+    def remove(self, guild_id, channel_id, name, realm):
+        """
+        Stop watching a character in a channel.
+
+        Args:
+            guild_id (int): The server the channel is in.
+            channel_id (int): The channel to remove the character from.
+            name (str): The character name.
+            realm (str): The realm/server name.
+
+        Returns:
+            WatchedCharacter: The character, or None if the channel wasn't watching it.
+        """
+        self.reload(guild_id)
+        watched = self._guilds.get(guild_id, {})
+        for character in self.in_channel(channel_id):
+            channels = watched.get(character.key)
+            # Realms ignoring spacing and punctuation, so watches added before realms were slugged still match
+            same_character = (character.name.strip().lower() == name.strip().lower()
+                              and normalize_realm(character.realm) == normalize_realm(realm))
+            if channels and channel_id in channels and same_character:
+                channels.discard(channel_id)
+                if not channels:
+                    del watched[character.key]
+                if not watched:
+                    self._guilds.pop(guild_id, None)
+                self._update_channels(character.key)
+                self.save(guild_id)
+                return character
+        return None
+
+    def import_entries(self, entries, guild_ids):
+        """
+        Add characters from a watch list written before lists were stored per server.
+
+        Args:
+            entries (list): Character dicts from the old file, see read_legacy().
+            guild_ids (dict): Server id of each channel id; channels that are gone are left out.
+
+        Returns:
+            int: Number of channel watches imported.
+        """
+        imported = 0
+        changed = set()
+        for entry in entries:
+            character = WatchedCharacter(entry['name'], entry['realm'], entry['region'], snapshot=entry.get('snapshot'))
+            for channel_id in entry.get('channels') or ():
+                guild_id = guild_ids.get(channel_id)
+                if guild_id is None:
+                    continue
+                if guild_id not in changed:
+                    self.reload(guild_id)
+                    changed.add(guild_id)
+                self.characters.setdefault(character.key, character)
+                self._guilds.setdefault(guild_id, {}).setdefault(character.key, set()).add(channel_id)
+                self._update_channels(character.key)
+                imported += 1
+
+        for guild_id in changed:
+            self.save(guild_id)
+            # Files of servers other workers own are written for them to pick up, not watched here
+            if not self.owns(guild_id):
+                self._mtimes.pop(guild_id, None)
+                for key in self._guilds.pop(guild_id, {}):
+                    self._update_channels(key)
+        return imported
+
+    def in_channel(self, channel_id):
+        """Characters watched in a channel, sorted by name."""
+        return sorted(
+            (c for c in self.characters.values() if channel_id in c.channels),
+            key=lambda c: (c.name.lower(), c.realm)
+        )
+
+    def count_in_channel(self, channel_id):
+        """Number of characters watched in a channel."""
+        return sum(1 for c in self.characters.values() if channel_id in c.channels)
+
+    def __len__(self):
+        return len(self.characters)
+
+def read_legacy(path):
+    """
+    Read the characters of a single-file watch list, as written before lists were stored per server.
+
+    Args:
+        path (str): The old watch list file.
+
+    Returns:
+        list: Character dicts with name, realm, region, channels and snapshot.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('characters', [])
+
+def take_snapshot(profile):
+    """
+    Pick the watched values out of a profile.
+
+    Args:
+        profile (CharacterProfile): The character's profile.
+
+    Returns:
+        dict: The values that are compared between refreshes.
+    """
+    raid = None
+    if profile.raids:
+        latest = profile.raids[0]
+        raid = f"{latest.slug.replace('-', ' ').title()}: {latest.summary}"
+    return {
+        'last_crawled_at': profile.last_crawled_at,
+        'score': profile.score,
+        'item_level': profile.item_level,
+        'raid': raid,
+    }
+
+def diff_snapshots(old, new):
+    """
+    Compare the watched values of two snapshots.
+
+    Args:
+        old (dict): The previous snapshot.
+        new (dict): The current snapshot.
+
+    Returns:
+        list: (label, old value, new value) for every watched field that changed.
+    """
+    changes = []
+    for field, label in WATCHED_FIELDS:
+        before = old.get(field)
+        after = new.get(field)
+        if after is not None and before != after:
+            changes.append((label, before, after))
+    return changes